@@ -0,0 +1,8 @@
+# Benchmarks import the scripts the same way the scripts import each other
+# when run directly, so put the scripts directory on the path.
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent / 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
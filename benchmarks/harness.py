@@ -0,0 +1,136 @@
+"""Timing, memory and baseline comparison for benchmark cases."""
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+def measure(fn: Callable[[], object], items: int, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Time `fn` and record its peak Python/NumPy allocation.
+
+    Timed runs and the tracemalloc run are separate, so tracing overhead does
+    not distort latency.
+
+    Returns:
+        Latency percentiles (ms per call), throughput (items/s) and peak memory (MB)
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'items': items,
+        'repeat': repeat,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'throughput': items / (np.median(latencies) / 1000),
+        'peak_mb': peak / 2**20
+    }
+
+# Imports that cost seconds and should only happen when their feature is used
+HEAVY_MODULES = ('torch', 'transformers', 'talib', 'yfinance', 'gnews', 'bs4', 'requests')
+
+_IMPORT_PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds,
+                  'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+'''
+
+def measure_import(module: str, path: str, repeat: int = 5) -> dict:
+    """
+    Cold import time of `module` in fresh interpreters, plus which heavy
+    dependencies the import pulled in.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [path, os.environ.get('PYTHONPATH')])))
+    code = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    latencies, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        latencies.append(probe['seconds'] * 1000)
+        heavy = probe['heavy']
+
+    return {
+        'items': 1,
+        'repeat': repeat,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'throughput': 1000 / np.median(latencies),
+        'heavy_modules': heavy
+    }
+
+def save_baseline(results: Dict[str, dict], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'machine': platform.platform(),
+            'python': platform.python_version(),
+            'results': results
+        }, f, indent=2, sort_keys=True)
+
+def load_baseline(path: Path) -> Optional[Dict[str, dict]]:
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)['results']
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            threshold: float = 0.2, fields=('p50_ms', 'peak_mb')) -> List[dict]:
+    """
+    Cases whose latency or memory grew by more than `threshold` (a fraction),
+    or whose import started pulling in heavy modules it did not before.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        added = set(result.get('heavy_modules', [])) - set(previous.get('heavy_modules', []))
+        if added:
+            regressions.append({
+                'case': name,
+                'field': 'heavy_modules',
+                'baseline': ', '.join(previous.get('heavy_modules', [])) or '-',
+                'current': ', '.join(result['heavy_modules']),
+                'change': len(added)
+            })
+        for field in fields:
+            old, new = previous.get(field), result.get(field)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append({
+                    'case': name,
+                    'field': field,
+                    'baseline': old,
+                    'current': new,
+                    'change': new / old - 1
+                })
+    return regressions
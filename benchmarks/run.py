@@ -0,0 +1,212 @@
+"""
+Benchmark the analysers, Strategy and Backtester on synthetic universes.
+
+Everything runs offline: yfinance, GNews, FinBERT and HTTP are replaced by
+deterministic stand-ins from benchmarks.stubs.
+
+Usage:
+    python -m benchmarks.run --symbols 10 100 --years 1 5
+    python -m benchmarks.run --save-baseline          # record the current numbers
+    python -m benchmarks.run --threshold 0.2          # exit 1 on >20% regressions
+    python -m benchmarks.run --cases imports          # cold import times only
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import pandas as pd
+
+import benchmarks  # noqa: F401 (puts scripts/ on the path)
+from benchmarks import SCRIPTS_DIR, synthetic
+from benchmarks.harness import compare, load_baseline, measure, measure_import, save_baseline
+from benchmarks.stubs import FakeMarket, offline
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+# Entry-point modules whose cold import time is tracked; none should load torch
+IMPORT_TARGETS = ('strategy', 'fundamental', 'technical', 'sentiment', 'backtest', 'utils')
+
+def technical_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from technical import TechnicalAnalyser
+    frames = synthetic.make_universe(n_symbols, years)
+
+    def run():
+        for df in frames.values():
+            TechnicalAnalyser(df).analyse()
+    return run, n_symbols
+
+def technical_series_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from technical import TechnicalAnalyser
+    frames = synthetic.make_universe(n_symbols, years)
+
+    def run():
+        for df in frames.values():
+            TechnicalAnalyser(df).score_series()
+    return run, n_symbols
+
+def fundamental_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from fundamental import FundamentalAnalyser
+    symbols = synthetic.universe(n_symbols)
+
+    def run():
+        for symbol in symbols:
+            FundamentalAnalyser(symbol).analyse()
+    return run, n_symbols
+
+def sentiment_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from sentiment import SentimentAnalyser
+    symbols = synthetic.universe(n_symbols)
+    analyser = SentimentAnalyser(symbols[0])
+
+    def run():
+        for symbol in symbols:
+            analyser.symbol = symbol
+            analyser.analyse()
+    return run, n_symbols
+
+def strategy_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from strategy import Strategy
+    strategy = Strategy(synthetic.universe(n_symbols))
+
+    def run():
+        strategy.refresh_data()
+        strategy.analyse_all_stocks()
+    return run, n_symbols
+
+def score_panel_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from scoring import ScorePanel
+    frames = synthetic.make_universe(n_symbols, years)
+    return lambda: ScorePanel.from_price_data(frames), n_symbols
+
+def backtest_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from backtest import Backtester
+    from scoring import ScorePanel
+    frames = synthetic.make_universe(n_symbols, years)
+    panel = ScorePanel.from_price_data(frames)
+    weights = {'technical': 0.6, 'fundamental': 0.2, 'sentiment': 0.2}
+    start = str(panel.dates[min(60, len(panel.dates) - 1)].date())
+
+    def run():
+        backtester = Backtester(None, panel.symbols, start, weights=weights,
+                                buy_threshold=60, sell_threshold=45)
+        backtester.panel = panel
+        backtester.run()
+    # Throughput in symbol-bars per second
+    return run, len(panel.dates) * n_symbols
+
+def momentum_screen_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from momentum import MomentumScreen
+    screen = MomentumScreen.from_frames(synthetic.make_universe(n_symbols, years))
+    # What a slider move costs once the panel is cached
+    return lambda: screen.screen((30, 70), (0, 20), '1 Month', True), n_symbols
+
+def correlation_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    from correlation import CorrelationClusters
+    frames = synthetic.make_universe(n_symbols, years)
+    ranked = list(frames)
+
+    def run():
+        CorrelationClusters(frames).diversify(ranked, 20)
+    return run, n_symbols
+
+def streaming_case(n_symbols: int, years: float) -> Tuple[Callable, int]:
+    import numpy as np
+    from streaming import IntradayTechnicals, StreamingPipeline, Tick, TickSource
+    symbols = synthetic.universe(n_symbols)
+    rng = np.random.default_rng(0)
+    # 45 one-minute bars of 4 ticks per symbol; scoring starts at bar 35
+    prices = rng.uniform(20, 500, n_symbols) * np.exp(
+        np.cumsum(rng.normal(0, 0.002, (45 * 4, n_symbols)), axis=0))
+    ticks = [Tick(symbol, step * 15.0, float(price), 100.0)
+             for step, row in enumerate(prices) for symbol, price in zip(symbols, row)]
+
+    class ListSource(TickSource):
+        def ticks(self):
+            return iter(ticks)
+
+    def run():
+        StreamingPipeline(ListSource(), IntradayTechnicals(), interval=60).run()
+    # Throughput in ticks per second
+    return run, len(ticks)
+
+# Cases marked False do not depend on the length of history
+CASES: Dict[str, Tuple[Callable, bool]] = {
+    'technical': (technical_case, True),
+    'technical_series': (technical_series_case, True),
+    'fundamental': (fundamental_case, False),
+    'sentiment': (sentiment_case, False),
+    'strategy': (strategy_case, False),
+    'score_panel': (score_panel_case, True),
+    'backtest': (backtest_case, True),
+    'momentum_screen': (momentum_screen_case, True),
+    'correlation': (correlation_case, True),
+    'streaming': (streaming_case, False),
+}
+
+def run_benchmarks(cases, symbol_counts, years_list, repeat: int = 5) -> Dict[str, dict]:
+    results = {}
+    if 'imports' in cases:
+        # Fresh interpreters, before anything below imports the heavy modules here
+        for module in IMPORT_TARGETS:
+            name = f'import[{module}]'
+            results[name] = measure_import(module, SCRIPTS_DIR, repeat)
+            print(f"{name:<42} p50 {results[name]['p50_ms']:>10.1f} ms  heavy: "
+                  f"{', '.join(results[name]['heavy_modules']) or '-'}", flush=True)
+
+    with offline(FakeMarket(years=max(years_list))):
+        for case in cases:
+            if case == 'imports':
+                continue
+            factory, uses_years = CASES[case]
+            for n_symbols in symbol_counts:
+                for years in (years_list if uses_years else [None]):
+                    name = f'{case}[{n_symbols} symbols' + (f', {years}y]' if years else ']')
+                    fn, items = factory(n_symbols, years or 1)
+                    results[name] = measure(fn, items, repeat=repeat)
+                    print(f"{name:<42} p50 {results[name]['p50_ms']:>10.1f} ms  "
+                          f"{results[name]['throughput']:>12.0f} items/s  "
+                          f"peak {results[name]['peak_mb']:>8.1f} MB", flush=True)
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cases', nargs='+', choices=['imports'] + list(CASES),
+                        default=['imports'] + list(CASES))
+    parser.add_argument('--symbols', nargs='+', type=int, default=[10, 100],
+                        help='Universe sizes, e.g. 10 100 1000 5000')
+    parser.add_argument('--years', nargs='+', type=float, default=[1, 5],
+                        help='Years of daily history, e.g. 1 5 20')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown/memory growth before flagging (fraction)')
+    args = parser.parse_args(argv)
+
+    # Analyser error logging would otherwise dominate the timings
+    logging.disable(logging.CRITICAL)
+    results = run_benchmarks(args.cases, args.symbols, args.years, args.repeat)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        print(pd.DataFrame(regressions).to_string(index=False))
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
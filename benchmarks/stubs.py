@@ -0,0 +1,107 @@
+"""Offline stand-ins for yfinance, GNews, FinBERT and HTTP."""
+import zlib
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+import pandas as pd
+import torch
+
+from benchmarks import synthetic
+
+VOCAB_SIZE = 4096
+
+class FakeMarket:
+    """
+    Serves synthetic bars for any symbol, generated once and memoised.
+
+    Bars end today so date-relative callers such as fetch_data(period=200)
+    find data; the values themselves are the same on every run.
+    """
+    def __init__(self, years: float = 1):
+        self.years = years
+        self.end = pd.Timestamp.today().normalize()
+        self.frames = {}
+
+    def history(self, symbol: str) -> pd.DataFrame:
+        if symbol not in self.frames:
+            self.frames[symbol] = synthetic.make_ohlcv(symbol, self.years, end=self.end)
+        return self.frames[symbol]
+
+    def download(self, symbol, start=None, end=None, progress=False, **kwargs):
+        df = self.history(symbol)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        # yfinance returns (field, ticker) columns, which fetch_data flattens
+        df = df.copy()
+        df.columns = pd.MultiIndex.from_product([df.columns, [symbol]])
+        return df
+
+class FakeTicker:
+    def __init__(self, symbol: str):
+        self.ticker = symbol
+        self.info = synthetic.make_info(symbol)
+        self.news = synthetic.make_news(symbol)
+
+class FakeGNews:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_news(self, query: str):
+        symbol = query.split()[0]
+        return [{'title': title} for title in synthetic.make_headlines(symbol, seed=1)]
+
+class StubTokenizer:
+    """Hashes words to ids so the stub model does work proportional to the text"""
+    def __call__(self, text, return_tensors='pt', padding=True, truncation=True, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        rows = [[zlib.crc32(w.encode()) % VOCAB_SIZE for w in t.lower().split()][:512] or [0]
+                for t in texts]
+        width = max(len(row) for row in rows)
+        input_ids = torch.tensor([row + [0] * (width - len(row)) for row in rows])
+        attention_mask = torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in rows])
+        return {'input_ids': input_ids, 'attention_mask': attention_mask}
+
+class StubModel(torch.nn.Module):
+    """Tiny deterministic 3-class classifier in place of FinBERT"""
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embedding = torch.nn.Embedding(VOCAB_SIZE, 32)
+        self.classifier = torch.nn.Linear(32, 3)
+
+    def forward(self, input_ids, attention_mask=None, **kwargs):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding(input_ids) * mask).sum(1) / mask.sum(1)
+        return SimpleNamespace(logits=self.classifier(pooled))
+
+def _no_network(*args, **kwargs):
+    raise RuntimeError("Network access is disabled in benchmarks")
+
+@contextmanager
+def offline(market: FakeMarket = None):
+    """Patch every network client the scripts use with synthetic stand-ins"""
+    import gnews
+    import requests
+    import transformers
+    import yfinance
+    import sentiment
+
+    market = market or FakeMarket()
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(yfinance, 'download', market.download))
+        stack.enter_context(patch.object(yfinance, 'Ticker', FakeTicker))
+        stack.enter_context(patch.object(gnews, 'GNews', FakeGNews))
+        stack.enter_context(patch.object(transformers.AutoTokenizer, 'from_pretrained',
+                                         lambda *a, **k: StubTokenizer()))
+        stack.enter_context(patch.object(transformers.AutoModelForSequenceClassification,
+                                         'from_pretrained', lambda *a, **k: StubModel()))
+        stack.enter_context(patch.object(requests, 'get', _no_network))
+        stack.enter_context(patch.object(requests.Session, 'request', _no_network))
+        # The shared FinBERT cache must not hand the stub to later, real callers
+        sentiment.load_finbert.cache_clear()
+        try:
+            yield market
+        finally:
+            sentiment.load_finbert.cache_clear()
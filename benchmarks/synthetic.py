@@ -0,0 +1,72 @@
+"""Deterministic synthetic market data for offline benchmarks."""
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+END_DATE = pd.Timestamp('2024-12-31')
+
+WORDS = [
+    'earnings', 'beat', 'miss', 'guidance', 'raised', 'cut', 'upgrade', 'downgrade',
+    'record', 'revenue', 'growth', 'slump', 'rally', 'lawsuit', 'merger', 'buyback',
+    'dividend', 'layoffs', 'launch', 'recall', 'outlook', 'strong', 'weak', 'shares'
+]
+
+def universe(n_symbols: int) -> List[str]:
+    """Synthetic ticker names, e.g. S0001"""
+    return [f'S{i:04d}' for i in range(1, n_symbols + 1)]
+
+def symbol_seed(symbol: str, seed: int = 0) -> int:
+    return zlib.crc32(symbol.encode()) + seed
+
+def make_ohlcv(symbol: str, years: float = 1, seed: int = 0,
+               end: pd.Timestamp = END_DATE) -> pd.DataFrame:
+    """Geometric random-walk OHLCV bars ending at `end`, identical for every call"""
+    n = int(years * TRADING_DAYS_PER_YEAR)
+    rng = np.random.default_rng(symbol_seed(symbol, seed))
+    drift, vol = rng.normal(0.0003, 0.0003), rng.uniform(0.01, 0.03)
+    close = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    spread = rng.uniform(0, vol, (2, n))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, vol / 4, n)),
+        'High': close * (1 + spread[0]),
+        'Low': close * (1 - spread[1]),
+        'Close': close,
+        'Volume': rng.lognormal(14, 0.5, n).round()
+    }, index=pd.bdate_range(end=end, periods=n, name='Date'))
+
+def make_universe(n_symbols: int, years: float = 1, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    return {symbol: make_ohlcv(symbol, years, seed) for symbol in universe(n_symbols)}
+
+def make_info(symbol: str, seed: int = 0) -> dict:
+    """yfinance-style Ticker.info with the fields FundamentalAnalyser reads"""
+    rng = np.random.default_rng(symbol_seed(symbol, seed) + 1)
+    return {
+        'longName': f'{symbol} Holdings',
+        'sector': ['Technology', 'Healthcare', 'Financials', 'Energy'][rng.integers(4)],
+        'marketCap': int(rng.lognormal(23, 1.5)),
+        'forwardPE': float(rng.uniform(5, 60)),
+        'trailingPE': float(rng.uniform(5, 60)),
+        'priceToBook': float(rng.uniform(0.5, 15)),
+        'returnOnEquity': float(rng.normal(0.15, 0.1)),
+        'profitMargins': float(rng.normal(0.1, 0.08)),
+        'currentRatio': float(rng.uniform(0.5, 4)),
+        'debtToEquity': float(rng.uniform(0, 300))
+    }
+
+def make_headlines(symbol: str, n: int = 10, seed: int = 0) -> List[str]:
+    rng = np.random.default_rng(symbol_seed(symbol, seed) + 2)
+    return [f"{symbol} " + ' '.join(rng.choice(WORDS, size=rng.integers(6, 14)))
+            for _ in range(n)]
+
+def make_news(symbol: str, n: int = 10, seed: int = 0) -> List[dict]:
+    """yfinance-style Ticker.news items published over the last few days"""
+    now = datetime.now().replace(microsecond=0)
+    return [{
+        'content': {
+            'title': title,
+            'pubDate': (now - timedelta(hours=6 * k)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        }
+    } for k, title in enumerate(make_headlines(symbol, n, seed))]
@@ -0,0 +1,205 @@
+"""
+Read-only HTTP service for precomputed scores.
+
+Serves the ResultStore kept up to date by scripts/scheduler.py, so clients
+never trigger analysis themselves. Responses are cached in memory per store
+revision and carry an ETag; clients sending If-None-Match get a 304.
+
+Endpoints:
+    GET /analysis/<symbol>                    Strategy.get_analysis
+    GET /top?score_type=total&n=5             Strategy.select_top_stocks
+    GET /scores/<component>[?symbols=A,B]     One component, with timestamps
+    GET /health                               Store revision and size
+
+Usage:
+    python scripts/api.py --store results/scores.json --port 8000
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils import setup_logging                       # running script directly
+from result_store import COMPONENTS, ResultStore      # running script directly
+from instrumentation import increment                 # running script directly
+
+SCORE_TYPES = ('total',) + COMPONENTS
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class ScoringService:
+    """
+    Request handling, independent of the HTTP server.
+
+    Args:
+        store: ResultStore to serve from
+        reload_interval: Minimum seconds between checks of the store file
+        cache_size: Maximum number of cached responses
+    """
+    def __init__(self, store: ResultStore, reload_interval: float = 1.0, cache_size: int = 1024):
+        self.store = store
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Tuple[bytes, str]]' = OrderedDict()
+        self._revision = store.revision
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh_store(self):
+        """Reload the store if it changed on disk, dropping cached responses"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < self.reload_interval:
+                return
+            self._checked = now
+            try:
+                self.store.reload()
+            except Exception as e:
+                logging.error(f"Error reloading result store: {e}")
+            if self.store.revision != self._revision:
+                self._revision = self.store.revision
+                self._cache.clear()
+
+    def analysis(self, symbol: str) -> dict:
+        result = self.store.get_analysis(symbol.upper())
+        if result is None:
+            raise ApiError(404, f"No analysis for {symbol.upper()}")
+        return result
+
+    def top(self, score_type: str = 'total', n: int = 5) -> list:
+        if score_type not in SCORE_TYPES:
+            raise ApiError(400, f"Invalid score type: {score_type}")
+        key = 'score' if score_type == 'total' else score_type
+        results = [r for r in self.store.results() if r[key] is not None]
+        return sorted(results, key=lambda r: r[key], reverse=True)[:n]
+
+    def scores(self, component: str, symbols: Optional[list] = None) -> Dict[str, dict]:
+        if component not in COMPONENTS:
+            raise ApiError(404, f"Invalid component: {component}")
+        symbols = symbols or sorted(self.store.symbols)
+        return {s: self.store.component(s, component) for s in symbols
+                if self.store.component(s, component) is not None}
+
+    def health(self) -> dict:
+        return {
+            'revision': self.store.revision,
+            'updated': self.store.updated,
+            'symbols': len(self.store.symbols)
+        }
+
+    def _route(self, path: str, query: dict):
+        parts = [p for p in path.split('/') if p]
+        if parts == ['health']:
+            return self.health()
+        if parts == ['top']:
+            try:
+                n = int(query.get('n', ['5'])[0])
+            except ValueError:
+                raise ApiError(400, "n must be an integer")
+            return self.top(query.get('score_type', ['total'])[0], n)
+        if len(parts) == 2 and parts[0] == 'analysis':
+            return self.analysis(parts[1])
+        if len(parts) == 2 and parts[0] == 'scores':
+            symbols = query.get('symbols', [''])[0]
+            return self.scores(parts[1], [s.upper() for s in symbols.split(',') if s] or None)
+        raise ApiError(404, f"Not found: {path}")
+
+    def handle(self, target: str, if_none_match: Optional[str] = None) -> Tuple[int, dict, bytes]:
+        """
+        Respond to a GET of `target` (path and query string).
+
+        Returns:
+            Status code, headers and body
+        """
+        self._refresh_store()
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        key = url.path + '?' + '&'.join(f'{k}={",".join(v)}' for k, v in sorted(query.items()))
+
+        with self._lock:
+            # _route reads the live store, which may be reloaded meanwhile; the
+            # ETag names the revision seen here and a stale payload is not cached
+            revision = self._revision
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            increment('cache_hits', cache='api')
+            body, etag = cached
+        else:
+            increment('cache_misses', cache='api')
+            try:
+                payload = self._route(url.path, query)
+            except ApiError as e:
+                body = json.dumps({'error': str(e)}).encode()
+                return e.status, {'Content-Type': 'application/json'}, body
+            body = json.dumps(payload).encode()
+            etag = f'"{revision}-{hashlib.sha1(body).hexdigest()[:16]}"'
+            with self._lock:
+                if self._revision == revision:
+                    self._cache[key] = (body, etag)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+            return 304, headers, b''
+        return 200, dict(headers, **{'Content-Type': 'application/json'}), body
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for bursts of hundreds of concurrent connections
+    request_queue_size = 512
+
+def serve(service: ScoringService, port: int = 8000, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve `service` from a daemon thread; call shutdown() on the result to stop"""
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, headers, body = service.handle(self.path, self.headers.get('If-None-Match'))
+            increment('api_requests', status=status)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(f"API request: {format % args}")
+
+    server = _Server((host, port), ScoringHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Serving scores on http://{host}:{server.server_port}")
+    return server
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--store', type=Path, default=Path('results/scores.json'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    server = serve(ScoringService(ResultStore(args.store)), args.port, args.host)
+    print(f"Serving {args.store} on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,85 @@
 import streamlit as st
 import pandas as pd
 import yfinance as yf
+from datetime import datetime, timedelta
 
+from data_store import SymbolDataStore
 from fundamental import FundamentalAnalyser
+from momentum import MomentumScreen
+from sentiment_store import SENTIMENT_LEVELS, SentimentStore, SentimentWorker
+from result_store import ResultStore, combine_scores
+from universe import UniversePrefetcher, UniverseRegistry
+
+SENTIMENT_TIME_RANGES = {
+    "Last 24 Hours": timedelta(days=1),
+    "Last Week": timedelta(weeks=1),
+    "Last Month": timedelta(days=30)
+}
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_momentum_screen(symbols: tuple) -> MomentumScreen:
+    """Price panel and indicators for a universe, shared across reruns for an hour"""
+    return MomentumScreen.download(list(symbols))
+
+@st.cache_resource
+def get_sentiment_store() -> SentimentStore:
+    """Headline scores written by scripts/scheduler.py and the worker below"""
+    return SentimentStore()
+
+@st.cache_resource
+def get_sentiment_worker() -> SentimentWorker:
+    """One background scorer per app process, so FinBERT never runs in a request"""
+    return SentimentWorker(get_sentiment_store())
+
+@st.cache_resource
+def get_result_store() -> ResultStore:
+    """Component scores published by scripts/scheduler.py"""
+    return ResultStore()
+
+@st.cache_resource
+def get_data_store() -> SymbolDataStore:
+    """Price history fetched by the prefetcher, shared by every session of this process"""
+    return SymbolDataStore()
+
+@st.cache_resource
+def get_prefetcher() -> UniversePrefetcher:
+    """Scores symbols into the result store in the background; headlines go to the sentiment worker"""
+    return UniversePrefetcher(get_result_store(), data_store=get_data_store(),
+                              sentiment_worker=get_sentiment_worker())
+
+@st.cache_resource
+def get_universe_registry() -> UniverseRegistry:
+    """Local constituent snapshots; names added at a refresh are prefetched in the background"""
+    prefetcher = get_prefetcher()
+    return UniverseRegistry(on_change=lambda diff: prefetcher.submit(diff.added))
+
+@st.cache_data(show_spinner=False)
+def component_scores_at(revision: int, updated: float) -> pd.DataFrame:
+    return get_result_store().to_frame()
+
+def load_component_scores() -> pd.DataFrame:
+    """The store as a frame, rebuilt only when a new revision is on disk"""
+    store = get_result_store()
+    store.reload()
+    return component_scores_at(store.revision, store.updated)
+
+def analyse_and_cache(symbols: list) -> int:
+    """
+    Queue symbols with no cached scores for background analysis; returns how
+    many were queued. Technical and fundamental scores are published to the
+    result store and headlines scored by the sentiment worker, so neither
+    the analysers nor FinBERT run in the script thread.
+    """
+    return get_prefetcher().submit(symbols)
+
+def fill_sentiment(scores: pd.DataFrame) -> pd.DataFrame:
+    """Sentiment missing from the result store, taken from the sentiment worker's store"""
+    missing = scores['sentiment'].isna()
+    if not missing.any():
+        return scores
+    summary = get_sentiment_store().summary(symbols=list(scores.loc[missing, 'symbol']))
+    sentiment = scores['symbol'].map(summary.set_index('symbol')['score'])
+    return scores.assign(sentiment=scores['sentiment'].fillna(sentiment))
 
 def run_app():
     st.set_page_config(page_title="Stock Screener", layout="wide")
@@ -30,11 +107,15 @@ def run_app():
         # If SP500 button clicked, fetch SP500 tickers
         if sp500_clicked:
             try:
-                from utils import get_sp500_tickers
-                sp500_tickers = get_sp500_tickers()
+                registry = get_universe_registry()
+                sp500_tickers = registry.get('sp500')
                 # Take first 30 tickers for performance
                 sp500_sample = sp500_tickers[:30]
                 st.session_state.symbol_list = ", ".join(sp500_sample)
+                diff = registry.last_diff.get('sp500')
+                if diff:
+                    st.info(f"S&P 500 changed since {diff.previous}: "
+                            f"added {', '.join(diff.added) or 'none'}; removed {', '.join(diff.removed) or 'none'}")
             except Exception as e:
                 st.error(f"Error loading S&P 500 tickers: {str(e)}")
         
@@ -305,46 +386,101 @@ def run_app():
             time_period = st.radio("Time Period", ["1 Week", "1 Month", "3 Months", "6 Months", "1 Year"])
             volume_increase = st.checkbox("Above Average Volume")
         
+        # Prices are downloaded once per universe; moving a slider only re-filters
         if st.button("Screen Momentum"):
-            st.info("Momentum screening is a placeholder. Integration with data source needed.")
-            # Placeholder data
-            data = {
-                'Symbol': ['NVDA', 'AMD', 'TSLA', 'PLTR', 'COIN'],
-                'Name': ['NVIDIA Corp', 'Advanced Micro Devices', 'Tesla Inc', 'Palantir', 'Coinbase'],
-                'RSI': [68.2, 52.1, 45.8, 62.7, 71.5],
-                'Price Change %': [15.2, 8.9, -2.3, 10.5, 25.7],
-                'Volume Ratio': [1.5, 1.2, 0.9, 2.1, 3.2]
-            }
-            st.dataframe(pd.DataFrame(data))
+            st.session_state.momentum_symbols = tuple(symbols)
+        
+        if st.session_state.get('momentum_symbols'):
+            momentum_symbols = st.session_state.momentum_symbols
+            if momentum_symbols != tuple(symbols):
+                st.info("Symbols changed since the last download. Click 'Screen Momentum' to refresh prices.")
+            try:
+                with st.spinner(f"Loading prices for {len(momentum_symbols)} symbols..."):
+                    screen = load_momentum_screen(momentum_symbols)
+            except Exception as e:
+                st.error(f"Error loading price data: {str(e)}")
+                screen = None
+            
+            if screen is not None:
+                results = screen.screen(
+                    rsi_range=rsi_range,
+                    change_range=price_change,
+                    period=time_period,
+                    above_average_volume=volume_increase
+                )
+                st.subheader(f"{len(results)} of {len(screen.symbols)} stocks match")
+                st.dataframe(
+                    results,
+                    column_config={
+                        'Symbol': st.column_config.TextColumn('Symbol'),
+                        'Price': st.column_config.NumberColumn('Price', format="%.2f"),
+                        'RSI': st.column_config.NumberColumn('RSI (14)', format="%.1f"),
+                        'Price Change %': st.column_config.NumberColumn(f'Change {time_period} (%)', format="%.2f%%"),
+                        'Volume Ratio': st.column_config.NumberColumn('Volume / Avg', format="%.2f")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
     
     with tab3:
         st.header("Sentiment Screening")
         
         st.subheader("Select Sentiment Sources")
         
-        news_sentiment = st.checkbox("News Sentiment", value=True)
-        social_media = st.checkbox("Social Media", value=True)
-        analyst_ratings = st.checkbox("Analyst Ratings", value=True)
+        sources = []
+        if st.checkbox("Yahoo Finance News", value=True):
+            sources.append('yfinance')
+        if st.checkbox("Google News", value=True):
+            sources.append('gnews')
         
         sentiment_threshold = st.select_slider(
             "Sentiment Threshold",
-            options=["Very Negative", "Negative", "Neutral", "Positive", "Very Positive"],
+            options=list(SENTIMENT_LEVELS),
             value="Positive"
         )
         
-        time_range = st.radio("Time Range", ["Last 24 Hours", "Last Week", "Last Month"])
-        
-        if st.button("Screen Sentiment"):
-            st.info("Sentiment screening is a placeholder. Integration with sentiment analysis needed.")
-            # Placeholder data
-            data = {
-                'Symbol': ['AAPL', 'MSFT', 'NFLX', 'SBUX', 'DIS'],
-                'Name': ['Apple Inc.', 'Microsoft Corp', 'Netflix Inc', 'Starbucks Corp', 'Walt Disney Co'],
-                'News Sentiment': ['Positive', 'Very Positive', 'Neutral', 'Negative', 'Positive'],
-                'Social Sentiment': ['Neutral', 'Positive', 'Very Positive', 'Neutral', 'Negative'],
-                'Analyst Rating': ['Buy', 'Strong Buy', 'Hold', 'Sell', 'Buy']
-            }
-            st.dataframe(pd.DataFrame(data))
+        time_range = st.radio("Time Range", list(SENTIMENT_TIME_RANGES))
+        
+        # Scores come from the background worker's store, so filtering is a fast query
+        sentiment_store = get_sentiment_store()
+        summary = sentiment_store.summary(
+            since=datetime.now() - SENTIMENT_TIME_RANGES[time_range],
+            symbols=symbols,
+            sources=sources
+        )
+        results = summary[summary['score'] >= SENTIMENT_LEVELS[sentiment_threshold]]
+        
+        missing = sentiment_store.missing(symbols)
+        worker = get_sentiment_worker()
+        if worker.pending:
+            st.info(f"Scoring {worker.pending} symbol(s) in the background. Rerun to see new results.")
+        elif missing:
+            st.warning(f"No sentiment scores yet for: {', '.join(missing)}")
+            if st.button("Score Missing Symbols"):
+                worker.submit(missing)
+                st.info(f"Queued {len(missing)} symbol(s) for scoring in the background.")
+        
+        st.subheader(f"{len(results)} of {len(summary)} scored stocks at or above {sentiment_threshold}")
+        st.dataframe(
+            results,
+            column_config={
+                'symbol': st.column_config.TextColumn('Symbol'),
+                'score': st.column_config.ProgressColumn('Sentiment', format="%.1f", min_value=0, max_value=100),
+                'label': st.column_config.TextColumn('Label'),
+                'headlines': st.column_config.NumberColumn('Headlines'),
+                'updated': st.column_config.DatetimeColumn('Last Updated', format="YYYY-MM-DD HH:mm")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        if not results.empty:
+            with st.expander("Headlines"):
+                headline_symbol = st.selectbox("Symbol", results['symbol'])
+                headlines = sentiment_store.headlines(
+                    headline_symbol, since=datetime.now() - SENTIMENT_TIME_RANGES[time_range])
+                st.dataframe(headlines[headlines['source'].isin(sources)], hide_index=True,
+                             use_container_width=True)
     
     with tab4:
         st.header("Combined Screening")
@@ -360,30 +496,47 @@ def run_app():
         if total != 100:
             st.warning(f"Weights sum to {total}%. Consider adjusting to total 100%.")
         
-        st.subheader("Select Key Metrics from Each Category")
-        
-        metrics = st.multiselect(
-            "Select Metrics",
-            [
-                "P/E Ratio", "Dividend Yield", "Market Cap", 
-                "RSI", "Price Change", "Volume Trend", 
-                "News Sentiment", "Social Media Buzz", "Analyst Recommendations"
-            ],
-            ["P/E Ratio", "RSI", "News Sentiment"]
-        )
-        
-        if st.button("Run Combined Screen"):
-            st.info("Combined screening is a placeholder. Integration needed.")
-            # Placeholder data
-            data = {
-                'Symbol': ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'TSLA'],
-                'Name': ['Apple Inc.', 'Microsoft Corp', 'Alphabet Inc', 'NVIDIA Corp', 'Tesla Inc'],
-                'Combined Score': [87, 92, 78, 85, 72],
-                'Fundamental': [90, 85, 82, 75, 65],
-                'Momentum': [75, 90, 65, 95, 85],
-                'Sentiment': [95, 95, 85, 80, 65]
-            }
-            st.dataframe(pd.DataFrame(data))
+        top_n = st.number_input("Show Top N", min_value=1, max_value=5000, value=25, step=5)
+        
+        # Cached component scores; re-ranking is a matrix product, no analyser runs
+        component_scores = load_component_scores()
+        universe = fill_sentiment(component_scores[component_scores['symbol'].isin(symbols)])
+        
+        missing = [s for s in symbols if s not in set(universe['symbol'])]
+        pending = get_prefetcher().pending
+        if missing:
+            st.warning(f"No cached scores for: {', '.join(missing)}")
+            if st.button("Analyse Missing Symbols"):
+                analyse_and_cache(missing)
+                st.rerun()
+        if pending:
+            st.info(f"Analysing {pending} symbol(s) in the background.")
+            st.button("Refresh Scores")
+        
+        if total == 0:
+            st.info("Set at least one weight above zero to rank stocks.")
+        elif not universe.empty:
+            ranked = universe.assign(score=combine_scores(universe, {
+                'fundamental': fundamental_weight,
+                'technical': momentum_weight,
+                'sentiment': sentiment_weight
+            }))
+            ranked = ranked.dropna(subset=['score']).sort_values('score', ascending=False).head(top_n)
+            
+            st.subheader(f"Top {len(ranked)} of {len(universe)} Stocks by Combined Score")
+            st.dataframe(
+                ranked[['symbol', 'score', 'fundamental', 'technical', 'sentiment', 'updated']],
+                column_config={
+                    'symbol': st.column_config.TextColumn('Symbol'),
+                    'score': st.column_config.ProgressColumn('Combined Score', format="%.1f", min_value=0, max_value=100),
+                    'fundamental': st.column_config.NumberColumn('Fundamental', format="%.1f"),
+                    'technical': st.column_config.NumberColumn('Momentum', format="%.1f"),
+                    'sentiment': st.column_config.NumberColumn('Sentiment', format="%.1f"),
+                    'updated': st.column_config.DatetimeColumn('Last Updated', format="YYYY-MM-DD HH:mm")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
 
     # Footer
     st.markdown("---")
@@ -1,93 +1,189 @@
+import logging
+from typing import Callable, Dict, Mapping, Optional
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
 from utils import fetch_data  # run script directly
-from strategy import Strategy   # run script directly
-# from .utils import fetch_data   # relative import for tests
-# from .strategy import Strategy   # relative import for tests
+from scoring import ScorePanel  # run script directly
+from ledger import EquityCurve, PositionBook, TradeLog  # run script directly
+from metrics import StreamingMetrics  # run script directly
 
 class Backtester:
-    def __init__(self, strategy, symbols: list, start_date: str, 
-                 initial_capital: float = 100000):
+    def __init__(self, strategy, symbols: list, start_date: str,
+                 initial_capital: float = 100000, point_in_time: bool = True,
+                 warmup_days: int = 120,
+                 fundamental_history: Optional[Mapping[str, pd.Series]] = None,
+                 sentiment_history: Optional[Mapping[str, pd.Series]] = None,
+                 buy_threshold: float = 70, sell_threshold: float = 30,
+                 position_fraction: float = 0.1,
+                 weights: Optional[Dict[str, float]] = None,
+                 signal_weights: Optional[Dict[str, float]] = None,
+                 max_drawdown_limit: Optional[float] = None,
+                 record_equity: bool = True):
         self.strategy = strategy
         self.symbols = symbols
         self.start_date = start_date
         self.initial_capital = initial_capital
-        self.positions = {}
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.position_fraction = position_fraction  # Share of cash put into each new position
+        # Composite and technical weights default to the strategy's and the analyser's own
+        self.weights = dict(weights if weights is not None else strategy.weights)
+        self.signal_weights = signal_weights
+        # Stop the run once the peak-to-trough drawdown exceeds this many percent
+        self.max_drawdown_limit = max_drawdown_limit
+        # Sweeps only need the metrics, so the per-bar curve can be skipped
+        self.record_equity = record_equity
+        # Point-in-time mode scores each bar only with information available on
+        # that date; otherwise today's Strategy analysis is applied to every bar
+        self.point_in_time = point_in_time
+        self.warmup_days = warmup_days
+        self.fundamental_history = fundamental_history
+        self.sentiment_history = sentiment_history
+        self.panel: Optional[ScorePanel] = None
+        # Precomputed composite scores aligned with the panel, e.g. shared across folds
+        self.scores: Optional[np.ndarray] = None
+        # Columnar books, sized from the panel when the run starts
+        self.positions: Optional[PositionBook] = None
         self.cash = initial_capital
-        self.trades = []
-        self.portfolio_values = []
+        self.trades: Optional[TradeLog] = None
+        self.portfolio_values: Optional[EquityCurve] = None
+        self.metrics: Optional[StreamingMetrics] = None
+        self.stopped_early = False
 
-    def run(self):
-        data = {s: fetch_data(s) for s in self.symbols}
-        dates = data[self.symbols[0]].index
-        
-        for date in dates:
-            signals = {s: self.strategy.analyze_stock(s) for s in self.symbols}
-            self._process_signals(signals, date, data)
-            self._update_portfolio(date, data)
+    def load_data(self) -> Dict[str, pd.DataFrame]:
+        """Fetch history from `warmup_days` before start_date so indicators are ready on the first bar"""
+        start = pd.Timestamp(self.start_date) - pd.Timedelta(days=self.warmup_days)
+        data = {}
+        for symbol in self.symbols:
+            try:
+                data[symbol] = fetch_data(
+                    symbol,
+                    start_date=start.strftime('%Y-%m-%d'),
+                    end_date=datetime.now().strftime('%Y-%m-%d')
+                )
+            except Exception as e:
+                logging.error(f"Error fetching backtest data for {symbol}: {e}")
+                data[symbol] = None
+        return data
+
+    def build_panel(self, data: Optional[Dict[str, pd.DataFrame]] = None) -> ScorePanel:
+        """Precompute causal price and score series for every symbol"""
+        if data is None:
+            data = self.load_data()
+        self.panel = ScorePanel.from_price_data(
+            data,
+            fundamental_history=self.fundamental_history,
+            sentiment_history=self.sentiment_history
+        )
+        return self.panel
+
+    def _score_matrix(self) -> np.ndarray:
+        if self.point_in_time:
+            scores = self.panel.composite(self.weights, self.signal_weights)
+            if scores.size and not (scores > self.buy_threshold).any():
+                logging.warning(f"No bar scores above buy_threshold={self.buy_threshold} "
+                                f"(max {np.nanmax(scores):.1f}); the backtest will not open positions")
+            return scores
+
+        # Legacy mode: current analysis on every bar (looks ahead)
+        scores = np.full(self.panel.close.shape, np.nan)
+        for j, symbol in enumerate(self.panel.symbols):
+            result = self.strategy.get_analysis(symbol)
+            if result:
+                scores[:, j] = result['score']
+        return scores
+
+    def run(self, stop_when: Optional[Callable[[StreamingMetrics], bool]] = None):
+        """
+        Simulate from start_date and return the performance metrics.
         
+        Args:
+            stop_when: Called with the live metrics after every bar; returning
+                True ends the run early (as does max_drawdown_limit)
+        """
+        if self.panel is None:
+            self.build_panel()
+
+        scores = self.scores if self.scores is not None else self._score_matrix()
+        first_bar = self.panel.dates.searchsorted(pd.Timestamp(self.start_date))
+
+        self.positions = PositionBook(self.panel.symbols)
+        self.trades = TradeLog(self.panel.symbols)
+        self.portfolio_values = EquityCurve(
+            capacity=len(self.panel.dates) - first_bar if self.record_equity else 1
+        )
+        self.metrics = StreamingMetrics(self.initial_capital)
+        self.stopped_early = False
+        # Last known close for marking positions on days a symbol did not trade
+        self._marks = np.full(len(self.panel.symbols), np.nan)
+        if first_bar > 0:
+            self._marks = pd.DataFrame(self.panel.close[:first_bar]).ffill().to_numpy()[-1]
+
+        for i in range(first_bar, len(self.panel.dates)):
+            self._process_signals(i, scores[i])
+            self._update_portfolio(i)
+            if self._should_stop(stop_when):
+                self.stopped_early = True
+                break
+
         return self._calculate_metrics()
 
-    def _process_signals(self, signals, date, data):
-        for symbol, signal in signals.items():
-            if signal and signal['score'] > 70 and symbol not in self.positions:
-                self._execute_trade(symbol, 'BUY', date, data[symbol].loc[date])
-            elif signal and signal['score'] < 30 and symbol in self.positions:
-                self._execute_trade(symbol, 'SELL', date, data[symbol].loc[date])
+    def _process_signals(self, i, scores):
+        date = self.panel.dates[i]
+        prices = self.panel.close[i]
+        held = self.positions.held
+        tradable = ~np.isnan(prices)
+        buys = tradable & ~held & (scores > self.buy_threshold)
+        sells = tradable & held & (scores < self.sell_threshold)
+        # Only candidates are visited, in symbol order, since each buy sizes off current cash
+        for j in np.flatnonzero(buys | sells):
+            self._execute_trade(j, 'BUY' if buys[j] else 'SELL', date, prices[j])
 
-    def _execute_trade(self, symbol, action, date, price_data):
-        price = price_data['Close']
+    def _execute_trade(self, symbol, action, date, price):
         if action == 'BUY':
-            position_size = self.cash * 0.1
+            position_size = self.cash * self.position_fraction
             shares = position_size // price
             cost = shares * price
             if cost <= self.cash:
-                self.positions[symbol] = {'shares': shares, 'cost': cost}
+                self.positions.open(symbol, shares, cost)
                 self.cash -= cost
-                self.trades.append({
-                    'date': date,
-                    'symbol': symbol,
-                    'action': action,
-                    'price': price,
-                    'shares': shares
-                })
+                self.trades.record(date, symbol, TradeLog.BUY, price, shares)
+                self.metrics.record_trade(cost)
         else:  # SELL
-            position = self.positions[symbol]
-            self.cash += position['shares'] * price
-            self.trades.append({
-                'date': date,
-                'symbol': symbol,
-                'action': action,
-                'price': price,
-                'shares': position['shares']
-            })
-            del self.positions[symbol]
-
-    def _update_portfolio(self, date, data):
-        portfolio_value = self.cash
-        for symbol, position in self.positions.items():
-            portfolio_value += position['shares'] * data[symbol].loc[date, 'Close']
-        self.portfolio_values.append({
-            'date': date,
-            'value': portfolio_value
-        })
+            cost = self.positions.cost[symbol]
+            shares = self.positions.close(symbol)
+            self.cash += shares * price
+            self.trades.record(date, symbol, TradeLog.SELL, price, shares)
+            self.metrics.record_trade(shares * price, pnl=shares * price - cost)
+
+    def _update_portfolio(self, i):
+        prices = self.panel.close[i]
+        self._marks = np.where(np.isnan(prices), self._marks, prices)
+        invested = self.positions.market_value(self._marks)
+        portfolio_value = self.cash + invested
+        self.metrics.update(portfolio_value, invested)
+        if self.record_equity:
+            self.portfolio_values.record(self.panel.dates[i], portfolio_value)
+
+    def _should_stop(self, stop_when) -> bool:
+        if self.max_drawdown_limit is not None and \
+           self.metrics.max_drawdown * 100 > self.max_drawdown_limit:
+            return True
+        return bool(stop_when and stop_when(self.metrics))
 
     def _calculate_metrics(self):
-        df = pd.DataFrame(self.portfolio_values)
-        returns = df['value'].pct_change()
-        return {
-            'total_return': (df['value'].iloc[-1] / self.initial_capital - 1) * 100,
-            'sharpe_ratio': returns.mean() / returns.std() * np.sqrt(252),
-            'max_drawdown': (df['value'].max() - df['value'].min()) / df['value'].max() * 100,
-            'trades': len(self.trades)
-        }
+        results = self.metrics.summary()
+        results['stopped_early'] = self.stopped_early
+        return results
 
 if __name__ == '__main__':
+    from strategy import Strategy   # run script directly
+
     # Example usage
     symbols = ['AAPL', 'MSFT', 'GOOGL']
     strategy = Strategy(symbols)
     backtester = Backtester(strategy, symbols, '2022-01-01')
     results = backtester.run()
-    print(f"Backtest Results:\n{results}")
\ No newline at end of file
+    print(f"Backtest Results:\n{results}")
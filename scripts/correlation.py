@@ -0,0 +1,125 @@
+import logging
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed   # running script directly
+
+def standardised_returns(frames: Mapping[str, Optional[pd.DataFrame]],
+                         lookback: int = 252) -> pd.DataFrame:
+    """
+    Daily log returns over the last `lookback` bars, standardised per symbol.
+
+    Frames are OHLCV per symbol, e.g. Strategy.stock_data; None entries and
+    symbols with fewer than 20 returns are dropped. Missing returns are 0, so
+    they add nothing to any correlation.
+    """
+    closes = {s: df['Close'] for s, df in frames.items() if df is not None and not df.empty}
+    if not closes:
+        return pd.DataFrame()
+    close = pd.DataFrame(closes).sort_index().astype(np.float64).tail(lookback + 1)
+    returns = np.log(close).diff().iloc[1:]
+    returns = returns.loc[:, returns.notna().sum() >= 20]
+    std = returns.std()
+    returns = returns.loc[:, std > 0]
+    return ((returns - returns.mean()) / std[returns.columns]).fillna(0.0)
+
+def shrunk_correlation(z: np.ndarray, block: int = 256):
+    """
+    Correlation matrix of standardised returns, shrunk towards the identity.
+
+    The shrinkage intensity is the analytic Schäfer-Strimmer estimate. The
+    sums it needs, Z'Z and (Z*Z)'(Z*Z), are built one block of columns at a
+    time to keep the temporaries at block x N.
+
+    Args:
+        z: Standardised returns, one column per symbol (T x N)
+        block: Columns per block
+
+    Returns:
+        (correlation, shrinkage) with shrinkage in [0, 1]
+    """
+    t, n = z.shape
+    z2 = z * z
+    corr = np.empty((n, n))
+    variance_sum = 0.0
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        cross = z[:, start:stop].T @ z               # sum over time of z_i z_j
+        squares = z2[:, start:stop].T @ z2           # sum over time of (z_i z_j)^2
+        mean = cross / t
+        # Estimated variance of each correlation entry
+        variance = t / (t - 1) ** 3 * (squares - t * mean ** 2)
+        rows = np.arange(stop - start)
+        variance[rows, start + rows] = 0.0
+        variance_sum += variance.sum()
+        corr[start:stop] = cross / (t - 1)
+    np.fill_diagonal(corr, 0.0)
+    denominator = (corr ** 2).sum()
+    shrinkage = float(np.clip(variance_sum / denominator, 0.0, 1.0)) if denominator > 0 else 1.0
+    corr *= 1.0 - shrinkage
+    np.fill_diagonal(corr, 1.0)
+    return corr, shrinkage
+
+class CorrelationClusters:
+    """
+    Correlation clusters of a universe, for diversified stock selection.
+
+    The shrunk correlation matrix is computed once; clusters() and
+    diversify() can then be run for any ranking at O(clusters x N) cost.
+
+    Args:
+        frames: OHLCV frames per symbol, e.g. Strategy.stock_data
+        lookback: Daily bars of returns to use
+        block: Column block size for the matrix products
+    """
+    @timed('correlation_matrix')
+    def __init__(self, frames: Mapping[str, Optional[pd.DataFrame]], lookback: int = 252,
+                 block: int = 256):
+        returns = standardised_returns(frames, lookback)
+        self.symbols: List[str] = list(returns.columns)
+        self.index = {symbol: k for k, symbol in enumerate(self.symbols)}
+        if len(returns) < 2:
+            self.correlation, self.shrinkage = np.eye(len(self.symbols)), 1.0
+        else:
+            self.correlation, self.shrinkage = shrunk_correlation(returns.to_numpy(), block)
+        logging.info(f"Correlation of {len(self.symbols)} symbols, shrinkage {self.shrinkage:.2f}")
+
+    def clusters(self, order: Optional[Sequence[str]] = None, threshold: float = 0.5) -> Dict[str, int]:
+        """
+        Leader clustering: walking `order` (e.g. best score first), each symbol
+        not yet clustered leads a new cluster of every unclustered symbol whose
+        correlation with it is at least `threshold`.
+
+        Symbols without price history each form their own cluster.
+        """
+        order = list(order) if order is not None else self.symbols
+        known = [s for s in order if s in self.index]
+        positions = np.array([self.index[s] for s in known], dtype=int)
+        labels = np.full(len(known), -1)
+        if len(known):
+            similar = self.correlation[np.ix_(positions, positions)] >= threshold
+            label = 0
+            leader = 0
+            while leader < len(known):
+                labels[similar[leader] & (labels < 0)] = label
+                labels[leader] = label
+                label += 1
+                unassigned = np.flatnonzero(labels < 0)
+                leader = unassigned[0] if len(unassigned) else len(known)
+        result = dict(zip(known, labels.tolist()))
+        next_label = int(labels.max()) + 1 if len(known) else 0
+        for symbol in order:
+            if symbol not in result:
+                result[symbol] = next_label
+                next_label += 1
+        return result
+
+    def diversify(self, ranked: Sequence[str], n: int, max_per_cluster: int = 1,
+                  threshold: float = 0.5) -> List[str]:
+        """The first `n` of `ranked`, taking at most `max_per_cluster` per cluster"""
+        ranked = list(ranked)
+        labels = pd.Series(self.clusters(ranked, threshold)).reindex(ranked)
+        keep = labels.groupby(labels).cumcount() < max_per_cluster
+        return list(labels.index[keep.to_numpy()][:n])
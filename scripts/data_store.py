@@ -0,0 +1,180 @@
+import logging
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment   # running script directly
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+
+def compact_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of an OHLCV frame in compact dtypes: float32 prices and the smallest
+    integer type that holds the volume. Other columns are kept as they are.
+
+    float32 keeps about seven significant digits, well within the precision
+    of quoted prices; TA-Lib upcasts to float64 internally.
+    """
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if name in PRICE_COLUMNS:
+            column = column.astype(np.float32)
+        elif name == 'Volume':
+            column = pd.to_numeric(column.fillna(0).round(), downcast='integer')
+        columns[name] = column
+    return pd.DataFrame(columns, index=df.index)
+
+def _remove_spill_files(cache_dir: Path, symbols: set, remove_dir: bool):
+    for symbol in symbols:
+        (cache_dir / f'{symbol}.parquet').unlink(missing_ok=True)
+    symbols.clear()
+    if remove_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class SymbolDataStore(MutableMapping):
+    """
+    Dict-like store of OHLCV frames per symbol under a memory budget.
+
+    Frames are compacted on insert. When the frames held in memory exceed
+    `budget_mb`, the least recently used symbols are written to `cache_dir`
+    as Parquet and dropped from memory; reading one of them loads it back
+    transparently. Symbols stored as None (failed fetches) cost nothing.
+
+    Spill files are deleted by close(), or when the store is garbage
+    collected or the interpreter exits.
+
+    Args:
+        budget_mb: Memory budget for the frames, in MiB
+        cache_dir: Directory for evicted frames (default a private temporary
+            directory, removed with the spill files)
+    """
+    def __init__(self, budget_mb: float = 512, cache_dir=None):
+        self.budget = int(budget_mb * 2**20)
+        owns_dir = cache_dir is None
+        self.cache_dir = Path(tempfile.mkdtemp(prefix='symbol_data_') if owns_dir else cache_dir)
+        self._memory: 'OrderedDict[str, Optional[pd.DataFrame]]' = OrderedDict()
+        self._sizes = {}
+        self._on_disk = set()
+        self._finalizer = weakref.finalize(self, _remove_spill_files, self.cache_dir,
+                                           self._on_disk, owns_dir)
+        self._lock = threading.RLock()
+        self.memory_bytes = 0
+        self.evictions = 0
+
+    def _path(self, symbol: str) -> Path:
+        return self.cache_dir / f'{symbol}.parquet'
+
+    def _hold(self, symbol: str, df: Optional[pd.DataFrame]):
+        self._memory[symbol] = df
+        self._memory.move_to_end(symbol)
+        self._sizes[symbol] = frame_bytes(df)
+        self.memory_bytes += self._sizes[symbol]
+        self._evict(keep=symbol)
+
+    def _drop(self, symbol: str):
+        del self._memory[symbol]
+        self.memory_bytes -= self._sizes.pop(symbol)
+
+    def _evict(self, keep: str):
+        """Spill least recently used frames to disk until within budget"""
+        while self.memory_bytes > self.budget:
+            symbol = next((s for s in self._memory if s != keep and self._sizes[s]), None)
+            if symbol is None:
+                return
+            if symbol not in self._on_disk:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._memory[symbol].to_parquet(self._path(symbol))
+                self._on_disk.add(symbol)
+            self._drop(symbol)
+            self.evictions += 1
+            increment('data_store_evictions')
+
+    def __setitem__(self, symbol: str, df: Optional[pd.DataFrame]):
+        with self._lock:
+            if symbol in self._memory:
+                self._drop(symbol)
+            if symbol in self._on_disk:
+                # The cached copy is stale now
+                self._path(symbol).unlink(missing_ok=True)
+                self._on_disk.discard(symbol)
+            self._hold(symbol, None if df is None else compact_ohlcv(df))
+
+    def __getitem__(self, symbol: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            if symbol in self._memory:
+                self._memory.move_to_end(symbol)
+                increment('cache_hits', cache='symbol_data', tier='memory')
+                return self._memory[symbol]
+            if symbol not in self._on_disk:
+                raise KeyError(symbol)
+            try:
+                df = pd.read_parquet(self._path(symbol))
+            except Exception as e:
+                logging.error(f"Error reading cached data for {symbol}: {e}")
+                self._on_disk.discard(symbol)
+                raise KeyError(symbol)
+            increment('cache_hits', cache='symbol_data', tier='disk')
+            # Still on disk and unchanged, so a later eviction need not rewrite it
+            self._hold(symbol, df)
+            return df
+
+    def __delitem__(self, symbol: str):
+        with self._lock:
+            if symbol not in self._memory and symbol not in self._on_disk:
+                raise KeyError(symbol)
+            if symbol in self._memory:
+                self._drop(symbol)
+            if symbol in self._on_disk:
+                self._path(symbol).unlink(missing_ok=True)
+                self._on_disk.discard(symbol)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._memory or symbol in self._on_disk
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._memory) + [s for s in self._on_disk if s not in self._memory])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory) + len(self._on_disk - set(self._memory))
+
+    def clear(self):
+        with self._lock:
+            for symbol in self._on_disk:
+                self._path(symbol).unlink(missing_ok=True)
+            self._memory.clear()
+            self._sizes.clear()
+            self._on_disk.clear()
+            self.memory_bytes = 0
+
+    def close(self):
+        """Drop every frame and delete the spill files"""
+        with self._lock:
+            self.clear()
+            self._finalizer()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'symbols': len(self),
+                'in_memory': len(self._memory),
+                'on_disk': len(self._on_disk),
+                'memory_mb': self.memory_bytes / 2**20,
+                'budget_mb': self.budget / 2**20,
+                'evictions': self.evictions
+            }
@@ -1,13 +1,18 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
 
+from instrumentation import increment, timer
+
 class FundamentalAnalyser:
     def __init__(self, symbol):
+        import yfinance as yf  # Deferred so importing the analyser stays fast
+        
         self.symbol = symbol
         self.ticker = yf.Ticker(symbol)
-        self.info = self.ticker.info
+        with timer('ticker_info'):
+            self.info = self.ticker.info
+        increment('network_calls', client='yfinance.info')
         
         # Default weights and benchmarks
         self.metric_weights = {
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class _NullTimer:
+    """Shared no-op context, so disabled timers cost one attribute check"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    def __init__(self, registry: 'Instrumentation', name: str, labels: dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+class Instrumentation:
+    """
+    Counters and latency histograms for the screening pipeline.
+
+    Disabled by default: every call returns after a single flag check. Enable
+    with enable() or by setting TRADING_INSTRUMENTATION=1. Metrics are exported
+    as Prometheus text (render_prometheus/serve) or a JSON run profile.
+    """
+    def __init__(self, namespace: str = 'trading', enabled: bool = False):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all metrics, e.g. at the start of a run"""
+        with self._lock:
+            self.counters: Dict[Tuple[str, tuple], float] = {}
+            self.timers: Dict[Tuple[str, tuple], list] = {}
+            self.started = time.time()
+
+    def increment(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            # [count, total, max, per-bucket counts]
+            stats = self.timers.setdefault(key, [0, 0.0, 0.0, [0] * len(BUCKETS)])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            for k, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats[3][k] += 1
+                    break
+
+    def timer(self, name: str, **labels):
+        """Context manager timing its block into histogram `name`"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator timing every call of the function into histogram `name`"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        def label_text(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+        lines = []
+        with self._lock:
+            counters = dict(self.counters)
+            timers = {key: [s[0], s[1], s[2], list(s[3])] for key, s in self.timers.items()}
+
+        for metric in sorted({name for name, _ in counters}):
+            full = f'{self.namespace}_{metric}_total'
+            lines.append(f'# TYPE {full} counter')
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f'{full}{label_text(labels)} {value:g}')
+
+        for metric in sorted({name for name, _ in timers}):
+            full = f'{self.namespace}_{metric}_seconds'
+            lines.append(f'# TYPE {full} histogram')
+            for (name, labels), (count, total, _, buckets) in sorted(timers.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, n in zip(BUCKETS, buckets):
+                    cumulative += n
+                    lines.append(f'{full}_bucket{label_text(labels, [("le", f"{bound:g}")])} {cumulative}')
+                lines.append(f'{full}_bucket{label_text(labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{full}_sum{label_text(labels)} {total:.6f}')
+                lines.append(f'{full}_count{label_text(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def profile(self) -> dict:
+        """Per-run summary: counters, plus count/total/mean/max seconds per timer"""
+        def key_text(name, labels):
+            return name + ''.join(f'[{k}={v}]' for k, v in labels)
+
+        with self._lock:
+            return {
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'duration_seconds': time.time() - self.started,
+                'counters': {key_text(*key): value for key, value in sorted(self.counters.items())},
+                'timers': {key_text(*key): {
+                    'count': count,
+                    'total_seconds': total,
+                    'mean_seconds': total / count if count else 0.0,
+                    'max_seconds': longest
+                } for key, (count, total, longest, _) in sorted(self.timers.items())}
+            }
+
+    def write_profile(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.profile(), f, indent=2)
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve /metrics for Prometheus from a daemon thread"""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
+# Process-wide registry used by the scripts
+REGISTRY = Instrumentation(enabled=os.environ.get('TRADING_INSTRUMENTATION') == '1')
+
+def enable():
+    REGISTRY.enabled = True
+
+def disable():
+    REGISTRY.enabled = False
+
+def increment(name: str, value: float = 1, **labels):
+    REGISTRY.increment(name, value, **labels)
+
+def timer(name: str, **labels):
+    return REGISTRY.timer(name, **labels)
+
+def timed(name: str, **labels):
+    return REGISTRY.timed(name, **labels)
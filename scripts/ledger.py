@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+class ColumnBuffer:
+    """
+    Typed NumPy columns with amortised O(1) appends.
+
+    Capacity doubles when full, so a run allocates O(log n) times and holds at
+    most 2x the rows it needs. to_frame() wraps the filled slices without
+    copying them.
+    """
+    def __init__(self, dtypes: Dict[str, str], capacity: int = 1024):
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        self.columns = {name: np.empty(max(capacity, 1), dtype=dtype)
+                        for name, dtype in self.dtypes.items()}
+        self.size = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def _grow(self):
+        for name, column in self.columns.items():
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, **values):
+        if self.size == self.capacity:
+            self._grow()
+        for name, value in values.items():
+            self.columns[name][self.size] = value
+        self.size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the filled part of one column"""
+        return self.columns[name][:self.size]
+
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name) for name in self.columns}, copy=False)
+
+class TradeLog(ColumnBuffer):
+    """
+    Executed trades. Orders fill immediately at the bar's close in Backtester,
+    so each row is both the order and its fill. Symbols are stored as codes
+    into the shared symbol list.
+    """
+    BUY, SELL = 1, -1
+
+    def __init__(self, symbols: List[str], capacity: int = 1024):
+        super().__init__({
+            'date': 'datetime64[ns]',
+            'symbol': 'int32',
+            'side': 'int8',
+            'price': 'float64',
+            'shares': 'float64'
+        }, capacity)
+        self.symbols = symbols
+
+    def record(self, date, symbol: int, side: int, price: float, shares: float):
+        self.append(date=np.datetime64(date, 'ns'), symbol=symbol, side=side,
+                    price=price, shares=shares)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Trades with readable symbol and action columns"""
+        df = super().to_frame()
+        df['symbol'] = pd.Categorical.from_codes(df['symbol'], categories=self.symbols)
+        df['action'] = np.where(df['side'] == self.BUY, 'BUY', 'SELL')
+        return df
+
+class EquityCurve(ColumnBuffer):
+    """Portfolio value per bar"""
+    def __init__(self, capacity: int = 1024):
+        super().__init__({'date': 'datetime64[ns]', 'value': 'float64'}, capacity)
+
+    def record(self, date, value: float):
+        self.append(date=np.datetime64(date, 'ns'), value=value)
+
+    def to_series(self) -> pd.Series:
+        return pd.Series(self.column('value'), index=pd.DatetimeIndex(self.column('date')),
+                         name='value', copy=False)
+
+class PositionBook:
+    """
+    Open positions as fixed-size arrays indexed by symbol code.
+
+    Memory depends only on the universe size, and marking the whole book to
+    market is a single dot product.
+    """
+    def __init__(self, symbols: List[str]):
+        self.symbols = symbols
+        self.shares = np.zeros(len(symbols))
+        self.cost = np.zeros(len(symbols))
+        self.held = np.zeros(len(symbols), dtype=bool)
+
+    def open(self, symbol: int, shares: float, cost: float):
+        self.shares[symbol] = shares
+        self.cost[symbol] = cost
+        self.held[symbol] = True
+
+    def close(self, symbol: int) -> float:
+        """Remove a position and return its share count"""
+        shares = self.shares[symbol]
+        self.shares[symbol] = 0
+        self.cost[symbol] = 0
+        self.held[symbol] = False
+        return shares
+
+    def market_value(self, prices: np.ndarray) -> float:
+        return float(np.dot(self.shares[self.held], prices[self.held]))
+
+    def __contains__(self, symbol: int) -> bool:
+        return bool(self.held[symbol])
+
+    def __len__(self) -> int:
+        return int(self.held.sum())
+
+    def to_frame(self) -> pd.DataFrame:
+        held = np.flatnonzero(self.held)
+        return pd.DataFrame({
+            'shares': self.shares[held],
+            'cost': self.cost[held]
+        }, index=pd.Index([self.symbols[j] for j in held], name='symbol'))
@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+EXCHANGE_TZ = ZoneInfo('America/New_York')
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday (Mon=0) of the month; n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def _observed(day: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> Dict[date, str]:
+    """
+    Full-day NYSE closures for a year, from the exchange's standing rules.
+
+    One-off closures (e.g. national days of mourning) are not included.
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3): "Martin Luther King Jr. Day",
+        _nth_weekday(year, 2, 0, 3): "Washington's Birthday",
+        _easter(year) - timedelta(days=2): "Good Friday",
+        _nth_weekday(year, 5, 0, -1): "Memorial Day",
+        _observed(date(year, 7, 4)): "Independence Day",
+        _nth_weekday(year, 9, 0, 1): "Labor Day",
+        _nth_weekday(year, 11, 3, 4): "Thanksgiving Day",
+        _observed(date(year, 12, 25)): "Christmas Day",
+    }
+    # A Saturday New Year's Day is not observed on the Friday before
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    return holidays
+
+@lru_cache(maxsize=None)
+def nyse_early_closes(year: int) -> Dict[date, time]:
+    """Half days, when the market closes at 13:00"""
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    holidays = nyse_holidays(year)
+    return {day: time(13, 0) for day in candidates
+            if day.weekday() < 5 and day not in holidays}
+
+class MarketCalendar:
+    """
+    Regular trading sessions of a US exchange (NYSE/Nasdaq hours by default).
+
+    Datetimes passed in may be naive (taken as exchange time) or aware; all
+    returned datetimes are aware, in the exchange time zone.
+    """
+    def __init__(self, open_time: time = time(9, 30), close_time: time = time(16, 0),
+                 tz: ZoneInfo = EXCHANGE_TZ):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.tz = tz
+
+    def _local(self, moment: datetime) -> datetime:
+        if moment.tzinfo is None:
+            return moment.replace(tzinfo=self.tz)
+        return moment.astimezone(self.tz)
+
+    def is_holiday(self, day: date) -> bool:
+        return day in nyse_holidays(day.year)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and not self.is_holiday(day)
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Open and close of the day's session, or None when the market is shut"""
+        if not self.is_trading_day(day):
+            return None
+        close_time = nyse_early_closes(day.year).get(day, self.close_time)
+        return (datetime.combine(day, self.open_time, self.tz),
+                datetime.combine(day, close_time, self.tz))
+
+    def is_open(self, moment: datetime) -> bool:
+        moment = self._local(moment)
+        session = self.session(moment.date())
+        return session is not None and session[0] <= moment < session[1]
+
+    def next_trading_day(self, day: date) -> date:
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def previous_trading_day(self, day: date) -> date:
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def next_open(self, moment: datetime) -> datetime:
+        """Start of the next session after `moment` (or the current one if not yet open)"""
+        moment = self._local(moment)
+        session = self.session(moment.date())
+        if session is not None and moment < session[0]:
+            return session[0]
+        return self.session(self.next_trading_day(moment.date()))[0]
+
+    def last_close(self, moment: datetime) -> datetime:
+        """End of the most recent session that closed at or before `moment`"""
+        moment = self._local(moment)
+        session = self.session(moment.date())
+        if session is not None and moment >= session[1]:
+            return session[1]
+        return self.session(self.previous_trading_day(moment.date()))[1]
+
+if __name__ == '__main__':
+    calendar = MarketCalendar()
+    now = datetime.now(EXCHANGE_TZ)
+    print(f"Now: {now:%Y-%m-%d %H:%M %Z}, market {'open' if calendar.is_open(now) else 'closed'}")
+    print(f"Next open: {calendar.next_open(now):%Y-%m-%d %H:%M %Z}")
+    print(f"Holidays {now.year}:")
+    for day, name in sorted(nyse_holidays(now.year).items()):
+        print(f"  {day}: {name}")
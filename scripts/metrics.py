@@ -0,0 +1,118 @@
+import math
+from typing import Optional
+
+class StreamingMetrics:
+    """
+    Online backtest performance metrics with O(1) work and memory per bar.
+
+    Return moments use Welford/Terriberry updates, drawdown tracks the running
+    peak, and exposure, turnover and win rate are running sums. summary() can
+    be called at any point in a run, so callers can stop bad configurations
+    early without keeping the equity curve.
+    """
+    def __init__(self, initial_capital: float, periods_per_year: int = 252):
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+
+        self.bars = 0
+        self.value = initial_capital
+        self._previous: Optional[float] = None
+
+        # Return moments
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._m3 = 0.0
+        self._m4 = 0.0
+        self._downside_sq = 0.0
+
+        # Drawdown
+        self.peak = initial_capital
+        self.max_drawdown = 0.0
+        self.drawdown_bars = 0
+        self.max_drawdown_bars = 0
+
+        # Exposure, turnover and trades
+        self._exposure_sum = 0.0
+        self._equity_sum = 0.0
+        self.traded_value = 0.0
+        self.trades = 0
+        self.closed_trades = 0
+        self.winning_trades = 0
+
+    def update(self, value: float, invested: float = 0.0):
+        """Record one bar's portfolio value and the part of it held in positions"""
+        self.bars += 1
+        self.value = value
+        self._equity_sum += value
+        if value > 0:
+            self._exposure_sum += invested / value
+
+        if self._previous:
+            self._update_moments(value / self._previous - 1)
+        self._previous = value
+
+        if value >= self.peak:
+            self.peak = value
+            self.drawdown_bars = 0
+        else:
+            self.drawdown_bars += 1
+            self.max_drawdown = max(self.max_drawdown, 1 - value / self.peak)
+            self.max_drawdown_bars = max(self.max_drawdown_bars, self.drawdown_bars)
+
+    def _update_moments(self, r: float):
+        n1 = self.n
+        self.n += 1
+        delta = r - self.mean
+        delta_n = delta / self.n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * n1
+        self.mean += delta_n
+        self._m4 += term * delta_n2 * (self.n * self.n - 3 * self.n + 3) \
+            + 6 * delta_n2 * self._m2 - 4 * delta_n * self._m3
+        self._m3 += term * delta_n * (self.n - 2) - 3 * delta_n * self._m2
+        self._m2 += term
+        if r < 0:
+            self._downside_sq += r * r
+
+    def record_trade(self, notional: float, pnl: Optional[float] = None):
+        """Record a fill; pass `pnl` when the trade closes a position"""
+        self.trades += 1
+        self.traded_value += abs(notional)
+        if pnl is not None:
+            self.closed_trades += 1
+            if pnl > 0:
+                self.winning_trades += 1
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def drawdown(self) -> float:
+        """Current fall from the running peak, as a fraction"""
+        return 1 - self.value / self.peak if self.peak > 0 else 0.0
+
+    def summary(self) -> dict:
+        """All metrics as of the last bar; percentages match the old Backtester output"""
+        std = math.sqrt(self.variance) if self.n > 1 else math.nan
+        annualise = math.sqrt(self.periods_per_year)
+        downside = math.sqrt(self._downside_sq / self.n) if self.n else math.nan
+        mean_equity = self._equity_sum / self.bars if self.bars else math.nan
+
+        return {
+            'total_return': (self.value / self.initial_capital - 1) * 100,
+            'sharpe_ratio': self.mean / std * annualise if std else math.nan,
+            'sortino_ratio': self.mean / downside * annualise if downside else math.nan,
+            'volatility': std * annualise * 100,
+            'skewness': (math.sqrt(self.n) * self._m3 / self._m2 ** 1.5) if self._m2 else math.nan,
+            'kurtosis': (self.n * self._m4 / self._m2 ** 2 - 3) if self._m2 else math.nan,
+            'max_drawdown': self.max_drawdown * 100,
+            'current_drawdown': self.drawdown * 100,
+            'max_drawdown_bars': self.max_drawdown_bars,
+            'exposure': self._exposure_sum / self.bars * 100 if self.bars else math.nan,
+            'turnover': self.traded_value / mean_equity if self.bars else math.nan,
+            'win_rate': self.winning_trades / self.closed_trades * 100 if self.closed_trades else math.nan,
+            'trades': self.trades,
+            'bars': self.bars
+        }
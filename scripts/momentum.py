@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment, timed   # running script directly
+
+class MomentumScreen:
+    """
+    Cross-sectional momentum screen over a panel of daily closes and volumes.
+
+    Indicators are computed once per panel for every look-back period, so
+    screen() with new slider values only applies boolean masks.
+
+    Args:
+        close: Closing prices, one column per symbol, indexed by date
+        volume: Volumes with the same shape as `close`
+    """
+    # Look-back periods in trading days
+    PERIODS = {
+        '1 Week': 5,
+        '1 Month': 21,
+        '3 Months': 63,
+        '6 Months': 126,
+        '1 Year': 252
+    }
+    RSI_PERIOD = 14    # as TechnicalAnalyser
+
+    def __init__(self, close: pd.DataFrame, volume: pd.DataFrame):
+        import talib
+        close = close.sort_index()
+        volume = volume.reindex(index=close.index, columns=close.columns)
+        self.symbols = list(close.columns)
+        values = close.to_numpy(dtype=np.float64)
+        volumes = volume.to_numpy(dtype=np.float64)
+
+        # Latest valid close per symbol, so stale or short histories still line up
+        valid = ~np.isnan(values)
+        last = np.where(valid.any(axis=0), len(values) - 1 - np.argmax(valid[::-1], axis=0), -1)
+        columns = np.arange(len(self.symbols))
+        self.price = np.where(last >= 0, values[np.maximum(last, 0), columns], np.nan)
+
+        # TA-Lib works per series; this is the only per-symbol loop
+        self.rsi = np.full(len(self.symbols), np.nan)
+        for k in range(len(self.symbols)):
+            series = values[:, k][valid[:, k]]
+            if len(series) > self.RSI_PERIOD:
+                self.rsi[k] = talib.RSI(series, timeperiod=self.RSI_PERIOD)[-1]
+        increment('talib_calls', len(self.symbols))
+
+        # cumulative[i] is the total volume of the bars before i
+        cumulative = np.vstack([np.zeros(len(self.symbols)), np.nancumsum(volumes, axis=0)])
+        latest = np.where(last >= 0, volumes[np.maximum(last, 0), columns], np.nan)
+        self.change = {}
+        self.volume_ratio = {}
+        for name, bars in self.PERIODS.items():
+            start = last - bars
+            ok = start >= 0
+            base = np.where(ok, values[np.maximum(start, 0), columns], np.nan)
+            self.change[name] = (self.price / base - 1) * 100
+
+            # Latest volume against the average of the `bars` bars before it
+            total = cumulative[np.maximum(last, 0), columns] - cumulative[np.maximum(start, 0), columns]
+            average = np.where(ok, total / bars, np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.volume_ratio[name] = np.where(average > 0, latest / average, np.nan)
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, Optional[pd.DataFrame]]) -> 'MomentumScreen':
+        """From OHLCV frames per symbol, e.g. Strategy.stock_data; None entries are skipped"""
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        close = pd.DataFrame({s: df['Close'] for s, df in frames.items()})
+        volume = pd.DataFrame({s: df['Volume'] for s, df in frames.items()})
+        return cls(close, volume)
+
+    @classmethod
+    @timed('momentum_download')
+    def download(cls, symbols: List[str], days: int = 400) -> 'MomentumScreen':
+        """
+        Fetch closes and volumes for all symbols in one batched yfinance request.
+
+        Args:
+            symbols: Ticker symbols
+            days: Calendar days of history (enough for the 1 Year period)
+        """
+        import yfinance as yf
+        end = datetime.now()
+        increment('network_calls', client='yfinance.download')
+        data = yf.download(list(symbols), start=end - timedelta(days=days), end=end,
+                           progress=False, auto_adjust=True, threads=True)
+        if data.empty:
+            raise ValueError("No price data found")
+        close, volume = data['Close'], data['Volume']
+        if isinstance(close, pd.Series):
+            close, volume = close.to_frame(symbols[0]), volume.to_frame(symbols[0])
+        missing = [s for s in symbols if s not in close.columns or close[s].isna().all()]
+        if missing:
+            logging.error(f"No price data for: {', '.join(missing)}")
+        return cls(close.drop(columns=missing, errors='ignore'),
+                   volume.drop(columns=missing, errors='ignore'))
+
+    def metrics(self, period: str = '1 Month') -> pd.DataFrame:
+        """Price, RSI, percentage change and volume ratio of every symbol for a period"""
+        if period not in self.PERIODS:
+            raise ValueError(f"Invalid period: {period}")
+        return pd.DataFrame({
+            'Symbol': self.symbols,
+            'Price': self.price,
+            'RSI': self.rsi,
+            'Price Change %': self.change[period],
+            'Volume Ratio': self.volume_ratio[period]
+        })
+
+    @timed('momentum_screen')
+    def screen(self, rsi_range: Tuple[float, float] = (0, 100),
+               change_range: Tuple[float, float] = (-100, np.inf),
+               period: str = '1 Month',
+               above_average_volume: bool = False) -> pd.DataFrame:
+        """
+        Symbols whose RSI and price change fall within the (inclusive) ranges,
+        strongest price change first.
+
+        Symbols without enough history for the period are excluded.
+        """
+        if period not in self.PERIODS:
+            raise ValueError(f"Invalid period: {period}")
+        change = self.change[period]
+        mask = ((self.rsi >= rsi_range[0]) & (self.rsi <= rsi_range[1]) &
+                (change >= change_range[0]) & (change <= change_range[1]))
+        if above_average_volume:
+            mask &= self.volume_ratio[period] > 1
+        return (self.metrics(period)[mask]
+                .sort_values('Price Change %', ascending=False)
+                .reset_index(drop=True))
+
+if __name__ == '__main__':
+    screen = MomentumScreen.download(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'TSLA'])
+    print(screen.screen(rsi_range=(30, 70), change_range=(-10, 50), period='3 Months').to_string())
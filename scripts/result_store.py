@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:     # Windows: writers are only serialised within a process
+    fcntl = None
+
+COMPONENTS = ('technical', 'fundamental', 'sentiment')
+
+DEFAULT_WEIGHTS = {
+    'technical': 0.4,
+    'fundamental': 0.4,
+    'sentiment': 0.2
+}
+
+def results_frame(results: Iterable[Optional[dict]]) -> pd.DataFrame:
+    """
+    Component scores as a frame with one row per symbol, from result dicts
+    such as Strategy.analysis_results.values() or ResultStore.results().
+    Failed (None) results are skipped; missing components are NaN.
+    """
+    rows = [r for r in results if r]
+    frame = pd.DataFrame(rows, columns=['symbol', *COMPONENTS, 'updated'])
+    frame[list(COMPONENTS)] = frame[list(COMPONENTS)].astype(float)
+    return frame
+
+def combine_scores(scores: pd.DataFrame, weights: Dict[str, float]) -> np.ndarray:
+    """
+    Weighted total score for every row of a results_frame in one matrix product.
+
+    As in Strategy.analyse_symbol, weights are normalised over the components
+    a symbol actually has; rows with none of the weighted components are NaN.
+    """
+    values = scores[list(COMPONENTS)].to_numpy(dtype=np.float64)
+    w = np.array([weights.get(name, 0.0) for name in COMPONENTS], dtype=np.float64)
+    present = ~np.isnan(values)
+    weight = present @ w
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(weight > 0, np.where(present, values, 0.0) @ w / weight, np.nan)
+
+class ResultStore:
+    """
+    Latest component scores per symbol, shared between processes via a JSON file.
+
+    The refresh scheduler publishes scores and flushes them; readers (the
+    app, the API) call get_analysis/results and reload the file only when it
+    has changed on disk. Writes go to a temporary file that is renamed into
+    place, so readers never see a partial file, and a flush first merges
+    anything another writer flushed meanwhile. Writers in other processes are
+    kept out of that merge and write by an exclusive lock on <path>.lock.
+
+    Each symbol is stored as
+        {'technical': {'score': 61.2, 'updated': 1718000000.0}, ...}
+    """
+    def __init__(self, path='results/scores.json', weights: Optional[Dict[str, float]] = None):
+        self.path = Path(path)
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.revision = 0
+        self.updated: Optional[float] = None
+        self.symbols: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        self._loaded_stat = None
+        self._dirty = False
+        self.reload()
+
+    def _stat(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the file if it changed since the last load; True if it did.
+
+        Scores published here but not yet flushed are kept: the file is merged
+        in as flush() would, rather than replacing them.
+        """
+        with self._lock:
+            stat = self._stat()
+            if stat is None or (stat == self._loaded_stat and not force):
+                return False
+            if self._dirty:
+                if force:
+                    self._loaded_stat = None
+                self._merge_from_disk()
+                return True
+            with open(self.path) as f:
+                state = json.load(f)
+            self.revision = state.get('revision', 0)
+            self.updated = state.get('updated')
+            self.symbols = state.get('symbols', {})
+            self._loaded_stat = stat
+        return True
+
+    def publish(self, symbol: str, component: str, score: float,
+                updated: Optional[float] = None, **extra):
+        """
+        Record a component score in memory; flush() makes it visible to readers.
+
+        Args:
+            symbol: Stock symbol
+            component: 'technical', 'fundamental' or 'sentiment'
+            score: Score in [0, 100]
+            updated: Unix time the score was computed (default now)
+            extra: Additional JSON-serialisable fields kept with the score
+        """
+        if component not in COMPONENTS:
+            raise ValueError(f"Invalid component: {component}")
+        with self._lock:
+            self.symbols.setdefault(symbol, {})[component] = {
+                'score': float(score),
+                'updated': updated if updated is not None else time.time(),
+                **extra
+            }
+            self._dirty = True
+
+    def publish_analysis(self, result: dict, updated: Optional[float] = None):
+        """Publish every component of a Strategy analysis result"""
+        for name in COMPONENTS:
+            if result.get(name) is not None:
+                self.publish(result['symbol'], name, result[name], updated)
+
+    def _merge_from_disk(self):
+        """
+        Fold in scores another process flushed since our last load, keeping
+        the newer score per (symbol, component).
+        """
+        stat = self._stat()
+        if stat is None or stat == self._loaded_stat:
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        self.revision = max(self.revision, state.get('revision', 0))
+        self.updated = state.get('updated', self.updated)
+        self._loaded_stat = stat
+        for symbol, components in state.get('symbols', {}).items():
+            entry = self.symbols.setdefault(symbol, {})
+            for name, value in components.items():
+                if name not in entry or value['updated'] > entry[name]['updated']:
+                    entry[name] = value
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with writers in other processes"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + '.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield   # Closing the file releases the lock
+
+    def flush(self) -> bool:
+        """Write pending scores to disk as a new revision; False if nothing changed"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            with self._file_lock():
+                self._merge_from_disk()
+                self.revision += 1
+                self.updated = time.time()
+                state = {'revision': self.revision, 'updated': self.updated, 'symbols': self.symbols}
+                tmp = self.path.with_name(self.path.name + f'.{os.getpid()}.tmp')
+                with open(tmp, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp, self.path)
+                self._loaded_stat = self._stat()
+            self._dirty = False
+        return True
+
+    def component(self, symbol: str, component: str) -> Optional[dict]:
+        return self.symbols.get(symbol, {}).get(component)
+
+    def get_analysis(self, symbol: str) -> Optional[dict]:
+        """
+        Strategy-style result for a symbol.
+
+        The total score is re-weighted over the components that have been
+        computed so far; missing components are None.
+        """
+        entry = self.symbols.get(symbol)
+        if not entry:
+            return None
+        scores = {name: entry[name]['score'] if name in entry else None for name in COMPONENTS}
+        present = [name for name in COMPONENTS if scores[name] is not None]
+        weight = sum(self.weights[name] for name in present)
+        total = sum(scores[name] * self.weights[name] for name in present) / weight if weight else None
+        return {
+            'symbol': symbol,
+            'score': total,
+            **scores,
+            'updated': max(entry[name]['updated'] for name in present) if present else None
+        }
+
+    def results(self) -> List[dict]:
+        """get_analysis for every stored symbol"""
+        return [r for r in (self.get_analysis(s) for s in sorted(self.symbols)) if r]
+
+    def to_frame(self) -> pd.DataFrame:
+        """results() as a results_frame, with 'updated' as datetimes"""
+        frame = results_frame(self.results())
+        frame['updated'] = pd.to_datetime(frame['updated'], unit='s')
+        return frame
@@ -0,0 +1,149 @@
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+def block_bootstrap(returns: np.ndarray, n_paths: int = 10000, block_size: int = 20,
+                    seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Circular block bootstrap of a return series.
+
+    Blocks of consecutive returns keep short-range autocorrelation and
+    volatility clustering intact while reshuffling the overall order.
+
+    Returns:
+        Array of shape (n_paths, len(returns)) of resampled returns
+    """
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)  # Ceiling division
+
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    index = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n] % n
+    return returns[index]
+
+def shuffle_trades(contributions: np.ndarray, n_paths: int = 10000, replace: bool = False,
+                   seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Reorder (or resample with `replace`) per-trade portfolio returns.
+
+    Shuffling keeps the total return but changes the drawdown path; resampling
+    also varies which trades happened.
+
+    Returns:
+        Array of shape (n_paths, len(contributions))
+    """
+    contributions = np.asarray(contributions, dtype=float)
+    rng = np.random.default_rng(seed)
+    if replace:
+        index = rng.integers(0, len(contributions), size=(n_paths, len(contributions)))
+    else:
+        index = rng.random((n_paths, len(contributions))).argsort(axis=1)
+    return contributions[index]
+
+def trade_contributions(trades: pd.DataFrame, equity: pd.Series) -> np.ndarray:
+    """
+    Profit of each closed trade as a fraction of the portfolio value before it closed.
+
+    Backtester holds at most one lot per symbol, so every SELL closes the
+    preceding BUY of the same symbol.
+    """
+    trades = trades.sort_values(['symbol', 'date'], kind='stable')
+    entry_price = trades.groupby('symbol', observed=True)['price'].shift()
+    sells = trades['action'] == 'SELL'
+    pnl = (trades['price'] - entry_price)[sells] * trades['shares'][sells]
+
+    # Value on the bar before the exit, so the trade's own result is excluded
+    before = equity.shift().fillna(equity.iloc[0])
+    base = before.reindex(trades['date'][sells]).to_numpy()
+    return (pnl.to_numpy() / base)[np.argsort(trades['date'][sells].to_numpy(), kind='stable')]
+
+def path_metrics(returns: np.ndarray, periods_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """Total return, Sharpe ratio and max drawdown (percentages) for every path at once"""
+    returns = np.atleast_2d(returns)
+    equity = np.cumprod(1 + returns, axis=1)
+    peaks = np.maximum.accumulate(np.maximum(equity, 1), axis=1)
+    std = returns.std(axis=1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = returns.mean(axis=1) / std * np.sqrt(periods_per_year)
+    return {
+        'total_return': (equity[:, -1] - 1) * 100,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': (1 - equity / peaks).max(axis=1) * 100
+    }
+
+def confidence_intervals(metrics: Dict[str, np.ndarray],
+                         quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+                         observed: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """One row per metric with its simulated mean and quantiles"""
+    rows = {}
+    for name, values in metrics.items():
+        row = {'observed': (observed or {}).get(name, np.nan), 'mean': np.nanmean(values)}
+        for q, value in zip(quantiles, np.nanquantile(values, quantiles)):
+            row[f'p{q * 100:g}'] = value
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+class RobustnessAnalysis:
+    """
+    Monte Carlo view of a finished backtest.
+
+    Args:
+        equity: Portfolio value per bar (Backtester.portfolio_values.to_series())
+        trades: Trade log frame (Backtester.trades.to_frame())
+    """
+    def __init__(self, equity: pd.Series, trades: Optional[pd.DataFrame] = None,
+                 periods_per_year: int = 252):
+        self.equity = equity
+        self.returns = equity.pct_change().dropna().to_numpy()
+        self.trades = trades
+        self.periods_per_year = periods_per_year
+
+    @classmethod
+    def from_backtester(cls, backtester) -> 'RobustnessAnalysis':
+        return cls(backtester.portfolio_values.to_series(), backtester.trades.to_frame())
+
+    def observed(self) -> Dict[str, float]:
+        return {name: values[0] for name, values in
+                path_metrics(self.returns, self.periods_per_year).items()}
+
+    def bootstrap(self, n_paths: int = 10000, block_size: int = 20,
+                  seed: Optional[int] = 0) -> pd.DataFrame:
+        """Confidence intervals from block-bootstrapped daily returns"""
+        paths = block_bootstrap(self.returns, n_paths, block_size, seed)
+        return confidence_intervals(path_metrics(paths, self.periods_per_year),
+                                    observed=self.observed())
+
+    def trade_shuffle(self, n_paths: int = 10000, replace: bool = False,
+                      seed: Optional[int] = 0) -> pd.DataFrame:
+        """
+        Confidence intervals from reordered closed trades.
+
+        Paths are per trade rather than per bar, so only total return and
+        drawdown are reported.
+        """
+        if self.trades is None:
+            raise ValueError("Trade shuffling needs the trade log")
+        contributions = trade_contributions(self.trades, self.equity)
+        if len(contributions) == 0:
+            raise ValueError("No closed trades to shuffle")
+        paths = shuffle_trades(contributions, n_paths, replace, seed)
+        metrics = path_metrics(paths)
+        del metrics['sharpe_ratio']
+        return confidence_intervals(metrics)
+
+if __name__ == '__main__':
+    from backtest import Backtester  # run script directly
+
+    # Example: how much of the result depends on the order of returns and trades?
+    backtester = Backtester(None, ['AAPL', 'MSFT', 'GOOGL'], '2020-01-01',
+                            weights={'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2})
+    print(backtester.run())
+
+    analysis = RobustnessAnalysis.from_backtester(backtester)
+    print("\nBlock bootstrap:")
+    print(analysis.bootstrap())
+    if backtester.metrics.closed_trades:
+        print("\nTrade shuffle:")
+        print(analysis.trade_shuffle())
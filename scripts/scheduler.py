@@ -0,0 +1,279 @@
+"""
+Long-running refresh daemon that keeps a ResultStore up to date.
+
+Each (component, symbol) pair is refreshed on its own cadence, but only inside
+the component's trading window: technical scores while the market is open,
+sentiment through the extended news day, fundamentals once a trading day.
+Weekends and exchange holidays are skipped. Symbols are given fixed phases
+across the interval, so refreshes (and data-provider requests) are spread
+evenly instead of arriving in bursts.
+
+Usage:
+    python scripts/scheduler.py --universe tickers.txt --store results/scores.json
+    python scripts/scheduler.py --sp500 --technical-interval 5 --metrics-port 9108
+"""
+import argparse
+import heapq
+import logging
+import math
+import signal
+import sys
+import threading
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import setup_logging, fetch_data, log_context         # running script directly
+from universe import UniverseRegistry                            # running script directly
+from market_calendar import MarketCalendar, EXCHANGE_TZ          # running script directly
+from result_store import ResultStore                             # running script directly
+from sentiment_store import SentimentStore                       # running script directly
+from sentiment_history import SentimentHistory                   # running script directly
+from instrumentation import REGISTRY, increment, timer           # running script directly
+
+# Refresh interval (seconds) and trading window per component
+REFRESH_CADENCES = {
+    'technical': {'interval': 15 * 60, 'window': 'session'},
+    'sentiment': {'interval': 30 * 60, 'window': 'extended'},
+    'fundamental': {'interval': 24 * 60 * 60, 'window': 'trading_day'},
+}
+
+# Pre/post-market hours in which news is still worth scoring
+EXTENDED_HOURS = (dtime(7, 0), dtime(20, 0))
+
+# Keep refreshing briefly after the close so the final daily bar is scored
+CLOSE_GRACE = timedelta(minutes=20)
+
+class RefreshScheduler:
+    """
+    Time-ordered queue of (component, symbol) refreshes gated by the exchange calendar.
+
+    Args:
+        symbols: Universe to keep refreshed
+        store: ResultStore the scores are published to
+        refreshers: Callable per component returning the new score for a symbol,
+            or None if nothing changed. Defaults to the Strategy analysers.
+        cadences: Overrides for REFRESH_CADENCES
+        calendar: Exchange calendar (default NYSE hours)
+        flush_interval: Seconds between writes of the store to disk
+    """
+    def __init__(self, symbols: List[str], store: ResultStore,
+                 refreshers: Optional[Dict[str, Callable[[str], Optional[float]]]] = None,
+                 cadences: Optional[Dict[str, dict]] = None,
+                 calendar: Optional[MarketCalendar] = None,
+                 flush_interval: float = 10.0):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.store = store
+        self.calendar = calendar or MarketCalendar()
+        self.cadences = {name: dict(cadence) for name, cadence in REFRESH_CADENCES.items()}
+        for name, cadence in (cadences or {}).items():
+            self.cadences[name].update(cadence)
+        self.refreshers = refreshers if refreshers is not None else default_refreshers()
+        self.flush_interval = flush_interval
+        self.queue: List[Tuple[float, int, str, str]] = []
+        self._seq = 0
+        self._last_flush = 0.0
+        self.scheduled = False
+
+    def window(self, component: str, day) -> Optional[Tuple[datetime, datetime]]:
+        """Start and end of the component's refresh window on `day`, None if closed"""
+        session = self.calendar.session(day)
+        if session is None:
+            return None
+        kind = self.cadences[component]['window']
+        if kind == 'session':
+            return session[0], session[1] + CLOSE_GRACE
+        if kind == 'extended':
+            return (datetime.combine(day, EXTENDED_HOURS[0], self.calendar.tz),
+                    datetime.combine(day, EXTENDED_HOURS[1], self.calendar.tz))
+        if kind == 'trading_day':
+            start = datetime.combine(day, dtime(0, 0), self.calendar.tz)
+            return start, start + timedelta(days=1)
+        raise ValueError(f"Invalid refresh window: {kind}")
+
+    def next_window(self, component: str, moment: datetime) -> Tuple[datetime, datetime]:
+        """The window containing `moment`, or else the next one to open"""
+        day = moment.date()
+        bounds = self.window(component, day)
+        if bounds is not None and moment < bounds[1]:
+            return bounds
+        return self.window(component, self.calendar.next_trading_day(day))
+
+    def _align(self, due: float, component: str) -> float:
+        """
+        Move a due time that falls outside the component's window to the next
+        window, keeping its phase within the interval so the window opens
+        without a burst.
+        """
+        start, _ = self.next_window(component, datetime.fromtimestamp(due, self.calendar.tz))
+        start = start.timestamp()
+        if due >= start:
+            return due
+        interval = self.cadences[component]['interval']
+        return start + (due - start) % interval
+
+    def _push(self, due: float, component: str, symbol: str):
+        self._seq += 1
+        heapq.heappush(self.queue, (self._align(due, component), self._seq, component, symbol))
+
+    def schedule(self, now: datetime):
+        """
+        Give every (component, symbol) a phase within its interval.
+
+        Scores already in the store that are younger than one interval are not
+        refreshed early, so restarting the daemon does not cause a burst.
+        """
+        self.queue.clear()
+        start = now.timestamp()
+        n = len(self.symbols)
+        for component, cadence in self.cadences.items():
+            if component not in self.refreshers:
+                continue
+            interval = cadence['interval']
+            for i, symbol in enumerate(self.symbols):
+                due = start + interval * i / n
+                existing = self.store.component(symbol, component)
+                if existing is not None:
+                    due = max(due, existing['updated'] + interval)
+                self._push(due, component, symbol)
+        self.scheduled = True
+
+    def _refresh(self, component: str, symbol: str, now: datetime):
+        with log_context(symbol=symbol, component=component):
+            try:
+                with timer('scheduler_refresh', component=component):
+                    score = self.refreshers[component](symbol)
+            except Exception as e:
+                logging.error(f"Error refreshing {component} for {symbol}: {e}")
+                increment('scheduler_refreshes', component=component, status='error')
+                return
+        if score is None:
+            increment('scheduler_refreshes', component=component, status='unchanged')
+            return
+        self.store.publish(symbol, component, score, updated=now.timestamp())
+        increment('scheduler_refreshes', component=component, status='ok')
+
+    def step(self, now: datetime) -> float:
+        """
+        Run every refresh due at `now`, then queue each one for its next
+        interval (within the component's window).
+
+        Returns:
+            Unix time the next task is due
+        """
+        if not self.scheduled:
+            self.schedule(now)
+        timestamp = now.timestamp()
+        while self.queue and self.queue[0][0] <= timestamp:
+            due, _, component, symbol = heapq.heappop(self.queue)
+            interval = self.cadences[component]['interval']
+            # Skip whole intervals if we fell behind, keeping the phase
+            next_due = due + interval * (math.floor((timestamp - due) / interval) + 1)
+            # A late wake-up (e.g. after a suspend) can land outside the window
+            if self._align(timestamp, component) == timestamp:
+                self._refresh(component, symbol, now)
+            self._push(next_due, component, symbol)
+
+        if timestamp - self._last_flush >= self.flush_interval and self.store.flush():
+            self._last_flush = timestamp
+        return self.queue[0][0] if self.queue else timestamp + self.flush_interval
+
+    def run(self, stop: Optional[threading.Event] = None,
+            clock: Callable[[], datetime] = lambda: datetime.now(EXCHANGE_TZ)):
+        """Refresh until `stop` is set, sleeping between due tasks"""
+        stop = stop or threading.Event()
+        logging.info(f"Refreshing {len(self.symbols)} symbols into {self.store.path}")
+        try:
+            while not stop.is_set():
+                now = clock()
+                next_due = self.step(now)
+                stop.wait(min(max(next_due - now.timestamp(), 0), self.flush_interval))
+        finally:
+            self.store.flush()
+
+def default_refreshers(sentiment_store: Optional[SentimentStore] = None,
+                       sentiment_history: Optional[SentimentHistory] = None) -> Dict[str, Callable[[str], Optional[float]]]:
+    """
+    Component refreshers backed by the Strategy analysers.
+
+    The technical refresher only re-scores when the latest bar changed since
+    the previous call. With a SentimentStore and/or SentimentHistory, the
+    scored headlines behind each sentiment score are recorded there as well.
+    """
+    from strategy import Strategy
+    strategy = Strategy([])
+    last_bars = {}
+
+    def technical(symbol: str) -> Optional[float]:
+        data = fetch_data(symbol)
+        bar = (data.index[-1], float(data['Close'].iloc[-1]))
+        if last_bars.get(symbol) == bar:
+            return None
+        last_bars[symbol] = bar
+        return strategy.analyse_symbol(symbol, data, ['technical'])['technical']
+
+    def component(name):
+        return lambda symbol: strategy.analyse_symbol(symbol, components=[name])[name]
+
+    def sentiment(symbol: str) -> float:
+        from sentiment import SentimentAnalyser
+        analyser = SentimentAnalyser(symbol)
+        items = analyser.score_headlines()
+        if sentiment_store is not None:
+            sentiment_store.add_headlines(symbol, items)
+        if sentiment_history is not None:
+            sentiment_history.append(symbol, items)
+        return analyser.aggregate(items)
+
+    return {
+        'technical': technical,
+        'fundamental': component('fundamental'),
+        'sentiment': (sentiment if sentiment_store is not None or sentiment_history is not None
+                      else component('sentiment'))
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--universe', type=Path, help='Text file of symbols')
+    source.add_argument('--symbols', nargs='+', help='Symbols given on the command line')
+    source.add_argument('--sp500', action='store_true', help='Current S&P 500 constituents')
+    parser.add_argument('--store', type=Path, default=Path('results/scores.json'))
+    parser.add_argument('--sentiment-db', type=Path, default=Path('results/sentiment.db'),
+                        help='Where scored headlines are kept for the app')
+    parser.add_argument('--sentiment-history', type=Path, default=Path('results/sentiment_history'),
+                        help='Append-only headline history for backtests')
+    for component, cadence in REFRESH_CADENCES.items():
+        parser.add_argument(f'--{component}-interval', type=float, default=cadence['interval'] / 60,
+                            help=f'Minutes between {component} refreshes of a symbol')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if args.universe:
+        from screen import read_universe
+        symbols = read_universe(args.universe)
+    elif args.sp500:
+        symbols = UniverseRegistry().get('sp500')
+    else:
+        symbols = [s.upper() for s in args.symbols]
+
+    if args.metrics_port:
+        REGISTRY.enabled = True
+        REGISTRY.serve(args.metrics_port)
+
+    cadences = {c: {'interval': getattr(args, f'{c}_interval') * 60} for c in REFRESH_CADENCES}
+    refreshers = default_refreshers(SentimentStore(args.sentiment_db),
+                                    SentimentHistory(args.sentiment_history))
+    scheduler = RefreshScheduler(symbols, ResultStore(args.store), refreshers, cadences)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        scheduler.run(stop)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import logging
+from typing import Dict, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from technical import TechnicalAnalyser
+
+NEUTRAL_SCORE = 50.0
+COMPONENTS = ('technical', 'fundamental', 'sentiment')
+
+class ScorePanel:
+    """
+    Aligned (date x symbol) arrays of prices and point-in-time component scores.
+
+    Every series is computed once over the full history with causal indicators,
+    so row t only uses information available at date t. A backtest reads each
+    bar's scores by index instead of re-running the analysers on a growing
+    window, which keeps the cost per bar constant.
+    """
+    def __init__(self, dates: pd.DatetimeIndex, symbols: List[str], close: np.ndarray,
+                 signals: np.ndarray, volatility: np.ndarray, fundamental: np.ndarray,
+                 sentiment: np.ndarray, signal_names: List[str],
+                 components: Sequence[str] = COMPONENTS):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.close = close              # (dates, symbols), NaN where a symbol has no bar
+        self.signals = signals          # (signals, dates, symbols) boolean
+        self.volatility = volatility    # (dates, symbols) technical volatility multiplier
+        self.fundamental = fundamental  # (dates, symbols) as-of fundamental score
+        self.sentiment = sentiment      # (dates, symbols) as-of sentiment score
+        self.signal_names = list(signal_names)
+        # Components with real scores; the others are held neutral and left out of composite()
+        self.components = tuple(components)
+
+    @classmethod
+    def from_price_data(
+        cls,
+        data: Dict[str, pd.DataFrame],
+        fundamental_history: Optional[Mapping[str, pd.Series]] = None,
+        sentiment_history: Optional[Mapping[str, pd.Series]] = None
+    ) -> 'ScorePanel':
+        """
+        Build a panel from per-symbol OHLCV frames.
+
+        Args:
+            data: Symbol -> OHLCV DataFrame (None or empty for failed downloads)
+            fundamental_history: Symbol -> dated fundamental scores, indexed by the
+                date each value became public
+            sentiment_history: Symbol -> dated sentiment scores, same convention
+
+        Returns:
+            ScorePanel over the union of all trading dates
+
+        yfinance only exposes current fundamentals and the last week of news, so
+        without histories those components stay neutral rather than leak today's
+        values into past bars, and composite() re-weights over the rest.
+        """
+        symbols = list(data)
+        frames = [df for df in data.values() if df is not None and not df.empty]
+        dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames)))) \
+            if frames else pd.DatetimeIndex([])
+        signal_names = list(TechnicalAnalyser.DEFAULT_SIGNAL_WEIGHTS)
+
+        close = np.full((len(dates), len(symbols)), np.nan)
+        signals = np.zeros((len(signal_names), len(dates), len(symbols)), dtype=bool)
+        volatility = np.ones((len(dates), len(symbols)))
+
+        for j, symbol in enumerate(symbols):
+            df = data[symbol]
+            if df is None or df.empty:
+                continue
+            try:
+                tech = TechnicalAnalyser(df)
+                signal_frame = tech.signal_frame().reindex(dates, fill_value=False)
+                signals[:, :, j] = signal_frame[signal_names].to_numpy(dtype=bool).T
+                volatility[:, j] = tech.volatility_series().reindex(dates).fillna(1).to_numpy()
+                close[:, j] = df['Close'].reindex(dates).to_numpy()
+            except Exception as e:
+                logging.error(f"Error building score series for {symbol}: {e}")
+
+        components = ['technical']
+        if fundamental_history is None:
+            logging.info("No fundamental history supplied; fundamental scores held neutral")
+        else:
+            components.append('fundamental')
+        if sentiment_history is None:
+            logging.info("No sentiment history supplied; sentiment scores held neutral")
+        else:
+            components.append('sentiment')
+
+        return cls(
+            dates=dates,
+            symbols=symbols,
+            close=close,
+            signals=signals,
+            volatility=volatility,
+            fundamental=as_of_matrix(fundamental_history, dates, symbols),
+            sentiment=as_of_matrix(sentiment_history, dates, symbols),
+            signal_names=signal_names,
+            components=components
+        )
+
+    def slice(self, start: int, stop: int) -> 'ScorePanel':
+        """Panel over bars [start, stop); arrays are views, so nothing is recomputed"""
+        return ScorePanel(
+            dates=self.dates[start:stop],
+            symbols=self.symbols,
+            close=self.close[start:stop],
+            signals=self.signals[:, start:stop],
+            volatility=self.volatility[start:stop],
+            fundamental=self.fundamental[start:stop],
+            sentiment=self.sentiment[start:stop],
+            signal_names=self.signal_names,
+            components=self.components
+        )
+
+    def technical(self, signal_weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Technical scores for every bar, matching TechnicalAnalyser.analyse() bar by bar"""
+        if signal_weights is None:
+            signal_weights = TechnicalAnalyser.DEFAULT_SIGNAL_WEIGHTS
+        weights = np.array([signal_weights.get(name, 0) for name in self.signal_names], dtype=float)
+        raw_score = np.tensordot(weights, self.signals, axes=1)
+        return np.clip(50 + raw_score * self.volatility, 0, 100)
+
+    def composite(self, weights: Dict[str, float],
+                  signal_weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Weighted total score for every bar, using the same weights as Strategy.
+
+        Like Strategy.analyse_symbol, the weights are re-normalised over the
+        components in `self.components`, so a panel without fundamental or
+        sentiment history still spans the full 0-100 range.
+        """
+        weight = sum(weights[name] for name in self.components)
+        if weight <= 0:
+            raise ValueError(f"Weights of {', '.join(self.components)} sum to zero")
+        scores = {
+            name: self.technical(signal_weights) if name == 'technical' else getattr(self, name)
+            for name in self.components
+        }
+        return sum(scores[name] * weights[name] for name in self.components) / weight
+
+def as_of_matrix(history: Optional[Mapping[str, pd.Series]],
+                 dates: pd.DatetimeIndex, symbols: List[str]) -> np.ndarray:
+    """Align dated per-symbol scores to `dates`, using the last value known on each date"""
+    matrix = np.full((len(dates), len(symbols)), NEUTRAL_SCORE)
+    if history is None:
+        return matrix
+
+    for j, symbol in enumerate(symbols):
+        series = history.get(symbol)
+        if series is None or len(series) == 0:
+            continue
+        series = series[~series.index.duplicated(keep='last')].sort_index()
+        # Forward fill only: a value dated after a bar is never visible to it
+        matrix[:, j] = series.reindex(dates, method='ffill').fillna(NEUTRAL_SCORE).to_numpy()
+    return matrix
@@ -0,0 +1,243 @@
+"""
+Headless batch screener.
+
+Scores a universe of symbols with a thread pool and writes the results to
+Parquet part files as it goes. Completed symbols are checkpointed after each
+part is written, so an interrupted run picks up where it stopped.
+
+Usage:
+    python scripts/screen.py --sp500 --output results/sp500
+    python scripts/screen.py --universe tickers.txt --workers 16 --components technical fundamental
+    python scripts/screen.py --universe tickers.txt --output results/run1   # resumes run1
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from utils import setup_logging                      # running script directly
+from universe import UniverseRegistry                # running script directly
+from strategy import Strategy                        # running script directly
+from instrumentation import REGISTRY, increment      # running script directly
+
+COMPONENTS = ('technical', 'fundamental', 'sentiment')
+
+def read_universe(path) -> List[str]:
+    """
+    Symbols from a text file: one or more per line, comma or whitespace
+    separated. Blank lines and '#' comments are ignored; duplicates are dropped.
+    """
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#')[0]
+            symbols.extend(s.strip().upper() for s in line.replace(',', ' ').split())
+    return list(dict.fromkeys(symbols))
+
+def _write_atomic(path: Path, write: Callable[[Path], None]):
+    """Write via a temporary file and rename, so readers never see half a file"""
+    tmp = path.with_name(path.name + '.tmp')
+    write(tmp)
+    os.replace(tmp, path)
+
+class ScreenCheckpoint:
+    """
+    Progress of a screening run, stored as JSON next to the Parquet parts.
+
+    A symbol is only marked done once the part file holding its row exists,
+    so a crash loses at most the unflushed batch, which is simply re-run.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.parts = 0
+        if self.path.exists():
+            with open(self.path) as f:
+                state = json.load(f)
+            self.done = set(state.get('done', []))
+            self.failed = set(state.get('failed', []))
+            self.parts = state.get('parts', 0)
+
+    def pending(self, symbols: Iterable[str], retry_failed: bool = False) -> List[str]:
+        skip = self.done if retry_failed else self.done | self.failed
+        return [s for s in symbols if s not in skip]
+
+    def commit(self, done: Iterable[str], failed: Iterable[str], parts: int):
+        self.done.update(done)
+        self.failed.update(failed)
+        self.failed -= self.done
+        self.parts = parts
+
+        def write(tmp):
+            with open(tmp, 'w') as f:
+                json.dump({
+                    'done': sorted(self.done),
+                    'failed': sorted(self.failed),
+                    'parts': self.parts,
+                    'updated': time.strftime('%Y-%m-%dT%H:%M:%S')
+                }, f)
+        _write_atomic(self.path, write)
+
+class Screener:
+    """
+    Runs `analyse(symbol)` over a universe and streams the rows to Parquet.
+
+    Args:
+        output_dir: Directory for part-NNNNN.parquet files and checkpoint.json
+        analyse: Callable returning a result dict for one symbol
+        workers: Concurrent analyses (the work is mostly network-bound)
+        batch_size: Rows per Parquet part, i.e. how often progress is checkpointed
+        retry_failed: Re-run symbols that failed in an earlier attempt
+    """
+    def __init__(self, output_dir, analyse: Callable[[str], dict], workers: int = 8,
+                 batch_size: int = 100, retry_failed: bool = False):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.analyse = analyse
+        self.workers = workers
+        self.batch_size = batch_size
+        self.retry_failed = retry_failed
+        self.checkpoint = ScreenCheckpoint(self.output_dir / 'checkpoint.json')
+
+    def _analyse(self, symbol: str) -> Optional[dict]:
+        try:
+            result = self.analyse(symbol)
+            increment('screen_symbols', status='ok')
+            return result
+        except Exception as e:
+            logging.error(f"Error screening {symbol}: {e}")
+            increment('screen_symbols', status='error')
+            return None
+
+    def _flush(self, rows: List[dict], failed: List[str]):
+        parts = self.checkpoint.parts
+        if rows:
+            parts += 1
+            frame = pd.DataFrame(rows)
+            frame['screened_at'] = pd.Timestamp.now()
+            _write_atomic(self.output_dir / f'part-{parts:05d}.parquet',
+                          lambda tmp: frame.to_parquet(tmp, index=False))
+        self.checkpoint.commit([row['symbol'] for row in rows], failed, parts)
+        logging.info(f"Checkpointed {len(self.checkpoint.done)} symbols "
+                     f"({len(self.checkpoint.failed)} failed)")
+
+    def run(self, symbols: Iterable[str]) -> dict:
+        """
+        Screen every symbol not already in the checkpoint.
+
+        Returns:
+            Counts of symbols screened, failed and skipped in this run
+        """
+        symbols = list(dict.fromkeys(symbols))
+        pending = self.checkpoint.pending(symbols, self.retry_failed)
+        logging.info(f"Screening {len(pending)} of {len(symbols)} symbols "
+                     f"with {self.workers} workers")
+
+        rows, failed = [], []
+        screened = errors = 0
+        queue = iter(pending)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Keep a bounded number of symbols in flight, so an interrupt
+            # does not leave thousands of queued futures behind
+            in_flight = {}
+            for symbol in queue:
+                in_flight[pool.submit(self._analyse, symbol)] = symbol
+                if len(in_flight) >= self.workers * 2:
+                    break
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    symbol = in_flight.pop(future)
+                    result = future.result()
+                    if result is None:
+                        failed.append(symbol)
+                        errors += 1
+                    else:
+                        rows.append(result)
+                        screened += 1
+                    next_symbol = next(queue, None)
+                    if next_symbol is not None:
+                        in_flight[pool.submit(self._analyse, next_symbol)] = next_symbol
+
+                if len(rows) + len(failed) >= self.batch_size:
+                    self._flush(rows, failed)
+                    rows, failed = [], []
+
+        if rows or failed:
+            self._flush(rows, failed)
+
+        return {
+            'screened': screened,
+            'failed': errors,
+            'skipped': len(symbols) - len(pending)
+        }
+
+    def results(self) -> pd.DataFrame:
+        """All rows written so far, latest screen per symbol"""
+        parts = sorted(self.output_dir.glob('part-*.parquet'))
+        if not parts:
+            return pd.DataFrame()
+        frame = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+        return frame.drop_duplicates('symbol', keep='last').reset_index(drop=True)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--universe', type=Path, help='Text file of symbols')
+    source.add_argument('--symbols', nargs='+', help='Symbols given on the command line')
+    source.add_argument('--sp500', action='store_true', help='Current S&P 500 constituents')
+    parser.add_argument('--output', type=Path, default=Path('results/screen'),
+                        help='Output directory; an existing run there is resumed')
+    parser.add_argument('--components', nargs='+', choices=COMPONENTS, default=list(COMPONENTS),
+                        help='Scores to compute; leaving out sentiment avoids loading FinBERT')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Rows per Parquet part and checkpoint')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Re-run symbols that failed in an earlier attempt')
+    parser.add_argument('--top', type=int, default=10, help='Print the top N by total score')
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if args.universe:
+        symbols = read_universe(args.universe)
+    elif args.sp500:
+        symbols = UniverseRegistry().get('sp500')
+    else:
+        symbols = [s.upper() for s in args.symbols]
+
+    strategy = Strategy(symbols)
+    screener = Screener(
+        args.output,
+        lambda symbol: strategy.analyse_symbol(symbol, components=args.components),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        retry_failed=args.retry_failed
+    )
+    try:
+        summary = screener.run(symbols)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun with --output {args.output} to resume")
+        return 130
+
+    print(f"Screened {summary['screened']}, failed {summary['failed']}, "
+          f"skipped {summary['skipped']} (already done)")
+    results = screener.results()
+    if not results.empty and args.top:
+        print(results.nlargest(args.top, 'score')[['symbol', 'score', *args.components]]
+              .to_string(index=False))
+
+    if REGISTRY.enabled:
+        REGISTRY.write_profile(args.output / 'profile.json')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,13 @@
-import yfinance as yf
-from gnews import GNews
 from datetime import datetime, timedelta
 import logging
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 import numpy as np
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import List, Dict
+# yfinance, gnews, transformers and torch are imported on first use, so
+# screens that never score sentiment never pay for loading them
+
+from instrumentation import increment, timed
 
 class NewsSource(ABC):
     @abstractmethod
@@ -15,6 +16,7 @@ class NewsSource(ABC):
         pass
 
 class YFinanceNews(NewsSource):
+    @timed('news_fetch', source='yfinance')
     def get_news(self, symbol: str, days: int = 7) -> List[Dict]:
         def datetime_from_pubDate(content: str) -> datetime:
             date_str = content.split('T')[0]
@@ -23,9 +25,12 @@ class YFinanceNews(NewsSource):
             date_time = datetime.strptime(date_time_str, '%Y-%m-%d %H:%M:%S')
             return date_time
         
+        import yfinance as yf
+        
         try:
             stock = yf.Ticker(symbol)
             news = stock.news
+            increment('network_calls', client='yfinance.news')
             if not news:
                 return []
             
@@ -45,10 +50,14 @@ class YFinanceNews(NewsSource):
 
 class GNewsSource(NewsSource):
     def __init__(self):
+        from gnews import GNews
+        
         self.gnews = GNews(language='en', country='US', period='7d')
     
+    @timed('news_fetch', source='gnews')
     def get_news(self, symbol: str, days: int = 7) -> List[Dict]:
         try:
+            increment('network_calls', client='gnews')
             news = self.gnews.get_news(f"{symbol} stock")
             return [{
                 'title': n['title'],
@@ -59,6 +68,15 @@ class GNewsSource(NewsSource):
             logging.error(f"GNews error for {symbol}: {e}")
             return []
 
+@lru_cache(maxsize=None)
+def load_finbert(model_name: str = "ProsusAI/finbert"):
+    """Load the tokenizer and model once per process and share them between analysers"""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    return tokenizer, model
+
 class SentimentAnalyser:
     def __init__(self, symbol: str):
         self.symbol = symbol
@@ -66,13 +84,17 @@ class SentimentAnalyser:
             'yfinance': {'source': YFinanceNews(), 'weight': 0.6},
             'gnews': {'source': GNewsSource(), 'weight': 0.4}
         }
-        self.tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-        self.model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+        self.tokenizer, self.model = load_finbert()
     
+    @timed('sentiment_score')
     def get_sentiment_score(self, text: str) -> float:
+        import torch
+        
         try:
             inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-            outputs = self.model(**inputs)
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+            increment('model_forward_passes')
             probabilities = torch.nn.functional.softmax(outputs.logits, dim=1)
             return (probabilities[0][0] * 0 + 
                    probabilities[0][1] * 50 + 
@@ -81,13 +103,46 @@ class SentimentAnalyser:
             logging.error(f"Sentiment analysis error: {e}")
             return 50
     
-    def analyse(self) -> float:
+    @timed('sentiment_batch')
+    def get_sentiment_scores(self, texts: List[str], batch_size: int = 32) -> List[float]:
+        """Score many texts with one forward pass per batch; same scale as get_sentiment_score"""
+        import torch
+        
+        scores = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            try:
+                inputs = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
+                with torch.no_grad():
+                    outputs = self.model(**inputs)
+                increment('model_forward_passes')
+                probabilities = torch.nn.functional.softmax(outputs.logits, dim=1)
+                scores.extend((probabilities[:, 1] * 50 + probabilities[:, 2] * 100).tolist())
+            except Exception as e:
+                logging.error(f"Sentiment analysis error: {e}")
+                scores.extend([50] * len(batch))
+        return scores
+    
+    def get_headlines(self, days: int = 7) -> List[Dict]:
+        """News items from every source, each with title, timestamp and source"""
+        items = []
+        for config in self.news_sources.values():
+            items.extend(config['source'].get_news(self.symbol, days))
+        return items
+    
+    def score_headlines(self, days: int = 7) -> List[Dict]:
+        """get_headlines() with a sentiment 'score' added to each item"""
+        items = self.get_headlines(days)
+        scores = self.get_sentiment_scores([item['title'] for item in items])
+        return [dict(item, score=score) for item, score in zip(items, scores)]
+    
+    def aggregate(self, items: List[Dict]) -> float:
+        """Mean score per source, weighted by source; 50 (neutral) without news"""
         source_scores = {}
         
         for source_name, config in self.news_sources.items():
-            news_items = config['source'].get_news(self.symbol)
-            if news_items:
-                scores = [self.get_sentiment_score(item['title']) for item in news_items]
+            scores = [item['score'] for item in items if item['source'] == source_name]
+            if scores:
                 source_scores[source_name] = {
                     'score': np.mean(scores),
                     'weight': config['weight']
@@ -102,6 +157,9 @@ class SentimentAnalyser:
         ) / sum(source['weight'] for source in source_scores.values())
         
         return weighted_score
+    
+    def analyse(self) -> float:
+        return self.aggregate(self.score_headlines())
 
 if __name__ == '__main__':
     # logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,275 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment, timer         # running script directly
+from market_calendar import EXCHANGE_TZ, MarketCalendar  # running script directly
+from sentiment_store import SOURCE_WEIGHTS            # running script directly
+
+NEUTRAL_SCORE = 50.0   # as SentimentAnalyser without news
+
+_HEADLINE_COLUMNS = ['symbol', 'date', 'published', 'source', 'title', 'score', 'scored_at']
+_DAILY_COLUMNS = ['symbol', 'date', 'source', 'score_sum', 'headlines']
+
+_CALENDAR = MarketCalendar()
+
+def _timestamp(value) -> pd.Timestamp:
+    """Publication time as naive UTC; naive inputs are taken to be UTC already"""
+    if isinstance(value, (int, float)):
+        return pd.Timestamp(value, unit='s')
+    value = pd.Timestamp(value)
+    return value.tz_convert('UTC').tz_localize(None) if value.tzinfo is not None else value
+
+def session_date(published: pd.Timestamp) -> pd.Timestamp:
+    """
+    Trading day whose close is the first after `published` (naive UTC).
+
+    A backtest fills at each bar's close, so news from after the close, a
+    weekend or a holiday only counts from the next session on.
+    """
+    local = published.tz_localize('UTC').tz_convert(EXCHANGE_TZ)
+    day = local.date()
+    session = _CALENDAR.session(day)
+    if session is None or local >= session[1]:
+        day = _CALENDAR.next_trading_day(day)
+    return pd.Timestamp(day)
+
+class SentimentHistory:
+    """
+    Append-only Parquet history of scored headlines and daily sentiment.
+
+    Two datasets of part files live under `root`:
+        headlines/  one row per scored headline (symbol, date, published,
+                    source, title, score, scored_at)
+        daily/      per (symbol, date, source) sums of scores and headline
+                    counts, so the score for any day and window is derived
+                    from sums without touching the headlines or the model
+
+    `published` is naive UTC; `date` is the session_date() the headline
+    first counts toward, so news after 16:00 ET goes to the next session.
+
+    Parts are only ever added; a headline already recorded (same symbol,
+    source and title) is skipped, so re-feeding the same news is harmless.
+    compact() folds the parts of each dataset into one file.
+
+    Args:
+        root: Directory of the history
+        source_weights: Weight per news source, as in SentimentAnalyser
+    """
+    def __init__(self, root='results/sentiment_history', source_weights: Optional[Dict[str, float]] = None):
+        self.root = Path(root)
+        self.source_weights = dict(source_weights or SOURCE_WEIGHTS)
+        for name in ('headlines', 'daily'):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._keys = None
+        self._daily = None
+        self._daily_parts = None
+        self._counter = itertools.count()
+
+    def _parts(self, name: str) -> List[Path]:
+        return sorted((self.root / name).glob('*.parquet'))
+
+    def _write_part(self, name: str, frame: pd.DataFrame):
+        path = self.root / name / f'part-{time.time_ns()}-{os.getpid()}-{next(self._counter)}.parquet'
+        tmp = path.with_name(path.name + '.tmp')
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    def _read(self, name: str, columns: List[str], filters=None) -> pd.DataFrame:
+        parts = self._parts(name)
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(p, columns=columns, filters=filters) for p in parts],
+                         ignore_index=True)
+
+    def _known_keys(self) -> set:
+        if self._keys is None:
+            frame = self._read('headlines', ['symbol', 'source', 'title'])
+            self._keys = set(zip(frame['symbol'], frame['source'], frame['title']))
+        return self._keys
+
+    def append(self, symbol: str, items: List[Dict], scored_at: Optional[float] = None) -> int:
+        """
+        Record scored news items (title, timestamp, source, score) for a symbol.
+
+        Returns:
+            Number of headlines that were new
+        """
+        scored_at = scored_at if scored_at is not None else time.time()
+        with self._lock:
+            known = self._known_keys()
+            rows = []
+            for item in items:
+                key = (symbol, item['source'], item['title'])
+                if key in known:
+                    continue
+                known.add(key)
+                published = _timestamp(item['timestamp'])
+                rows.append((symbol, session_date(published), published, item['source'],
+                             item['title'], float(item['score']), scored_at))
+            if not rows:
+                return 0
+            headlines = pd.DataFrame(rows, columns=_HEADLINE_COLUMNS)
+            daily = (headlines.groupby(['symbol', 'date', 'source'], as_index=False)
+                     .agg(score_sum=('score', 'sum'), headlines=('score', 'size')))
+            self._write_part('headlines', headlines)
+            self._write_part('daily', daily[_DAILY_COLUMNS])
+        increment('sentiment_history_headlines', len(rows))
+        return len(rows)
+
+    def import_store(self, store, symbols: Optional[Iterable[str]] = None) -> int:
+        """Copy the headlines of a SentimentStore (all symbols by default)"""
+        symbols = list(symbols) if symbols is not None else list(store.last_updated())
+        added = 0
+        for symbol in symbols:
+            frame = store.headlines(symbol)
+            items = frame.rename(columns={'published': 'timestamp'}).to_dict('records')
+            added += self.append(symbol, items)
+        return added
+
+    def compact(self):
+        """Rewrite each dataset as a single part; run while no other process appends"""
+        with self._lock:
+            for name, columns in (('headlines', _HEADLINE_COLUMNS), ('daily', _DAILY_COLUMNS)):
+                parts = self._parts(name)
+                if len(parts) <= 1:
+                    continue
+                frame = self._read(name, columns)
+                if name == 'daily':
+                    frame = frame.groupby(['symbol', 'date', 'source'], as_index=False)[
+                        ['score_sum', 'headlines']].sum()
+                self._write_part(name, frame.sort_values(['symbol', 'date']).reset_index(drop=True))
+                for part in parts:
+                    part.unlink()
+
+    def _daily_sums(self) -> pd.DataFrame:
+        """Daily sums per (symbol, date, source), re-read only when parts were added"""
+        parts = self._parts('daily')
+        if parts != self._daily_parts:
+            with timer('sentiment_history_load'):
+                frame = self._read('daily', _DAILY_COLUMNS)
+                frame = frame.groupby(['symbol', 'date', 'source'], as_index=False)[
+                    ['score_sum', 'headlines']].sum()
+            self._daily, self._daily_parts = frame, parts
+        return self._daily
+
+    def daily(self, symbols: Optional[List[str]] = None, start=None, end=None,
+              window_days: int = 1) -> pd.DataFrame:
+        """
+        Sentiment per symbol and day from the headlines of the trailing
+        `window_days` calendar days (1 = that day only). Per source scores are
+        means, combined with the source weights; days without headlines in
+        the window are omitted.
+
+        Returns:
+            DataFrame with symbol, date, score and headlines columns
+        """
+        frame = self._daily_sums()
+        if symbols is not None:
+            frame = frame[frame['symbol'].isin(symbols)]
+        frames = [self._symbol_daily(symbol, group, window_days)
+                  for symbol, group in frame.groupby('symbol', sort=True)]
+        result = (pd.concat(frames, ignore_index=True) if frames
+                  else pd.DataFrame(columns=['symbol', 'date', 'score', 'headlines']))
+        if start is not None:
+            result = result[result['date'] >= pd.Timestamp(start)]
+        if end is not None:
+            result = result[result['date'] <= pd.Timestamp(end)]
+        return result.reset_index(drop=True)
+
+    def _symbol_daily(self, symbol: str, sums: pd.DataFrame, window_days: int) -> pd.DataFrame:
+        dates = pd.date_range(sums['date'].min(), sums['date'].max() + pd.Timedelta(days=window_days - 1))
+        score_sum = sums.pivot_table(index='date', columns='source', values='score_sum', aggfunc='sum')
+        counts = sums.pivot_table(index='date', columns='source', values='headlines', aggfunc='sum')
+        score_sum = score_sum.reindex(dates, fill_value=0).fillna(0).rolling(window_days, min_periods=1).sum()
+        counts = counts.reindex(dates, fill_value=0).fillna(0).rolling(window_days, min_periods=1).sum()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = score_sum / counts
+        weights = pd.Series({source: self.source_weights.get(source, 0.0) for source in means.columns})
+        present = (counts > 0) & (weights > 0)
+        weight = present.mul(weights).sum(axis=1)
+        score = means.where(present, 0.0).mul(weights).sum(axis=1) / weight
+        keep = (weight > 0).to_numpy()
+        return pd.DataFrame({'symbol': symbol, 'date': dates[keep],
+                             'score': score.to_numpy()[keep],
+                             'headlines': counts.where(present, 0).sum(axis=1).to_numpy()[keep].astype(int)})
+
+    def series(self, symbol: str, window_days: int = 7) -> pd.Series:
+        """
+        Dated sentiment of a symbol for every calendar day from its first
+        headline to `window_days` after its last, neutral where the window
+        holds no news. This is what SentimentAnalyser would have returned on
+        each day with a `window_days` news look-back.
+        """
+        frame = self.daily([symbol], window_days=window_days)
+        if frame.empty:
+            return pd.Series(dtype=float, name=symbol)
+        series = frame.set_index('date')['score']
+        dates = pd.date_range(series.index.min(), series.index.max() + pd.Timedelta(days=1))
+        return series.reindex(dates).fillna(NEUTRAL_SCORE).rename(symbol)
+
+    def as_of(self, symbol: str, date, window_days: int = 7) -> float:
+        """Sentiment of a symbol as known at the end of `date`"""
+        series = self.series(symbol, window_days)
+        series = series[series.index <= pd.Timestamp(date)]
+        return float(series.iloc[-1]) if len(series) else NEUTRAL_SCORE
+
+    def headlines(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """Scored headlines of a symbol published in [start, end], newest first"""
+        filters = [('symbol', '==', symbol)]
+        if start is not None:
+            filters.append(('published', '>=', pd.Timestamp(start)))
+        if end is not None:
+            filters.append(('published', '<=', pd.Timestamp(end)))
+        frame = self._read('headlines', _HEADLINE_COLUMNS, filters)
+        return frame.sort_values('published', ascending=False).reset_index(drop=True)
+
+    def as_mapping(self, symbols: Optional[Iterable[str]] = None, window_days: int = 7) -> 'SentimentHistoryView':
+        """Read-only symbol -> series() view, e.g. Backtester(sentiment_history=...)"""
+        return SentimentHistoryView(self, symbols, window_days)
+
+class SentimentHistoryView(Mapping):
+    """
+    Symbol -> dated sentiment series, computed on first access and kept.
+
+    The shape Backtester and ScorePanel expect for sentiment_history.
+    """
+    def __init__(self, history: SentimentHistory, symbols: Optional[Iterable[str]] = None,
+                 window_days: int = 7):
+        self.history = history
+        self.window_days = window_days
+        known = self.history._daily_sums()['symbol'].unique()
+        self.symbols = sorted(set(known) & set(symbols) if symbols is not None else known)
+        self._series: Dict[str, pd.Series] = {}
+
+    def __getitem__(self, symbol: str) -> pd.Series:
+        if symbol not in self.symbols:
+            raise KeyError(symbol)
+        if symbol not in self._series:
+            self._series[symbol] = self.history.series(symbol, self.window_days)
+        return self._series[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+if __name__ == '__main__':
+    from sentiment_store import SentimentStore
+    from utils import setup_logging
+    setup_logging()
+    history = SentimentHistory()
+    added = history.import_store(SentimentStore())
+    history.compact()
+    logging.info(f"Imported {added} new headlines into {history.root}")
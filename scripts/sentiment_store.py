@@ -0,0 +1,240 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from instrumentation import increment, timer   # running script directly
+
+# Lower bound of each sentiment label on the 0-100 score scale
+SENTIMENT_LEVELS = {
+    'Very Negative': 0,
+    'Negative': 20,
+    'Neutral': 40,
+    'Positive': 60,
+    'Very Positive': 80
+}
+
+# As SentimentAnalyser.news_sources
+SOURCE_WEIGHTS = {
+    'yfinance': 0.6,
+    'gnews': 0.4
+}
+
+def sentiment_label(score: float) -> str:
+    label = 'Very Negative'
+    for name, lower in SENTIMENT_LEVELS.items():
+        if score >= lower:
+            label = name
+    return label
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS headlines (
+    symbol TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    published REAL NOT NULL,
+    score REAL NOT NULL,
+    scored_at REAL NOT NULL,
+    PRIMARY KEY (symbol, source, title)
+);
+CREATE INDEX IF NOT EXISTS headlines_published ON headlines (published, symbol);
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    updated REAL NOT NULL
+);
+"""
+
+class SentimentStore:
+    """
+    Scored headlines per symbol in SQLite, shared by the background scorer and the app.
+
+    Each headline is kept once, with the time it was first seen, so the store
+    accumulates history beyond the few days the news feeds return. Queries
+    aggregate over a publication-time window, so time-range and threshold
+    filters never touch the model or the network.
+    """
+    def __init__(self, path='results/sentiment.db', source_weights: Optional[Dict[str, float]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.source_weights = dict(source_weights or SOURCE_WEIGHTS)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store usable from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add_headlines(self, symbol: str, items: List[Dict], scored_at: Optional[float] = None):
+        """
+        Record scored news items (title, timestamp, source, score) for a symbol
+        and mark it as updated, even when there was no news.
+        """
+        scored_at = scored_at if scored_at is not None else time.time()
+        rows = [(symbol, item['source'], item['title'],
+                 item['timestamp'].timestamp() if isinstance(item['timestamp'], datetime) else item['timestamp'],
+                 float(item['score']), scored_at) for item in items]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany('INSERT OR IGNORE INTO headlines VALUES (?, ?, ?, ?, ?, ?)', rows)
+            conn.execute('INSERT OR REPLACE INTO symbols VALUES (?, ?)', (symbol, scored_at))
+
+    def last_updated(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Unix time each symbol was last scored"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT symbol, updated FROM symbols').fetchall()
+        updated = dict(rows)
+        if symbols is None:
+            return updated
+        return {s: updated[s] for s in symbols if s in updated}
+
+    def missing(self, symbols: Iterable[str], max_age: Optional[float] = None) -> List[str]:
+        """Symbols never scored, or (with max_age seconds) scored too long ago"""
+        updated = self.last_updated()
+        cutoff = time.time() - max_age if max_age is not None else None
+        return [s for s in symbols
+                if s not in updated or (cutoff is not None and updated[s] < cutoff)]
+
+    def headlines(self, symbol: str, since: Optional[datetime] = None) -> pd.DataFrame:
+        """A symbol's scored headlines, newest first"""
+        since = since.timestamp() if since else 0
+        with closing(self._connect()) as conn:
+            frame = pd.read_sql_query(
+                'SELECT source, title, published, score FROM headlines '
+                'WHERE symbol = ? AND published >= ? ORDER BY published DESC',
+                conn, params=(symbol, since))
+        frame['published'] = pd.to_datetime(frame['published'], unit='s')
+        return frame
+
+    def summary(self, since: Optional[datetime] = None, symbols: Optional[List[str]] = None,
+                sources: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Per-symbol sentiment over headlines published since `since`.
+
+        Scores are the mean per source, weighted by source as in
+        SentimentAnalyser. Symbols scored but without headlines in the window
+        are included with a neutral score of 50 and zero headlines.
+
+        Returns:
+            DataFrame with symbol, score, label, headlines and updated columns
+        """
+        sources = list(self.source_weights if sources is None else sources)
+        if not sources:
+            return pd.DataFrame(columns=['symbol', 'score', 'label', 'headlines', 'updated'])
+        with timer('sentiment_store_query'), closing(self._connect()) as conn:
+            per_source = pd.read_sql_query(
+                'SELECT symbol, source, AVG(score) AS score, COUNT(*) AS headlines FROM headlines '
+                f'WHERE published >= ? AND source IN ({",".join("?" * len(sources))}) '
+                'GROUP BY symbol, source',
+                conn, params=[since.timestamp() if since else 0, *sources])
+            updated = pd.read_sql_query('SELECT symbol, updated FROM symbols', conn)
+
+        if symbols is not None:
+            per_source = per_source[per_source['symbol'].isin(symbols)]
+            updated = updated[updated['symbol'].isin(symbols)]
+
+        per_source['weight'] = per_source['source'].map(self.source_weights).fillna(0)
+        per_source['weighted'] = per_source['score'] * per_source['weight']
+        grouped = per_source.groupby('symbol')[['weighted', 'weight', 'headlines']].sum()
+        scores = (grouped['weighted'] / grouped['weight']).where(grouped['weight'] > 0)
+
+        frame = updated.set_index('symbol')
+        frame['score'] = scores.reindex(frame.index).fillna(50.0)
+        frame['headlines'] = grouped['headlines'].reindex(frame.index).fillna(0).astype(int)
+        frame['label'] = frame['score'].map(sentiment_label)
+        frame['updated'] = pd.to_datetime(frame['updated'], unit='s')
+        return (frame.reset_index()[['symbol', 'score', 'label', 'headlines', 'updated']]
+                .sort_values('score', ascending=False)
+                .reset_index(drop=True))
+
+class SentimentWorker:
+    """
+    Background thread that scores submitted symbols into a SentimentStore.
+
+    News for a batch of symbols is fetched first and all their headlines go
+    through FinBERT together, so the model runs full batches. The model is
+    loaded in the worker thread on first use, never in the caller's.
+
+    Args:
+        store: Where scored headlines are written
+        symbols_per_job: Symbols whose headlines are scored together
+        batch_size: Headlines per model forward pass
+        history: Optional SentimentHistory that also receives every scored headline
+    """
+    def __init__(self, store: SentimentStore, symbols_per_job: int = 16, batch_size: int = 32,
+                 history=None):
+        self.store = store
+        self.history = history
+        self.symbols_per_job = symbols_per_job
+        self.batch_size = batch_size
+        self._queue: 'queue.Queue[str]' = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, symbols: Iterable[str]) -> int:
+        """Queue symbols not already pending; returns how many were added"""
+        added = 0
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self._pending:
+                    self._pending.add(symbol)
+                    self._queue.put(symbol)
+                    added += 1
+        return added
+
+    def score(self, symbols: List[str]):
+        """Fetch, score and store the headlines of `symbols` (runs in the caller's thread)"""
+        from sentiment import SentimentAnalyser
+        analyser = SentimentAnalyser(symbols[0])
+        headlines = {}
+        for symbol in symbols:
+            analyser.symbol = symbol
+            headlines[symbol] = analyser.get_headlines()
+
+        titles = [item['title'] for items in headlines.values() for item in items]
+        scores = iter(analyser.get_sentiment_scores(titles, self.batch_size))
+        scored_at = time.time()
+        for symbol, items in headlines.items():
+            scored = [dict(item, score=next(scores)) for item in items]
+            self.store.add_headlines(symbol, scored, scored_at)
+            if self.history is not None:
+                self.history.append(symbol, scored, scored_at)
+        increment('sentiment_worker_symbols', len(symbols))
+
+    def _run(self):
+        while True:
+            job = [self._queue.get()]
+            while len(job) < self.symbols_per_job:
+                try:
+                    job.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.score(job)
+            except Exception as e:
+                logging.error(f"Error scoring sentiment for {', '.join(job)}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.difference_update(job)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until nothing is pending; False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
@@ -0,0 +1,452 @@
+"""
+Sharded universe analysis across worker processes (or nodes).
+
+Symbols are assigned to shards by a stable hash and split into small tasks.
+Workers prefer the shards they own and steal from the others when idle, so a
+lost worker's shards still get done. A Coordinator hands out the tasks,
+merges the partial analysis_results, re-queues tasks whose worker died or
+stopped heartbeating, and reports throughput per shard.
+
+The queue is pluggable: QueueWorkQueue works with in-process or
+multiprocessing queues; a networked WorkQueue lets workers on other nodes
+join the same run.
+
+Usage:
+    python scripts/sharding.py --universe tickers.txt --processes 8 --shards 16
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from instrumentation import increment                                    # running script directly
+from utils import listen_for_workers, log_context, setup_worker_logging  # running script directly
+
+def shard_for(symbol: str, n_shards: int) -> int:
+    """Stable shard of a symbol; identical in every process and on every node"""
+    return zlib.crc32(symbol.encode()) % n_shards
+
+def partition(symbols: Iterable[str], n_shards: int) -> Dict[int, List[str]]:
+    shards = defaultdict(list)
+    for symbol in symbols:
+        shards[shard_for(symbol, n_shards)].append(symbol)
+    return dict(shards)
+
+class Task(NamedTuple):
+    task_id: int
+    shard: int
+    symbols: tuple
+    attempt: int = 0
+
+class WorkQueue(ABC):
+    """
+    Transport between a Coordinator and its workers.
+
+    Workers send ('started', worker_id, task_id), ('heartbeat', worker_id, None)
+    and ('done', worker_id, task_id, results, seconds) messages on the result
+    channel.
+    """
+    @abstractmethod
+    def put_task(self, task: Task):
+        pass
+
+    @abstractmethod
+    def get_task(self, shards: Sequence[int] = (), timeout: float = 1.0) -> Optional[Task]:
+        """Next task, preferring `shards`; None if there is none within `timeout`"""
+        pass
+
+    @abstractmethod
+    def put_message(self, message: tuple):
+        pass
+
+    @abstractmethod
+    def get_message(self, timeout: float = 1.0) -> Optional[tuple]:
+        pass
+
+    @abstractmethod
+    def shutdown(self):
+        """Tell every worker to exit"""
+        pass
+
+    @abstractmethod
+    def is_shutdown(self) -> bool:
+        pass
+
+class QueueWorkQueue(WorkQueue):
+    """
+    One task queue per shard plus a shared message queue.
+
+    For worker processes the queues live in a multiprocessing Manager rather
+    than being multiprocessing.Queue pipes: a worker killed mid-put would
+    leave a pipe's lock held and stall every other worker.
+
+    Args:
+        n_shards: Number of shards
+        manager: A started multiprocessing Manager for worker processes, or
+            None for threads in this process
+    """
+    def __init__(self, n_shards: int, manager=None):
+        self.n_shards = n_shards
+        if manager is None:
+            self.task_queues = [queue.Queue() for _ in range(n_shards)]
+            self.messages = queue.Queue()
+            self._shutdown = threading.Event()
+        else:
+            self.task_queues = [manager.Queue() for _ in range(n_shards)]
+            self.messages = manager.Queue()
+            self._shutdown = manager.Event()
+
+    def put_task(self, task: Task):
+        self.task_queues[task.shard].put(task)
+
+    def get_task(self, shards: Sequence[int] = (), timeout: float = 1.0) -> Optional[Task]:
+        order = list(shards) + [s for s in range(self.n_shards) if s not in shards]
+        deadline = time.monotonic() + timeout
+        while not self._shutdown.is_set():
+            for shard in order:
+                try:
+                    return self.task_queues[shard].get_nowait()
+                except queue.Empty:
+                    continue
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+        return None
+
+    def put_message(self, message: tuple):
+        self.messages.put(message)
+
+    def get_message(self, timeout: float = 1.0) -> Optional[tuple]:
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def shutdown(self):
+        self._shutdown.set()
+
+    def is_shutdown(self) -> bool:
+        return self._shutdown.is_set()
+
+def analyse_symbols(symbols: Sequence[str]) -> Dict[str, Optional[dict]]:
+    """Default task: Strategy.analyse_all_stocks over the task's symbols"""
+    from strategy import Strategy
+    strategy = Strategy(list(symbols))
+    strategy.analyse_all_stocks()
+    return {symbol: strategy.analysis_results.get(symbol) for symbol in symbols}
+
+def run_worker(work_queue: WorkQueue, worker_id: str, shards: Sequence[int] = (),
+               analyse: Callable[[Sequence[str]], Dict[str, Optional[dict]]] = analyse_symbols,
+               heartbeat_interval: float = 2.0):
+    """
+    Process tasks until the queue is shut down, heartbeating while busy.
+
+    Runs in a worker thread or process; on another node, call it with a
+    networked WorkQueue.
+    """
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(heartbeat_interval):
+            work_queue.put_message(('heartbeat', worker_id, None))
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        while not work_queue.is_shutdown():
+            task = work_queue.get_task(shards)
+            if task is None:
+                continue
+            work_queue.put_message(('started', worker_id, task.task_id))
+            started = time.perf_counter()
+            try:
+                with log_context(worker=worker_id, shard=task.shard):
+                    results = analyse(task.symbols)
+            except Exception as e:
+                logging.error(f"Worker {worker_id} failed on task {task.task_id}: {e}")
+                results = {symbol: None for symbol in task.symbols}
+            work_queue.put_message(('done', worker_id, task.task_id, results,
+                                    time.perf_counter() - started))
+    finally:
+        stop.set()
+
+def _worker_process(log_queue, *args):
+    # Log records go to the coordinator's process, which owns the log file
+    setup_worker_logging(log_queue)
+    run_worker(*args)
+
+class Coordinator:
+    """
+    Splits a universe into shard tasks, collects results and recovers lost work.
+
+    A task is re-queued when its worker is reported dead (worker_died) or
+    sends nothing for `lease_timeout` seconds; after `max_attempts` its symbols
+    are recorded as failed (None), as analyse_all_stocks does for errors.
+
+    A worker that dies between taking a task and reporting it started leaves
+    a task that no worker owns. Workers steal from every shard, so once a live
+    worker has been idle for `claim_timeout` seconds the queues are empty, and
+    every pending task that is not running is re-queued.
+
+    Args:
+        symbols: Universe to analyse
+        work_queue: Transport shared with the workers
+        n_shards: Hash partitions of the universe
+        chunk_size: Symbols per task, i.e. the most work lost with a worker
+        lease_timeout: Seconds of silence after which a worker is presumed dead
+        max_attempts: Attempts per task before giving up on its symbols
+        claim_timeout: Seconds a live worker must sit idle before unowned
+            pending tasks are presumed lost
+    """
+    def __init__(self, symbols: Iterable[str], work_queue: WorkQueue, n_shards: int,
+                 chunk_size: int = 10, lease_timeout: float = 60.0, max_attempts: int = 3,
+                 claim_timeout: float = 10.0):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.work_queue = work_queue
+        self.n_shards = n_shards
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self.tasks: Dict[int, Task] = {}
+        for shard, shard_symbols in sorted(partition(self.symbols, n_shards).items()):
+            for start in range(0, len(shard_symbols), chunk_size):
+                task_id = len(self.tasks)
+                self.tasks[task_id] = Task(task_id, shard, tuple(shard_symbols[start:start + chunk_size]))
+        self.pending = set(self.tasks)
+        self.running: Dict[int, str] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.idle_since: Dict[str, float] = {}
+        self.dead = set()
+        self.analysis_results: Dict[str, Optional[dict]] = {}
+        self.requeued = 0
+        self.shard_stats = {shard: {'symbols': 0, 'tasks': 0, 'busy_seconds': 0.0,
+                                    'first_start': None, 'last_done': None}
+                            for shard in {task.shard for task in self.tasks.values()}}
+
+    def submit(self):
+        for task_id in sorted(self.pending):
+            self.work_queue.put_task(self.tasks[task_id])
+
+    def _requeue(self, task_id: int, reason: str):
+        self.running.pop(task_id, None)
+        task = self.tasks[task_id]
+        if task.attempt + 1 >= self.max_attempts:
+            logging.error(f"Giving up on task {task_id} ({', '.join(task.symbols)}) after {reason}")
+            for symbol in task.symbols:
+                self.analysis_results[symbol] = None
+            self.pending.discard(task_id)
+            return
+        logging.error(f"Re-queuing task {task_id} after {reason}")
+        task = task._replace(attempt=task.attempt + 1)
+        self.tasks[task_id] = task
+        self.requeued += 1
+        increment('shard_requeues')
+        self.work_queue.put_task(task)
+
+    def _release(self, worker_id: str, reason: str):
+        """Re-queue everything a worker was running"""
+        for task_id in [t for t, w in self.running.items() if w == worker_id]:
+            self._requeue(task_id, reason)
+        self.last_seen.pop(worker_id, None)
+        self.idle_since.pop(worker_id, None)
+
+    def worker_died(self, worker_id: str):
+        """Re-queue everything a worker was running, and any task it reports starting later"""
+        self.dead.add(worker_id)
+        self._release(worker_id, f"worker {worker_id} died")
+
+    def handle(self, message: tuple):
+        kind, worker_id, task_id = message[:3]
+        now = time.monotonic()
+        if worker_id not in self.dead:
+            self.last_seen[worker_id] = now
+        if kind == 'started' and task_id in self.pending:
+            self.running[task_id] = worker_id
+            self.idle_since.pop(worker_id, None)
+            stats = self.shard_stats[self.tasks[task_id].shard]
+            stats['first_start'] = stats['first_start'] or now
+            if worker_id in self.dead:
+                # Sent before the worker died but read after worker_died()
+                self._requeue(task_id, f"worker {worker_id} died")
+        elif kind == 'done' and task_id in self.pending:
+            results, seconds = message[3], message[4]
+            task = self.tasks[task_id]
+            self.pending.discard(task_id)
+            self.running.pop(task_id, None)
+            self.analysis_results.update(results)
+            stats = self.shard_stats[task.shard]
+            stats['symbols'] += len(task.symbols)
+            stats['tasks'] += 1
+            stats['busy_seconds'] += seconds
+            stats['last_done'] = now
+            increment('shard_symbols', len(task.symbols))
+        if worker_id not in self.dead and worker_id not in self.running.values():
+            self.idle_since.setdefault(worker_id, now)
+
+    def check_leases(self):
+        now = time.monotonic()
+        cutoff = now - self.lease_timeout
+        for worker_id in [w for w, seen in self.last_seen.items() if seen < cutoff]:
+            if worker_id in self.running.values():
+                self._release(worker_id, f"worker {worker_id} stopped heartbeating")
+
+        unowned = self.pending - set(self.running)
+        if unowned and any(now - since > self.claim_timeout for since in self.idle_since.values()):
+            for task_id in sorted(unowned):
+                self._requeue(task_id, "it was taken by a worker that never started it")
+            # Give the re-queued tasks a full claim_timeout to be picked up
+            self.idle_since = dict.fromkeys(self.idle_since, now)
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def run(self, poll: Optional[Callable[[], None]] = None, timeout: Optional[float] = None) -> Dict[str, Optional[dict]]:
+        """
+        Submit every task and collect results until all are done.
+
+        Args:
+            poll: Called between messages, e.g. to check local worker processes
+            timeout: Give up after this many seconds (remaining symbols are absent)
+        """
+        self.started = time.monotonic()
+        self.submit()
+        while not self.done:
+            if timeout is not None and time.monotonic() - self.started > timeout:
+                logging.error(f"Sharded analysis timed out with {len(self.pending)} tasks left")
+                break
+            message = self.work_queue.get_message(timeout=0.5)
+            if message is not None:
+                self.handle(message)
+            if poll is not None:
+                poll()
+            self.check_leases()
+        self.finished = time.monotonic()
+        self.work_queue.shutdown()
+        return self.analysis_results
+
+    def throughput(self) -> Dict[int, dict]:
+        """Per shard: symbols, tasks, busy seconds and symbols per second (wall and busy)"""
+        report = {}
+        for shard, stats in sorted(self.shard_stats.items()):
+            wall = (stats['last_done'] - stats['first_start']) if stats['last_done'] else 0.0
+            report[shard] = {
+                'symbols': stats['symbols'],
+                'tasks': stats['tasks'],
+                'busy_seconds': stats['busy_seconds'],
+                'symbols_per_second': stats['symbols'] / wall if wall > 0 else float('nan'),
+                'symbols_per_busy_second': (stats['symbols'] / stats['busy_seconds']
+                                            if stats['busy_seconds'] > 0 else float('nan'))
+            }
+        return report
+
+def owned_shards(worker_index: int, n_workers: int, n_shards: int) -> List[int]:
+    return [s for s in range(n_shards) if s % n_workers == worker_index]
+
+def analyse_sharded(symbols: Iterable[str], processes: int = 4, n_shards: Optional[int] = None,
+                    analyse: Callable[[Sequence[str]], Dict[str, Optional[dict]]] = analyse_symbols,
+                    chunk_size: int = 10, lease_timeout: float = 60.0,
+                    respawn: bool = True, timeout: Optional[float] = None,
+                    claim_timeout: float = 10.0) -> Coordinator:
+    """
+    Analyse a universe with local worker processes.
+
+    Dead processes have their tasks re-queued at once and, with `respawn`,
+    are replaced by a new process owning the same shards.
+
+    Returns:
+        The finished Coordinator (analysis_results, throughput(), requeued)
+    """
+    n_shards = n_shards or processes * 2
+    context = multiprocessing.get_context()
+    manager = context.Manager()
+    work_queue = QueueWorkQueue(n_shards, manager)
+    log_queue = manager.Queue()
+    log_listener = listen_for_workers(log_queue)
+    coordinator = Coordinator(symbols, work_queue, n_shards, chunk_size, lease_timeout,
+                              claim_timeout=claim_timeout)
+    workers = {}
+
+    def spawn(index: int, generation: int = 0):
+        worker_id = f'worker-{index}.{generation}'
+        process = context.Process(
+            target=_worker_process,
+            args=(log_queue, work_queue, worker_id, owned_shards(index, processes, n_shards), analyse),
+            daemon=True)
+        process.start()
+        workers[worker_id] = (index, generation, process)
+
+    def poll():
+        for worker_id, (index, generation, process) in list(workers.items()):
+            if not process.is_alive() and not work_queue.is_shutdown():
+                logging.error(f"{worker_id} exited with code {process.exitcode}")
+                del workers[worker_id]
+                coordinator.worker_died(worker_id)
+                if respawn:
+                    spawn(index, generation + 1)
+
+    for index in range(processes):
+        spawn(index)
+    try:
+        coordinator.run(poll, timeout)
+    finally:
+        work_queue.shutdown()
+        for _, _, process in workers.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        log_listener.stop()
+        manager.shutdown()
+    return coordinator
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--universe', type=Path, help='Text file of symbols')
+    source.add_argument('--symbols', nargs='+', help='Symbols given on the command line')
+    source.add_argument('--sp500', action='store_true', help='Current S&P 500 constituents')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--shards', type=int, help='Hash partitions (default 2 per process)')
+    parser.add_argument('--chunk-size', type=int, default=10, help='Symbols per task')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=3600,
+                        help='Seconds before giving up on unfinished tasks')
+    args = parser.parse_args(argv)
+
+    from utils import setup_logging
+    from universe import UniverseRegistry
+    setup_logging()
+    if args.universe:
+        from screen import read_universe
+        symbols = read_universe(args.universe)
+    elif args.sp500:
+        symbols = UniverseRegistry().get('sp500')
+    else:
+        symbols = [s.upper() for s in args.symbols]
+
+    coordinator = analyse_sharded(symbols, args.processes, args.shards, chunk_size=args.chunk_size,
+                                  timeout=args.timeout)
+    elapsed = coordinator.finished - coordinator.started
+    print(f"Analysed {len(coordinator.analysis_results)} symbols in {elapsed:.1f}s "
+          f"({coordinator.requeued} tasks re-queued)")
+    for shard, stats in coordinator.throughput().items():
+        print(f"  shard {shard:>3}: {stats['symbols']:>5} symbols, "
+              f"{stats['symbols_per_second']:.2f} symbols/s")
+
+    from strategy import Strategy
+    strategy = Strategy(symbols)
+    strategy.merge_results(coordinator.analysis_results)
+    for stock in strategy.select_top_stocks('total', args.top):
+        print(f"{stock['symbol']}: {stock['score']:.2f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
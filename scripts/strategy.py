@@ -1,38 +1,52 @@
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 from datetime import datetime, timedelta
 
-from utils import setup_logging, fetch_data   # running script directly
+from utils import setup_logging, fetch_data, log_context   # running script directly
 from technical import TechnicalAnalyser       # running script directly
 from fundamental import FundamentalAnalyser   # running script directly
 from sentiment import SentimentAnalyser       # running script directly
-from .utils import setup_logging, fetch_data  # relative import for tests
-# from .technical import TechnicalAnalyser      # relative import for tests
-# from .fundamental import FundamentalAnalyser  # relative import for tests
-# from .sentiment import SentimentAnalyser      # relative import for tests
+from instrumentation import timed, timer      # running script directly
+from data_store import SymbolDataStore        # running script directly
+from correlation import CorrelationClusters   # running script directly
+from timeframes import TimeframeCache, history_days  # running script directly
 
 class Strategy:
-    def __init__(self, symbols: list):
+    def __init__(self, symbols: list, data_store: Optional[SymbolDataStore] = None):
         self.symbols = symbols
-        self.stock_data: Dict[str, pd.DataFrame] = {}
+        # Compact OHLCV under a memory budget; least recently used symbols spill to disk
+        self.stock_data = data_store if data_store is not None else SymbolDataStore()
+        # Weekly/monthly bars resampled from stock_data on demand and memoised
+        self.timeframes = TimeframeCache(self.stock_data)
         self.analysis_results: Dict[str, dict] = {}
         self.last_update = None
+        self._clusters = None   # (last_update, CorrelationClusters)
+        self._extended = set()  # Symbols whose history was fetched for a longer timeframe
+        self.weights = {
+            'technical': 0.4,
+            'fundamental': 0.4,
+            'sentiment': 0.2
+        }
     
+    @timed('strategy_stage', stage='fetch_all_data')
     def fetch_all_data(self):
         """Fetch data for all symbols once"""
         for symbol in self.symbols:
-            try:
-                self.stock_data[symbol] = fetch_data(symbol)
-            except Exception as e:
-                logging.error(f"Error fetching data for {symbol}: {e}")
-                self.stock_data[symbol] = None
+            with log_context(symbol=symbol):
+                try:
+                    self.stock_data[symbol] = fetch_data(symbol)
+                except Exception as e:
+                    logging.error(f"Error fetching data for {symbol}: {e}")
+                    self.stock_data[symbol] = None
     
     def refresh_data(self):
         """Clear and refresh all stock data"""
         self.stock_data.clear()
+        self._extended.clear()
         self.fetch_all_data()
     
+    @timed('strategy_stage', stage='analyse_all_stocks')
     def analyse_all_stocks(self):
         """Run analysis for all symbols once"""
         if not self.stock_data:
@@ -41,35 +55,86 @@ class Strategy:
         self.analysis_results.clear()
         
         for symbol in self.symbols:
-            try:
-                if self.stock_data.get(symbol) is not None:
-                    tech = TechnicalAnalyser(self.stock_data[symbol])
-                    tech_score = tech.analyse()
-                    
+            # analyse_symbol sets the same context; this one also covers the error below
+            with log_context(symbol=symbol):
+                try:
+                    if self.stock_data.get(symbol) is not None:
+                        self.analysis_results[symbol] = self.analyse_symbol(symbol, self.stock_data[symbol])
+                except Exception as e:
+                    logging.error(f"Error analyzing {symbol}: {e}")
+                    self.analysis_results[symbol] = None
+        
+        self.last_update = datetime.now()
+    
+    def merge_results(self, results: Dict[str, Optional[dict]]):
+        """Adopt analysis results computed elsewhere, e.g. by sharded workers"""
+        self.analysis_results.update(results)
+        self.last_update = datetime.now()
+    
+    def analyse_symbol(self, symbol: str, data: Optional[pd.DataFrame] = None,
+                       components: Optional[List[str]] = None) -> dict:
+        """
+        Score one symbol on the selected components.
+        
+        Args:
+            symbol: Stock symbol
+            data: Price history for the technical score; fetched if not given
+            components: Subset of 'technical', 'fundamental', 'sentiment' (default all)
+            
+        Returns:
+            Result dict as stored in analysis_results. Skipped components are None
+            and the total score is re-weighted over the ones that ran.
+        """
+        components = components or list(self.weights)
+        unknown = set(components) - set(self.weights)
+        if unknown:
+            raise ValueError(f"Invalid component: {', '.join(sorted(unknown))}")
+        
+        scores = {name: None for name in self.weights}
+        with log_context(symbol=symbol):
+            if 'technical' in components:
+                if data is None:
+                    data = fetch_data(symbol)
+                with timer('strategy_stage', stage='technical'):
+                    tech = TechnicalAnalyser(data)
+                    scores['technical'] = tech.analyse()
+            
+            if 'fundamental' in components:
+                with timer('strategy_stage', stage='fundamental'):
                     fund = FundamentalAnalyser(symbol)
-                    fund_score = fund.analyse()
-                    
+                    scores['fundamental'] = fund.analyse()
+            
+            if 'sentiment' in components:
+                with timer('strategy_stage', stage='sentiment'):
                     sent = SentimentAnalyser(symbol)
-                    sent_score = sent.analyse()
-                    
-                    total_score = (
-                        tech_score * 0.4 +
-                        fund_score * 0.4 +
-                        sent_score * 0.2
-                    )
-                    
-                    self.analysis_results[symbol] = {
-                        'symbol': symbol,
-                        'score': total_score,
-                        'technical': tech_score,
-                        'fundamental': fund_score,
-                        'sentiment': sent_score
-                    }
-            except Exception as e:
-                logging.error(f"Error analyzing {symbol}: {e}")
-                self.analysis_results[symbol] = None
+                    scores['sentiment'] = sent.analyse()
         
-        self.last_update = datetime.now()
+        weight = sum(self.weights[name] for name in components)
+        total_score = sum(scores[name] * self.weights[name] for name in components) / weight
+        
+        return {
+            'symbol': symbol,
+            'score': total_score,
+            **scores
+        }
+    
+    def technical_score(self, symbol: str, timeframe: str = 'weekly') -> float:
+        """
+        Technical score on another timeframe, from the cached price data.
+        
+        Indicator periods count bars of that timeframe, so when the cached
+        daily history spans fewer than TechnicalAnalyser.MIN_BARS weeks or
+        months, it is re-fetched once with enough days.
+        """
+        days = history_days(timeframe, TechnicalAnalyser.MIN_BARS)
+        df = self.stock_data.get(symbol)
+        if df is None or (symbol not in self._extended and
+                          (df.empty or df.index[0] > df.index[-1] - pd.Timedelta(days=days - 7))):
+            self.stock_data[symbol] = fetch_data(symbol, period=days)
+            self._extended.add(symbol)
+        with log_context(symbol=symbol, timeframe=timeframe):
+            bars = self.timeframes.get(symbol, timeframe)
+            return TechnicalAnalyser(bars).analyse()
     
     def get_analysis(self, symbol: str) -> dict:
         """Get analysis results for a symbol"""
@@ -78,8 +143,27 @@ class Strategy:
             self.analyse_all_stocks()
         return self.analysis_results.get(symbol)
     
-    def select_top_stocks(self, score_type: str = 'total', n: int = 5) -> List[dict]:
-        """Select top N stocks based on specified score type"""
+    def correlation_clusters(self) -> CorrelationClusters:
+        """Return correlations of the analysed symbols, rebuilt once per analysis"""
+        if self._clusters is None or self._clusters[0] != self.last_update:
+            symbols = [s for s, r in self.analysis_results.items() if r]
+            frames = {s: self.stock_data.get(s) for s in symbols}
+            self._clusters = (self.last_update, CorrelationClusters(frames))
+        return self._clusters[1]
+    
+    @timed('strategy_stage', stage='select_top_stocks')
+    def select_top_stocks(self, score_type: str = 'total', n: int = 5,
+                          diversify: bool = False, max_per_cluster: int = 1,
+                          threshold: float = 0.5) -> List[dict]:
+        """
+        Select top N stocks based on specified score type
+        
+        Args:
+            score_type: 'total', 'technical', 'fundamental' or 'sentiment'
+            n: Number of stocks
+            diversify: Take at most `max_per_cluster` stocks from each cluster of
+                stocks whose shrunk return correlation is at least `threshold`
+        """
         if not self.analysis_results:
             self.analyse_all_stocks()
         
@@ -104,6 +188,13 @@ class Strategy:
             reverse=True           # Highest scores first
         )
         
+        if diversify:
+            clusters = self.correlation_clusters()
+            picked = clusters.diversify([r['symbol'] for r in sorted_results], n,
+                                        max_per_cluster, threshold)
+            by_symbol = {r['symbol']: r for r in sorted_results}
+            return [by_symbol[symbol] for symbol in picked]
+        
         # Return top N stocks
         return sorted_results[:n]  # Slice first N results
 
@@ -122,6 +213,11 @@ if __name__ == '__main__':
     strategy = Strategy(symbols)
     strategy.analyse_all_stocks()
     
+    # With TRADING_INSTRUMENTATION=1, keep a timing/counter profile of the run
+    from instrumentation import REGISTRY
+    if REGISTRY.enabled:
+        REGISTRY.write_profile(f"logs/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    
     # Get top stocks by different metrics
     print("\nTop Stocks by Total Score:")
     for stock in strategy.select_top_stocks('total', 5):
@@ -0,0 +1,398 @@
+"""
+Streaming tick-to-bar ingestion with incremental intraday technical scores.
+
+A TickSource feeds trades into a bounded queue, a BarAggregator rolls them
+into fixed-interval OHLCV bars, and every closed bar re-scores only its own
+symbol over a rolling window of recent bars. Queues are bounded, so a slow
+stage blocks the one before it (down to the socket) instead of growing memory.
+
+Usage:
+    python scripts/streaming.py --file ticks.csv --interval 60
+    python scripts/streaming.py --socket 127.0.0.1:9000 --store results/intraday_scores.json
+"""
+import argparse
+import logging
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+
+from technical import TechnicalAnalyser                  # running script directly
+from instrumentation import increment                    # running script directly
+
+class Tick(NamedTuple):
+    symbol: str
+    timestamp: float    # Unix seconds
+    price: float
+    size: float
+
+class Bar(NamedTuple):
+    symbol: str
+    start: float        # Unix seconds at the start of the interval
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+def parse_tick(line: str) -> Optional[Tick]:
+    """
+    Parse 'timestamp,symbol,price,size'. The timestamp is Unix seconds or ISO
+    8601. Returns None for blank lines and the header.
+    """
+    fields = line.strip().split(',')
+    if len(fields) != 4 or fields[0] == 'timestamp':
+        return None
+    stamp, symbol, price, size = fields
+    try:
+        timestamp = float(stamp)
+    except ValueError:
+        timestamp = datetime.fromisoformat(stamp).timestamp()
+    return Tick(symbol.strip().upper(), timestamp, float(price), float(size))
+
+def format_tick(tick: Tick) -> str:
+    return f'{tick.timestamp},{tick.symbol},{tick.price},{tick.size}\n'
+
+class TickSource(ABC):
+    @abstractmethod
+    def ticks(self) -> Iterator[Tick]:
+        """Yield ticks in arrival order until the feed ends"""
+        pass
+
+class FileReplaySource(TickSource):
+    """
+    Replays ticks from a CSV file.
+
+    Args:
+        path: File of 'timestamp,symbol,price,size' lines
+        speed: Replay at this multiple of real time; None replays as fast as possible
+    """
+    def __init__(self, path, speed: Optional[float] = None):
+        self.path = Path(path)
+        self.speed = speed
+
+    def ticks(self) -> Iterator[Tick]:
+        first = started = None
+        with open(self.path) as f:
+            for line in f:
+                tick = parse_tick(line)
+                if tick is None:
+                    continue
+                if self.speed:
+                    if first is None:
+                        first, started = tick.timestamp, time.monotonic()
+                    delay = (tick.timestamp - first) / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                yield tick
+
+class SocketSource(TickSource):
+    """Reads newline-delimited ticks (same format as FileReplaySource) from a TCP feed"""
+    def __init__(self, host: str, port: int, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def ticks(self) -> Iterator[Tick]:
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            with conn.makefile('r') as lines:
+                for line in lines:
+                    tick = parse_tick(line)
+                    if tick is not None:
+                        yield tick
+
+class ReplayServer:
+    """
+    Serves a tick file to each TCP client, as a local stand-in for a live feed.
+
+    Call close() to stop; port 0 picks a free port (see .port).
+    """
+    def __init__(self, path, host: str = '127.0.0.1', port: int = 0):
+        ticks = FileReplaySource(path)
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    for tick in ticks.ticks():
+                        self.wfile.write(format_tick(tick).encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class BarAggregator:
+    """
+    Rolls ticks into fixed-interval OHLCV bars per symbol.
+
+    A symbol's bar closes when one of its ticks falls in a later interval, or
+    when the feed's clock (the latest tick time seen) passes the end of the
+    interval plus `grace` seconds, so quiet symbols still get their bar.
+    """
+    def __init__(self, interval: float = 60, grace: float = 1.0):
+        self.interval = interval
+        self.grace = grace
+        self.open_bars: Dict[str, list] = {}
+        self.last_closed: Dict[str, float] = {}
+        self.watermark = float('-inf')
+        self._next_sweep = float('-inf')
+
+    def _close(self, symbol: str) -> Bar:
+        bar = Bar(symbol, *self.open_bars.pop(symbol))
+        self.last_closed[symbol] = bar.start
+        return bar
+
+    def add(self, tick: Tick) -> List[Bar]:
+        """Add a tick; returns any bars it closed"""
+        closed = []
+        start = tick.timestamp - tick.timestamp % self.interval
+        bar = self.open_bars.get(tick.symbol)
+        if start <= self.last_closed.get(tick.symbol, float('-inf')) or (bar is not None and start < bar[0]):
+            # Late tick for an interval that already closed
+            increment('stream_late_ticks')
+        else:
+            if bar is not None and start > bar[0]:
+                closed.append(self._close(tick.symbol))
+                bar = None
+            if bar is None:
+                self.open_bars[tick.symbol] = [start, tick.price, tick.price, tick.price, tick.price, tick.size]
+            else:
+                bar[2] = max(bar[2], tick.price)
+                bar[3] = min(bar[3], tick.price)
+                bar[4] = tick.price
+                bar[5] += tick.size
+
+        if tick.timestamp > self.watermark:
+            self.watermark = tick.timestamp
+            if self.watermark >= self._next_sweep:
+                closed.extend(self.close_until(self.watermark - self.grace))
+        return closed
+
+    def close_until(self, timestamp: float) -> List[Bar]:
+        """Close every open bar whose interval ended at or before `timestamp`"""
+        closed = [self._close(symbol) for symbol, bar in list(self.open_bars.items())
+                  if bar[0] + self.interval <= timestamp]
+        # No open bar can end before the next interval boundary
+        self._next_sweep = timestamp - timestamp % self.interval + self.interval + self.grace
+        return closed
+
+    def flush(self) -> List[Bar]:
+        """Close all open bars, e.g. at the end of the feed"""
+        return [self._close(symbol) for symbol in list(self.open_bars)]
+
+class IntradayTechnicals:
+    """
+    Rolling window of recent bars per symbol, re-scored on each new bar.
+
+    Args:
+        window: Bars kept per symbol (enough for the 50-bar SMA and its warm-up)
+        min_bars: Bars needed before a symbol is scored
+        on_score: Called with (symbol, score, bar) after each update
+    """
+    def __init__(self, window: int = 120, min_bars: int = 35,
+                 on_score: Optional[Callable[[str, float, Bar], None]] = None):
+        self.window = window
+        self.min_bars = min_bars
+        self.on_score = on_score
+        self.bars: Dict[str, deque] = {}
+        self.scores: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        bars = list(self.bars.get(symbol, ()))
+        return pd.DataFrame(
+            [bar[2:] for bar in bars],
+            columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+            index=pd.to_datetime([bar.start for bar in bars], unit='s')
+        )
+
+    def update(self, bar: Bar) -> Optional[float]:
+        """Append a closed bar and re-score its symbol; None until min_bars are in"""
+        history = self.bars.setdefault(bar.symbol, deque(maxlen=self.window))
+        history.append(bar)
+        if len(history) < self.min_bars:
+            return None
+        score = TechnicalAnalyser(self.frame(bar.symbol)).analyse()
+        with self._lock:
+            self.scores[bar.symbol] = score
+        increment('stream_scores')
+        if self.on_score is not None:
+            self.on_score(bar.symbol, score, bar)
+        return score
+
+_DONE = object()
+
+class StreamingPipeline:
+    """
+    Source -> tick queue -> aggregator -> bar queues -> scoring workers.
+
+    Bars are sharded across scoring workers by symbol, so each symbol's bars
+    are scored in order. Every queue is bounded: when scoring falls behind,
+    the aggregator blocks, then the reader, then the source itself.
+
+    Args:
+        source: Where ticks come from
+        technicals: Scores closed bars
+        interval: Bar length in seconds
+        tick_queue_size: Capacity of the tick queue
+        bar_queue_size: Capacity of each scoring worker's queue
+        workers: Scoring worker threads
+    """
+    def __init__(self, source: TickSource, technicals: IntradayTechnicals,
+                 interval: float = 60, tick_queue_size: int = 10000,
+                 bar_queue_size: int = 1000, workers: int = 1):
+        self.source = source
+        self.technicals = technicals
+        self.aggregator = BarAggregator(interval)
+        self.tick_queue: 'queue.Queue' = queue.Queue(maxsize=tick_queue_size)
+        self.bar_queues = [queue.Queue(maxsize=bar_queue_size) for _ in range(workers)]
+        self.stats = {'ticks': 0, 'bars': 0, 'scored': 0, 'errors': 0,
+                      'tick_queue_peak': 0, 'bar_queue_peak': 0}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _count(self, name: str, value: int = 1):
+        with self._stats_lock:
+            self.stats[name] += value
+
+    def _peak(self, name: str, size: int):
+        if size > self.stats[name]:
+            with self._stats_lock:
+                self.stats[name] = max(self.stats[name], size)
+
+    def _read(self):
+        try:
+            for tick in self.source.ticks():
+                if self._stop.is_set():
+                    break
+                self.tick_queue.put(tick)
+                self._peak('tick_queue_peak', self.tick_queue.qsize())
+        except Exception as e:
+            logging.error(f"Tick source error: {e}")
+        finally:
+            self.tick_queue.put(_DONE)
+
+    def _dispatch(self, bars: List[Bar]):
+        for bar in bars:
+            bar_queue = self.bar_queues[zlib.crc32(bar.symbol.encode()) % len(self.bar_queues)]
+            bar_queue.put(bar)
+            self._peak('bar_queue_peak', bar_queue.qsize())
+        self._count('bars', len(bars))
+
+    def _aggregate(self):
+        ticks = 0
+        while True:
+            tick = self.tick_queue.get()
+            if tick is _DONE:
+                break
+            ticks += 1
+            bars = self.aggregator.add(tick)
+            if bars:
+                self._dispatch(bars)
+            if ticks % 1000 == 0:
+                self._count('ticks', ticks)
+                ticks = 0
+        self._count('ticks', ticks)
+        self._dispatch(self.aggregator.flush())
+        for bar_queue in self.bar_queues:
+            bar_queue.put(_DONE)
+
+    def _score(self, bar_queue: 'queue.Queue'):
+        while True:
+            bar = bar_queue.get()
+            if bar is _DONE:
+                break
+            try:
+                if self.technicals.update(bar) is not None:
+                    self._count('scored')
+            except Exception as e:
+                logging.error(f"Error scoring bar for {bar.symbol}: {e}")
+                self._count('errors')
+
+    def start(self):
+        targets = [(self._read, ()), (self._aggregate, ())]
+        targets += [(self._score, (bar_queue,)) for bar_queue in self.bar_queues]
+        self._threads = [threading.Thread(target=target, args=args, daemon=True)
+                         for target, args in targets]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop reading; ticks already queued are still aggregated and scored"""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def run(self) -> dict:
+        """Process the whole feed and return the stats"""
+        self.start()
+        self.join()
+        return dict(self.stats)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    feed = parser.add_mutually_exclusive_group(required=True)
+    feed.add_argument('--file', type=Path, help='Replay ticks from a CSV file')
+    feed.add_argument('--socket', help='host:port of a newline-delimited tick feed')
+    parser.add_argument('--speed', type=float, help='File replay speed (multiple of real time)')
+    parser.add_argument('--interval', type=float, default=60, help='Bar length in seconds')
+    parser.add_argument('--window', type=int, default=120, help='Bars kept per symbol')
+    parser.add_argument('--workers', type=int, default=1, help='Scoring threads')
+    parser.add_argument('--store', type=Path, default=Path('results/intraday_scores.json'),
+                        help='ResultStore the intraday technical scores are published to')
+    args = parser.parse_args(argv)
+
+    from utils import setup_logging
+    from result_store import ResultStore
+    setup_logging()
+
+    if args.file:
+        source = FileReplaySource(args.file, args.speed)
+    else:
+        host, port = args.socket.rsplit(':', 1)
+        source = SocketSource(host, int(port))
+
+    store = ResultStore(args.store)
+    last_flush = [0.0]
+
+    def publish(symbol: str, score: float, bar: Bar):
+        store.publish(symbol, 'technical', score, updated=bar.start + args.interval)
+        if time.monotonic() - last_flush[0] > 1:
+            store.flush()
+            last_flush[0] = time.monotonic()
+
+    pipeline = StreamingPipeline(source, IntradayTechnicals(args.window, on_score=publish),
+                                 args.interval, workers=args.workers)
+    try:
+        stats = pipeline.run()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        pipeline.join(timeout=10)
+        stats = pipeline.stats
+    store.flush()
+    print(', '.join(f'{name}: {value}' for name, value in stats.items()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
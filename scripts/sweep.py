@@ -0,0 +1,271 @@
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing as mp
+import os
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester  # run script directly
+from scoring import ScorePanel   # run script directly
+
+# Backtester arguments a sweep may vary. Nested weights use dotted names,
+# e.g. 'weights.technical' or 'signal_weights.RSI_Oversold'.
+SWEEP_PARAMETERS = ('buy_threshold', 'sell_threshold', 'position_fraction',
+                    'weights', 'signal_weights')
+
+class ParameterGrid:
+    """Every combination of the listed parameter values"""
+    def __init__(self, grid: Dict[str, list]):
+        self.grid = grid
+
+    def __iter__(self) -> Iterator[dict]:
+        names = sorted(self.grid)
+        for values in itertools.product(*(self.grid[name] for name in names)):
+            yield dict(zip(names, values))
+
+    def __len__(self) -> int:
+        return int(np.prod([len(values) for values in self.grid.values()]))
+
+class RandomSearch:
+    """
+    Random configurations from a search space.
+
+    Lists are sampled uniformly as choices and (low, high) tuples as uniform
+    floats. The seed makes the sequence reproducible, which resuming relies on.
+    """
+    def __init__(self, space: Dict[str, Union[list, Tuple[float, float]]],
+                 n_iter: int, seed: int = 0):
+        self.space = space
+        self.n_iter = n_iter
+        self.seed = seed
+
+    def __iter__(self) -> Iterator[dict]:
+        rng = np.random.default_rng(self.seed)
+        names = sorted(self.space)
+        for _ in range(self.n_iter):
+            params = {}
+            for name in names:
+                values = self.space[name]
+                if isinstance(values, tuple):
+                    params[name] = float(rng.uniform(*values))
+                else:
+                    params[name] = values[rng.integers(len(values))]
+            yield params
+
+    def __len__(self) -> int:
+        return self.n_iter
+
+def config_id(params: dict) -> str:
+    """Stable id of a configuration, used to skip finished work on resume"""
+    encoded = json.dumps(params, sort_keys=True, default=float)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+def backtester_kwargs(params: dict, base: dict) -> dict:
+    """Merge flat, dotted sweep parameters into Backtester keyword arguments"""
+    kwargs = {key: dict(value) if isinstance(value, dict) else value
+              for key, value in base.items()}
+    for name, value in params.items():
+        key, _, field = name.partition('.')
+        if key not in SWEEP_PARAMETERS:
+            raise ValueError(f"Invalid sweep parameter: {name}")
+        if field:
+            kwargs.setdefault(key, {})[field] = value
+        else:
+            kwargs[key] = value
+    return kwargs
+
+class SharedPanel:
+    """
+    ScorePanel arrays copied once into shared memory.
+
+    Workers attach to the blocks by name and wrap them in read-only NumPy
+    views, so price and score data is never pickled per task.
+    """
+    ARRAYS = ('close', 'signals', 'volatility', 'fundamental', 'sentiment')
+
+    def __init__(self, panel: ScorePanel):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        arrays = {}
+        for name in self.ARRAYS:
+            array = np.ascontiguousarray(getattr(panel, name))
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            arrays[name] = (block.name, array.shape, array.dtype.str)
+
+        # Small metadata travels to each worker once, through the pool initializer
+        self.spec = {
+            'dates': panel.dates.values,
+            'symbols': panel.symbols,
+            'signal_names': panel.signal_names,
+            'components': panel.components,
+            'arrays': arrays
+        }
+
+    def release(self):
+        """Close and unlink every block; call once all workers are done"""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    @staticmethod
+    def attach(spec: dict) -> Tuple[ScorePanel, List[shared_memory.SharedMemory]]:
+        """Rebuild a ScorePanel on top of the shared blocks described by `spec`"""
+        blocks = []
+        arrays = {}
+        for name, (block_name, shape, dtype) in spec['arrays'].items():
+            block = shared_memory.SharedMemory(name=block_name)
+            # Pool workers share the parent's resource tracker, which drops the
+            # block when the parent unlinks it. Only a process started outside
+            # multiprocessing has its own tracker, which would unlink on exit.
+            if mp.parent_process() is None:
+                resource_tracker.unregister(block._name, 'shared_memory')
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            view.flags.writeable = False
+            arrays[name] = view
+            blocks.append(block)
+
+        panel = ScorePanel(
+            dates=pd.DatetimeIndex(spec['dates']),
+            symbols=spec['symbols'],
+            signal_names=spec['signal_names'],
+            components=spec['components'],
+            **arrays
+        )
+        return panel, blocks
+
+# Per-worker state set by _init_worker
+_worker = {}
+
+def _init_worker(spec: dict, start_date: str, initial_capital: float, base: dict):
+    panel, blocks = SharedPanel.attach(spec)
+    _worker.update(panel=panel, blocks=blocks, start_date=start_date,
+                   initial_capital=initial_capital, base=base)
+
+def _run_config(task: Tuple[str, dict]) -> dict:
+    cid, params = task
+    try:
+        backtester = Backtester(
+            None, _worker['panel'].symbols, _worker['start_date'],
+            initial_capital=_worker['initial_capital'],
+            record_equity=False,
+            **backtester_kwargs(params, _worker['base'])
+        )
+        backtester.panel = _worker['panel']
+        metrics = backtester.run()
+    except Exception as e:
+        logging.error(f"Sweep configuration {cid} failed: {e}")
+        metrics = {'error': str(e)}
+    return {'config_id': cid, 'params': params, **metrics}
+
+class SweepRunner:
+    """
+    Run Backtester over a parameter grid or random search on a process pool.
+
+    Results are appended to a JSON-lines checkpoint as they arrive, and a
+    rerun with the same checkpoint skips configurations already recorded.
+    """
+    def __init__(self, panel: ScorePanel, start_date: str,
+                 space: Union[ParameterGrid, RandomSearch],
+                 initial_capital: float = 100000,
+                 base_params: Optional[dict] = None,
+                 checkpoint: Optional[Union[str, Path]] = None,
+                 processes: Optional[int] = None,
+                 chunksize: int = 4):
+        self.panel = panel
+        self.start_date = start_date
+        self.space = space
+        self.initial_capital = initial_capital
+        # Values not being swept, e.g. {'weights': {...}} from the live Strategy,
+        # or {'max_drawdown_limit': 30} to abandon configurations early
+        self.base_params = base_params or {
+            'weights': {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+        }
+        self.checkpoint = Path(checkpoint) if checkpoint else None
+        self.processes = processes or os.cpu_count()
+        self.chunksize = chunksize
+
+    def completed(self) -> List[dict]:
+        """Results already recorded in the checkpoint"""
+        if not self.checkpoint or not self.checkpoint.exists():
+            return []
+        results = []
+        with open(self.checkpoint) as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves one truncated line; it is rerun
+                    logging.error(f"Skipping corrupt checkpoint line in {self.checkpoint}")
+        return results
+
+    def iter_results(self) -> Iterator[dict]:
+        """Yield results as workers finish, starting with checkpointed ones"""
+        done = self.completed()
+        seen = {result['config_id'] for result in done}
+        yield from done
+
+        tasks = []
+        for params in self.space:
+            cid = config_id(params)
+            if cid not in seen:
+                seen.add(cid)
+                tasks.append((cid, params))
+        if not tasks:
+            return
+
+        shared = SharedPanel(self.panel)
+        out = open(self.checkpoint, 'a') if self.checkpoint else None
+        try:
+            with mp.Pool(self.processes, initializer=_init_worker,
+                         initargs=(shared.spec, self.start_date,
+                                   self.initial_capital, self.base_params)) as pool:
+                for result in pool.imap_unordered(_run_config, tasks, self.chunksize):
+                    if out:
+                        out.write(json.dumps(result, default=float) + '\n')
+                        out.flush()
+                    yield result
+        finally:
+            if out:
+                out.close()
+            shared.release()
+
+    def run(self, sort_by: str = 'sharpe_ratio', ascending: bool = False) -> pd.DataFrame:
+        """Run the whole sweep and return one row per configuration, best first"""
+        return results_table(self.iter_results(), sort_by, ascending)
+
+def results_table(results, sort_by: str = 'sharpe_ratio', ascending: bool = False) -> pd.DataFrame:
+    """Flatten sweep results into a DataFrame with one column per parameter"""
+    rows = [{'config_id': r['config_id'],
+             **{f'param.{k}': v for k, v in r['params'].items()},
+             **{k: v for k, v in r.items() if k not in ('config_id', 'params')}}
+            for r in results]
+    df = pd.DataFrame(rows)
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=ascending, na_position='last')
+    return df.reset_index(drop=True)
+
+if __name__ == '__main__':
+    from utils import setup_logging  # run script directly
+    setup_logging()
+
+    # Example: load prices once, then sweep thresholds and sizing on every core
+    symbols = ['AAPL', 'MSFT', 'GOOGL']
+    backtester = Backtester(None, symbols, '2022-01-01',
+                            weights={'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2})
+    panel = backtester.build_panel()
+
+    grid = ParameterGrid({
+        'buy_threshold': [60, 65, 70],
+        'sell_threshold': [30, 40],
+        'position_fraction': [0.05, 0.1, 0.2],
+        'weights.technical': [0.4, 0.6, 0.8]
+    })
+    runner = SweepRunner(panel, '2022-01-01', grid, checkpoint='sweep_results.jsonl')
+    print(runner.run().head(10))
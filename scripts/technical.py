@@ -1,54 +1,139 @@
-import talib
 import pandas as pd
 import logging
+from typing import Optional
+# talib is imported inside the methods that use it, so importing the analyser stays fast
+
+from instrumentation import increment, timed
+from timeframes import resample_ohlcv
 
 class TechnicalAnalyser:
-    def __init__(self, data: pd.DataFrame):
-        self.data = data
-        self.signal_weights = {
-            'RSI_Oversold': 35,       # Strong oversold signal
-            'RSI_Overbought': -10,    # Weak overbought signal
-            'MACD_Crossover': 5,       # Slight trend confirmation
-            'Above_SMA20': 0,          # Neutral trend signal
-            'Price_Above_SMA50': 0,    # Neutral trend signal
-            'BB_Upper_Break': -15,     # Weak overbought signal
-            'BB_Lower_Break': 25,      # Oversold signal
-            'Stoch_Oversold': 30,      # Strong oversold signal
-            'Stoch_Overbought': -10     # Weak overbought signal
-        }
+    DEFAULT_SIGNAL_WEIGHTS = {
+        'RSI_Oversold': 35,       # Strong oversold signal
+        'RSI_Overbought': -10,    # Weak overbought signal
+        'MACD_Crossover': 5,       # Slight trend confirmation
+        'Above_SMA20': 0,          # Neutral trend signal
+        'Price_Above_SMA50': 0,    # Neutral trend signal
+        'BB_Upper_Break': -15,     # Weak overbought signal
+        'BB_Lower_Break': 25,      # Oversold signal
+        'Stoch_Oversold': 30,      # Strong oversold signal
+        'Stoch_Overbought': -10     # Weak overbought signal
+    }
+    # Bars the longest indicator (SMA50) needs before every signal is defined
+    MIN_BARS = 50
+
+    def __init__(self, data: pd.DataFrame, timeframe: Optional[str] = None):
+        """
+        Args:
+            data: OHLCV bars, daily or intraday
+            timeframe: Timeframe to analyse ('1h', '4h', 'daily', 'weekly',
+                'monthly'), resampled from `data`; indicator periods are in
+                bars of this timeframe. None analyses the bars as given.
+        """
+        self.data = data if timeframe is None else resample_ohlcv(data, timeframe)
+        self.timeframe = timeframe
+        self.signal_weights = dict(self.DEFAULT_SIGNAL_WEIGHTS)
     
     def calculate_indicators(self) -> pd.DataFrame:
-        """Calculate technical indicators"""
-        self.data['RSI'] = talib.RSI(self.data['Close'])
-        self.data['MACD'], self.data['MACD_Signal'], _ = talib.MACD(self.data['Close'])
-        self.data['SMA_20'] = talib.SMA(self.data['Close'], timeperiod=20)
-        self.data['SMA_50'] = talib.SMA(self.data['Close'], timeperiod=50)
-        return self.data
+        """
+        Calculate technical indicators.
+        
+        Returned as a separate frame rather than added to self.data, so the
+        (possibly shared) price data is not modified or enlarged.
+        """
+        import talib
+        close = self.data['Close']
+        macd, macd_signal, _ = talib.MACD(close)
+        indicators = pd.DataFrame({
+            'RSI': talib.RSI(close),
+            'MACD': macd,
+            'MACD_Signal': macd_signal,
+            'SMA_20': talib.SMA(close, timeperiod=20),
+            'SMA_50': talib.SMA(close, timeperiod=50)
+        }, index=self.data.index)
+        increment('talib_calls', 4)
+        return indicators
     
     def get_signals(self) -> dict:
         """Generate technical signals"""
-        self.calculate_indicators()
-        latest_data = self.data.iloc[-1]
+        import talib
+        indicators = self.calculate_indicators()
+        latest_data = indicators.iloc[-1]
+        latest_close = self.data['Close'].iloc[-1]
         # Add Bollinger Bands
         upper, middle, lower = talib.BBANDS(self.data['Close'])
         
         # Add Stochastic Oscillator
         slowk, slowd = talib.STOCH(self.data['High'], self.data['Low'], self.data['Close'])
+        increment('talib_calls', 2)
         
         return {
             'RSI_Oversold': latest_data['RSI'] < 30,
             'RSI_Overbought': latest_data['RSI'] > 70,
-            'MACD_Crossover': self.data['MACD'].iloc[-1] > self.data['MACD_Signal'].iloc[-1],
-            'Above_SMA20': latest_data['Close'] > latest_data['SMA_20'],
-            'Price_Above_SMA50': latest_data['Close'] > latest_data['SMA_50'],
-            'BB_Upper_Break': latest_data['Close'] > upper.iloc[-1],
-            'BB_Lower_Break': latest_data['Close'] < lower.iloc[-1],
+            'MACD_Crossover': latest_data['MACD'] > latest_data['MACD_Signal'],
+            'Above_SMA20': latest_close > latest_data['SMA_20'],
+            'Price_Above_SMA50': latest_close > latest_data['SMA_50'],
+            'BB_Upper_Break': latest_close > upper.iloc[-1],
+            'BB_Lower_Break': latest_close < lower.iloc[-1],
             'Stoch_Oversold': slowk.iloc[-1] < 20,
             'Stoch_Overbought': slowk.iloc[-1] > 80
         }
 
+    def signal_frame(self) -> pd.DataFrame:
+        """
+        Evaluate every technical signal on every bar.
+        
+        TA-Lib indicators are causal, so row t only depends on bars up to t and
+        equals get_signals() run on the data truncated at t.
+        """
+        import talib
+        close = self.data['Close']
+        rsi = talib.RSI(close)
+        macd, macd_signal, _ = talib.MACD(close)
+        sma_20 = talib.SMA(close, timeperiod=20)
+        sma_50 = talib.SMA(close, timeperiod=50)
+        upper, _, lower = talib.BBANDS(close)
+        slowk, _ = talib.STOCH(self.data['High'], self.data['Low'], close)
+        increment('talib_calls', 6)
+        
+        # Comparisons against NaN (indicator warm-up) are False, as in get_signals()
+        return pd.DataFrame({
+            'RSI_Oversold': rsi < 30,
+            'RSI_Overbought': rsi > 70,
+            'MACD_Crossover': macd > macd_signal,
+            'Above_SMA20': close > sma_20,
+            'Price_Above_SMA50': close > sma_50,
+            'BB_Upper_Break': close > upper,
+            'BB_Lower_Break': close < lower,
+            'Stoch_Oversold': slowk < 20,
+            'Stoch_Overbought': slowk > 80
+        }, index=self.data.index)
+    
+    def volatility_series(self) -> pd.Series:
+        """Per-bar volatility multiplier (1 + ATR/Close, capped at 2) used by analyse()"""
+        import talib
+        atr = talib.ATR(self.data['High'], self.data['Low'], self.data['Close'])
+        ratio = atr / self.data['Close']
+        increment('talib_calls')
+        # min(1, nan) is 1 in analyse(), so missing ATR maps to the cap as well
+        return 1 + ratio.where(ratio < 1, 1)
+    
+    def score_series(self) -> pd.Series:
+        """Technical score (0-100) for every bar without look-ahead, in one pass"""
+        signals = self.signal_frame()
+        weights = pd.Series({
+            signal: self.signal_weights.get(signal, 0) for signal in signals.columns
+        }, dtype=float)
+        raw_score = signals.astype(float) @ weights
+        return (50 + raw_score * self.volatility_series()).clip(0, 100)
+
+    @timed('technical_analyse')
     def analyse(self) -> float:
         """Convert technical signals to normalized score (0-100)"""
+        import talib
+        if len(self.data) < self.MIN_BARS:
+            bars = f"{self.timeframe} bars" if self.timeframe else "bars"
+            logging.warning(f"Only {len(self.data)} {bars}; the indicators need "
+                            f"{self.MIN_BARS}, so some signals cannot fire")
         try:
             signals = self.get_signals()
             
@@ -61,6 +146,7 @@ class TechnicalAnalyser:
             
             # Scale by volatility (example: using ATR)
             atr = talib.ATR(self.data['High'], self.data['Low'], self.data['Close']).iloc[-1]
+            increment('talib_calls')
             volatility_factor = min(1, atr / self.data['Close'].iloc[-1])  # Normalize
             
             # Apply non-linear scaling
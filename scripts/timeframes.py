@@ -0,0 +1,152 @@
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from instrumentation import increment, timed   # running script directly
+
+# Resampling rule per timeframe; bins are labelled with their last actual bar
+TIMEFRAMES = {
+    '1h': '1h',
+    '4h': '4h',
+    'daily': 'D',
+    'weekly': 'W-FRI',
+    'monthly': 'ME'
+}
+
+# How each OHLCV column combines within a bar
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Adj Close': 'last',
+    'Volume': 'sum'
+}
+
+# Calendar days spanned by one bar, for sizing the daily history a timeframe needs
+CALENDAR_DAYS_PER_BAR = {
+    'daily': 7 / 5,
+    'weekly': 7,
+    'monthly': 366 / 12
+}
+
+def history_days(timeframe: str, bars: int) -> int:
+    """
+    Calendar days of daily history that give at least `bars` bars of
+    `timeframe`, with a few bars to spare for holidays and partial periods.
+    """
+    if timeframe not in CALENDAR_DAYS_PER_BAR:
+        raise ValueError(f"Cannot derive {timeframe} bars from daily data")
+    return math.ceil((bars + 5) * CALENDAR_DAYS_PER_BAR[timeframe])
+
+def is_intraday(index: pd.DatetimeIndex) -> bool:
+    return len(index) > 0 and bool((index != index.normalize()).any())
+
+@timed('resample_ohlcv')
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    OHLCV bars of a coarser timeframe: first open, highest high, lowest low,
+    last close and total volume of the bars in each period.
+
+    Each bar is labelled with the date of the last bar it contains, so the
+    current, unfinished week or month is dated today rather than in the
+    future. Periods without bars (holidays) are dropped. Asking for the
+    timeframe the data already has returns it unchanged.
+
+    Raises:
+        ValueError: For an unknown timeframe, or intraday bars from daily data
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    intraday = is_intraday(df.index)
+    if timeframe == 'daily' and not intraday:
+        return df
+    if timeframe in ('1h', '4h') and not intraday:
+        raise ValueError(f"Cannot derive {timeframe} bars from daily data")
+
+    aggregation = {name: how for name, how in OHLCV_AGGREGATION.items() if name in df.columns}
+    resampler = df.resample(TIMEFRAMES[timeframe])
+    bars = resampler.agg(aggregation)
+    last = df.index.to_series().resample(TIMEFRAMES[timeframe]).max()
+    keep = (resampler.size() > 0).to_numpy()
+    bars = bars[keep]
+    bars.index = pd.DatetimeIndex(last[keep].to_numpy(), name=df.index.name)
+    return bars
+
+class TimeframeCache:
+    """
+    Memoised resampling of the OHLCV frames in `source`.
+
+    get(symbol, 'weekly') resamples the symbol's cached daily (or intraday)
+    frame once and serves the result until the source frame changes, which
+    is detected from its length, last timestamp and last close. No data is
+    fetched; symbols missing from `source` are None.
+
+    Args:
+        source: OHLCV frames per symbol, e.g. Strategy.stock_data
+        maxsize: Resampled frames kept, least recently used dropped first
+    """
+    def __init__(self, source: Mapping, maxsize: int = 2048):
+        self.source = source
+        self.maxsize = maxsize
+        self._cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> tuple:
+        if df.empty:
+            return (0,)
+        return len(df), df.index[-1], float(df['Close'].iloc[-1])
+
+    def get(self, symbol: str, timeframe: str = 'daily') -> Optional[pd.DataFrame]:
+        df = self.source.get(symbol)
+        if df is None:
+            return None
+        if timeframe == 'daily' and not is_intraday(df.index):
+            return df
+        key = (symbol, timeframe)
+        fingerprint = self._fingerprint(df)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._cache.move_to_end(key)
+                increment('cache_hits', cache='timeframes')
+                return cached[1]
+        bars = resample_ohlcv(df, timeframe)
+        with self._lock:
+            self._cache[key] = (fingerprint, bars)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return bars
+
+    def view(self, timeframe: str) -> 'TimeframeView':
+        """Read-only symbol -> frame mapping in one timeframe"""
+        return TimeframeView(self, timeframe)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+class TimeframeView(Mapping):
+    """The frames of a TimeframeCache's source, resampled to one timeframe"""
+    def __init__(self, cache: TimeframeCache, timeframe: str):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Invalid timeframe: {timeframe}")
+        self.cache = cache
+        self.timeframe = timeframe
+
+    def __getitem__(self, symbol: str) -> Optional[pd.DataFrame]:
+        if symbol not in self.cache.source:
+            raise KeyError(symbol)
+        return self.cache.get(symbol, self.timeframe)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.cache.source)
+
+    def __len__(self) -> int:
+        return len(self.cache.source)
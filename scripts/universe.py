@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from utils import FALLBACK_TICKERS, fetch_data, get_sp500_tickers   # running script directly
+from instrumentation import increment                              # running script directly
+
+# Constituent sources by universe name; each takes a timeout and raises on failure
+UNIVERSE_SOURCES: Dict[str, Callable[[float], List[str]]] = {
+    'sp500': lambda timeout: get_sp500_tickers(timeout=timeout, fallback=False)
+}
+
+class UniverseDiff(NamedTuple):
+    name: str
+    previous: Optional[str]     # date of the snapshot compared against
+    current: str
+    added: List[str]
+    removed: List[str]
+
+class UniverseRegistry:
+    """
+    Dated constituent snapshots per universe, stored as JSON under `root`.
+
+    get() answers from the latest local snapshot. A stale snapshot is still
+    served at once while a background refresh fetches the new list; only a
+    universe never fetched before waits for the network. A refresh that
+    changes the list is recorded as a UniverseDiff and passed to `on_change`,
+    e.g. to prefetch data for the added names.
+
+    Args:
+        root: Directory of <universe>/<YYYY-MM-DD>.json snapshots
+        sources: Constituent fetchers by universe name
+        max_age: Age after which a snapshot is refreshed
+        timeout: Seconds allowed for a fetch
+        on_change: Called with the UniverseDiff of each refresh that changed a list
+    """
+    def __init__(self, root='data/universes', sources: Optional[Dict[str, Callable[[float], List[str]]]] = None,
+                 max_age: timedelta = timedelta(days=1), timeout: float = 10,
+                 on_change: Optional[Callable[[UniverseDiff], None]] = None):
+        self.root = Path(root)
+        self.sources = dict(sources or UNIVERSE_SOURCES)
+        self.max_age = max_age
+        self.timeout = timeout
+        self.on_change = on_change
+        self.last_diff: Dict[str, UniverseDiff] = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def _path(self, name: str, date: str) -> Path:
+        return self.root / name / f'{date}.json'
+
+    def snapshots(self, name: str) -> List[str]:
+        """Dates of the stored snapshots, oldest first"""
+        return sorted(p.stem for p in (self.root / name).glob('*.json'))
+
+    def _load(self, name: str, date: str) -> dict:
+        with open(self._path(name, date)) as f:
+            return json.load(f)
+
+    def snapshot(self, name: str, date: Optional[str] = None) -> List[str]:
+        """Constituents on `date` (latest snapshot on or before it; default latest)"""
+        dates = [d for d in self.snapshots(name) if date is None or d <= date]
+        if not dates:
+            raise KeyError(f"No {name} snapshot" + (f" on or before {date}" if date else ""))
+        return self._load(name, dates[-1])['symbols']
+
+    def diff(self, name: str, old: str, new: str) -> UniverseDiff:
+        before, after = self.snapshot(name, old), self.snapshot(name, new)
+        return UniverseDiff(name, old, new,
+                            sorted(set(after) - set(before)), sorted(set(before) - set(after)))
+
+    def refresh(self, name: str = 'sp500') -> UniverseDiff:
+        """Fetch the list now and store it as today's snapshot"""
+        symbols = list(dict.fromkeys(self.sources[name](self.timeout)))
+        if not symbols:
+            raise ValueError(f"Empty {name} constituent list")
+        dates = self.snapshots(name)
+        today = datetime.now().strftime('%Y-%m-%d')
+        previous = self._load(name, dates[-1]) if dates else None
+
+        path = self._path(name, today)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f'.{os.getpid()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'fetched': time.time(), 'symbols': symbols}, f)
+        os.replace(tmp, path)
+
+        before = set(previous['symbols']) if previous else set(symbols)
+        diff = UniverseDiff(name, dates[-1] if dates else None, today,
+                            sorted(set(symbols) - before), sorted(before - set(symbols)))
+        if diff.added or diff.removed:
+            logging.info(f"{name} changed: added {', '.join(diff.added) or '-'}; "
+                         f"removed {', '.join(diff.removed) or '-'}")
+            self.last_diff[name] = diff
+            if self.on_change is not None:
+                self.on_change(diff)
+        increment('universe_refreshes', universe=name)
+        return diff
+
+    def _refresh_in_background(self, name: str):
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self.refresh(name)
+            except Exception as e:
+                logging.error(f"Error refreshing {name} constituents: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+        threading.Thread(target=run, daemon=True).start()
+
+    def age(self, name: str) -> Optional[timedelta]:
+        dates = self.snapshots(name)
+        if not dates:
+            return None
+        return timedelta(seconds=time.time() - self._load(name, dates[-1])['fetched'])
+
+    def get(self, name: str = 'sp500') -> List[str]:
+        """
+        Current constituents from the local snapshot, refreshing a stale one
+        in the background. Without any snapshot the list is fetched now, and
+        if that fails FALLBACK_TICKERS is returned.
+        """
+        age = self.age(name)
+        if age is None:
+            try:
+                self.refresh(name)
+            except Exception as e:
+                logging.error(f"Error fetching {name} constituents: {e}")
+                return list(FALLBACK_TICKERS)
+        elif age > self.max_age:
+            self._refresh_in_background(name)
+        increment('cache_hits', cache='universe')
+        return self.snapshot(name)
+
+class UniversePrefetcher:
+    """
+    Background thread that warms the caches for newly added symbols.
+
+    Prices go into `data_store`, technical and fundamental scores into
+    `result_store`, and headlines to `sentiment_worker`. With
+    UniverseRegistry(on_change=lambda diff: prefetcher.submit(diff.added)),
+    the first screen after a rebalance finds the new names already scored.
+
+    Args:
+        result_store: ResultStore for technical and fundamental scores
+        data_store: Mapping that receives price history, e.g. a SymbolDataStore
+        sentiment_worker: SentimentWorker to score the names' headlines
+    """
+    def __init__(self, result_store=None, data_store=None, sentiment_worker=None):
+        self.result_store = result_store
+        self.data_store = data_store
+        self.sentiment_worker = sentiment_worker
+        self._queue: 'queue.Queue[str]' = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, symbols: Iterable[str]) -> int:
+        """Queue symbols for prefetch; returns how many were added"""
+        symbols = list(symbols)
+        added = 0
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self._pending:
+                    self._pending.add(symbol)
+                    self._queue.put(symbol)
+                    added += 1
+        if self.sentiment_worker is not None and symbols:
+            self.sentiment_worker.submit(symbols)
+        return added
+
+    def prefetch(self, symbol: str):
+        """Fetch and score one symbol (runs in the caller's thread)"""
+        from strategy import Strategy
+        data = fetch_data(symbol)
+        if self.data_store is not None:
+            self.data_store[symbol] = data
+        if self.result_store is not None:
+            result = Strategy([symbol]).analyse_symbol(symbol, data, ['technical', 'fundamental'])
+            self.result_store.publish_analysis(result)
+            self.result_store.flush()
+        increment('universe_prefetched')
+
+    def _run(self):
+        while True:
+            symbol = self._queue.get()
+            try:
+                self.prefetch(symbol)
+            except Exception as e:
+                logging.error(f"Error prefetching {symbol}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(symbol)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until nothing is pending; False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
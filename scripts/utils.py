@@ -1,34 +1,166 @@
+import atexit
+import contextvars
 import logging
+import logging.handlers
+import queue
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional, List
 import time
 from functools import wraps
-import requests
-import bs4 as bs
+# yfinance, requests and bs4 are imported where they are used, so importing
+# this module (and everything that depends on it) stays fast
 
-def setup_logging():
-    """Configure logging settings"""
+from instrumentation import increment, timed
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s%(context)s'
+
+# Fields such as symbol attached to every record logged within log_context()
+_log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+_log_handlers: List[logging.Handler] = []
+_log_listeners: List[logging.handlers.QueueListener] = []
+
+@contextmanager
+def log_context(**fields):
+    """Add fields (e.g. symbol='AAPL') to records logged by this thread inside the block"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+class ContextFilter(logging.Filter):
+    """
+    Copy the current log_context() into the record as attributes, plus a
+    rendered `context` suffix such as ' [symbol=AAPL]' for the log format.
+    Runs in the logging thread, before the record is queued.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'context'):
+            fields = _log_context.get()
+            for name, value in fields.items():
+                setattr(record, name, value)
+            record.context = (' [' + ' '.join(f'{k}={v}' for k, v in fields.items()) + ']') if fields else ''
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most `burst` copies of the same warning or error per `window`
+    seconds through from each logging call site; the rest are dropped and
+    counted. The next copy let through reports how many were suppressed.
+    Distinct messages from one site, e.g. failures of different symbols,
+    are limited separately. Lower levels always pass.
+    """
+    # Keys kept before expired, fully reported ones are pruned
+    MAX_KEYS = 4096
+
+    def __init__(self, burst: int = 10, window: float = 60.0, level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        self._sites = {}   # (pathname, lineno, message) -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        for key in [k for k, (start, _, suppressed) in self._sites.items()
+                    if now - start >= self.window and not suppressed]:
+            del self._sites[key]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno, record.getMessage())
+        with self._lock:
+            if key not in self._sites and len(self._sites) >= self.MAX_KEYS:
+                self._prune(now)
+            site = self._sites.setdefault(key, [now, 0, 0])
+            if now - site[0] >= self.window:
+                site[0], site[1] = now, 0
+            if site[1] >= self.burst:
+                site[2] += 1
+                increment('log_records_suppressed')
+                return False
+            site[1] += 1
+            suppressed, site[2] = site[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} identical messages suppressed)"
+            record.args = None
+        return True
+
+def _queue_handler(log_queue) -> logging.Handler:
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(RateLimitFilter())
+    return handler
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Configure logging settings
+    
+    Records are put on an in-memory queue by the logging thread and written
+    to the daily log file by a background listener, so no caller ever waits
+    on file I/O. Repeated warnings and errors are rate limited per call site
+    and message, and fields from log_context() are appended to each line.
+    Calling it again is a no-op; the queue is drained at exit.
+    """
+    if _log_listeners:
+        return
     log_dir = Path('logs')
     log_dir.mkdir(exist_ok=True)
     
-    logging.basicConfig(
-        filename=log_dir / f'trading_{datetime.now().strftime("%Y%m%d")}.log',
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    file_handler = logging.FileHandler(log_dir / f'trading_{datetime.now().strftime("%Y%m%d")}.log')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _log_handlers.append(file_handler)
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    _log_listeners.append(listener)
+    atexit.register(stop_logging)
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler(log_queue))
+
+def stop_logging():
+    """Flush queued records to the log file and stop the listeners"""
+    while _log_listeners:
+        _log_listeners.pop().stop()
+
+def listen_for_workers(log_queue):
+    """
+    Write records that worker processes put on `log_queue` (e.g. a Manager
+    queue) with this process's handlers; see setup_worker_logging. The
+    caller stops the returned listener once the workers are done.
+    """
+    listener = logging.handlers.QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+def setup_worker_logging(log_queue, level: int = logging.INFO):
+    """In a worker process: only enqueue records for the parent's listen_for_workers()"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(_queue_handler(log_queue))
 
 def retry(func, retries=3, delay=2):
     """Retry decorator with exponential backoff"""
     @wraps(func)
     def wrapper(*args, **kwargs):
+        import yfinance as yf
         for attempt in range(retries):
             try:
                 return func(*args, **kwargs)
             except yf.YFRateLimitError as e:
                 logging.error(f"Attempt {attempt + 1} failed: {e}")
+                increment('rate_limit_retries', function=func.__name__)
                 if attempt == retries - 1:
                     raise  # Re-raise exception on last attempt
                 time.sleep(delay * (attempt + 1))  # Exponential backoff
@@ -37,6 +169,7 @@ def retry(func, retries=3, delay=2):
                 raise # Re-raise immediately for non-rate-limit errors
     return wrapper
 
+@timed('fetch_data')
 @retry
 def fetch_data(
     symbol: str, 
@@ -56,7 +189,9 @@ def fetch_data(
     Returns:
         DataFrame with OHLCV data
     """
+    import yfinance as yf
     try:
+        increment('network_calls', client='yfinance.download')
         if start_date and end_date:
             df = yf.download(symbol, start=start_date, end=end_date, progress=False)
         else:
@@ -78,6 +213,7 @@ def fetch_data(
 
 def validate_ticker(symbol: str) -> bool:
     """Validate if ticker symbol exists"""
+    import yfinance as yf
     try:
         ticker = yf.Ticker(symbol)
         if ticker.info:
@@ -90,16 +226,31 @@ def calculate_returns(prices: pd.Series) -> pd.Series:
     """Calculate percentage returns from price series"""
     return prices.pct_change()
 
-def get_sp500_tickers() -> List[str]:
+# Served when the S&P 500 list cannot be fetched and nothing is cached
+FALLBACK_TICKERS = ["AAPL", "MSFT", "AMZN", "NVDA", "GOOGL", "META", "GOOG", "TSLA", 
+                    "BRK-B", "UNH", "JPM", "XOM", "LLY", "AVGO", "V", "PG", "MA", "HD", "COST", "MRK"]
+
+@timed('fetch_sp500')
+def get_sp500_tickers(timeout: float = 10, fallback: bool = True) -> List[str]:
     """
     Scrape Wikipedia to get the current list of S&P 500 companies.
     
+    Use universe.UniverseRegistry to serve the list from local snapshots.
+    
+    Args:
+        timeout: Seconds to wait for Wikipedia
+        fallback: Return FALLBACK_TICKERS on failure instead of raising
+    
     Returns:
         List of S&P 500 ticker symbols
     """
+    import requests
+    import bs4 as bs
     try:
         logging.info("Fetching S&P 500 tickers from Wikipedia")
-        resp = requests.get('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')
+        increment('network_calls', client='wikipedia')
+        resp = requests.get('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', timeout=timeout)
+        resp.raise_for_status()
         soup = bs.BeautifulSoup(resp.text, 'html.parser')
         table = soup.find('table', {'class': 'wikitable sortable'})
         
@@ -113,11 +264,11 @@ def get_sp500_tickers() -> List[str]:
         return tickers
     except Exception as e:
         logging.error(f"Error fetching S&P 500 tickers: {e}")
+        if not fallback:
+            raise
         # Return a list of major tickers as a fallback
-        fallback_tickers = ["AAPL", "MSFT", "AMZN", "NVDA", "GOOGL", "META", "GOOG", "TSLA", 
-                           "BRK-B", "UNH", "JPM", "XOM", "LLY", "AVGO", "V", "PG", "MA", "HD", "COST", "MRK"]
-        logging.info(f"Using fallback list of {len(fallback_tickers)} major tickers")
-        return fallback_tickers
+        logging.info(f"Using fallback list of {len(FALLBACK_TICKERS)} major tickers")
+        return list(FALLBACK_TICKERS)
 
 if __name__ == '__main__':
     # Test utilities
@@ -0,0 +1,164 @@
+import logging
+import time
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester  # run script directly
+from scoring import ScorePanel   # run script directly
+from sweep import ParameterGrid, RandomSearch, backtester_kwargs, config_id  # run script directly
+
+class WalkForwardResult:
+    """Stitched out-of-sample equity curve plus one row of results per fold"""
+    def __init__(self, equity: pd.Series, folds: pd.DataFrame, initial_capital: float):
+        self.equity = equity
+        self.folds = folds
+        self.initial_capital = initial_capital
+
+    def metrics(self) -> dict:
+        """Summary metrics of the stitched out-of-sample curve"""
+        if self.equity.empty:
+            return {}
+        returns = self.equity.pct_change()
+        drawdown = self.equity / self.equity.cummax() - 1
+        return {
+            'total_return': (self.equity.iloc[-1] / self.initial_capital - 1) * 100,
+            'sharpe_ratio': returns.mean() / returns.std() * np.sqrt(252),
+            'max_drawdown': -drawdown.min() * 100,
+            'folds': len(self.folds)
+        }
+
+class WalkForward:
+    """
+    Rolling train/test evaluation of Backtester parameters.
+
+    Each fold optimises `objective` over the search space on its train window
+    and runs the winner on the following test window. The ScorePanel is built
+    once and sliced with views, and each configuration's composite score matrix
+    is computed once and reused by every fold it is evaluated in.
+
+    Args:
+        panel: ScorePanel over the full history (including indicator warm-up)
+        space: ParameterGrid or RandomSearch of sweep parameters
+        train_bars: Bars in each train window
+        test_bars: Bars in each test window
+        step: Bars between fold starts, at least test_bars (the default, so test
+            windows tile)
+        start_date: First date a train window may start on
+        objective: Backtester metric to maximise on the train window
+    """
+    def __init__(self, panel: ScorePanel, space: Union[ParameterGrid, RandomSearch],
+                 train_bars: int = 504, test_bars: int = 126,
+                 step: Optional[int] = None, start_date: Optional[str] = None,
+                 objective: str = 'sharpe_ratio', initial_capital: float = 100000,
+                 base_params: Optional[dict] = None):
+        self.panel = panel
+        self.space = space
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step = step or test_bars
+        if self.step < test_bars:
+            # Overlapping test windows would count the shared bars twice in the stitched curve
+            raise ValueError(f"step ({self.step}) must be at least test_bars ({test_bars})")
+        self.start_date = start_date
+        self.objective = objective
+        self.initial_capital = initial_capital
+        self.base_params = base_params or {
+            'weights': {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+        }
+        self._scores: Dict[str, np.ndarray] = {}
+
+    def folds(self) -> List[tuple]:
+        """(train_start, train_stop, test_stop) bar indices of each fold"""
+        first = 0
+        if self.start_date:
+            first = self.panel.dates.searchsorted(pd.Timestamp(self.start_date))
+        folds = []
+        train_start = first
+        while train_start + self.train_bars < len(self.panel.dates):
+            train_stop = train_start + self.train_bars
+            test_stop = min(train_stop + self.test_bars, len(self.panel.dates))
+            folds.append((train_start, train_stop, test_stop))
+            train_start += self.step
+        return folds
+
+    def _scores_for(self, cid: str, kwargs: dict) -> np.ndarray:
+        if cid not in self._scores:
+            self._scores[cid] = self.panel.composite(kwargs['weights'], kwargs.get('signal_weights'))
+        return self._scores[cid]
+
+    def _backtest(self, params: dict, start: int, stop: int, capital: float):
+        cid = config_id(params)
+        kwargs = backtester_kwargs(params, self.base_params)
+        scores = self._scores_for(cid, kwargs)
+
+        backtester = Backtester(None, self.panel.symbols, str(self.panel.dates[start].date()),
+                                initial_capital=capital, **kwargs)
+        backtester.panel = self.panel.slice(start, stop)
+        backtester.scores = scores[start:stop]
+        return backtester, backtester.run()
+
+    def run(self) -> WalkForwardResult:
+        capital = self.initial_capital
+        equity = []
+        rows = []
+
+        for fold, (train_start, train_stop, test_stop) in enumerate(self.folds()):
+            started = time.perf_counter()
+            best_params, best_value = None, -np.inf
+            for params in self.space:
+                try:
+                    _, metrics = self._backtest(params, train_start, train_stop, self.initial_capital)
+                except Exception as e:
+                    logging.error(f"Walk-forward fold {fold} failed for {params}: {e}")
+                    continue
+                value = metrics.get(self.objective, np.nan)
+                value = -np.inf if np.isnan(value) else value
+                if best_params is None or value > best_value:
+                    best_params, best_value = params, value
+            optimise_seconds = time.perf_counter() - started
+
+            if best_params is None:
+                logging.error(f"Walk-forward fold {fold} has no valid configuration")
+                continue
+
+            # Each test window starts flat with the capital the previous one ended with
+            started = time.perf_counter()
+            test, test_metrics = self._backtest(best_params, train_stop, test_stop, capital)
+            test_seconds = time.perf_counter() - started
+
+            curve = test.portfolio_values.to_series()
+            equity.append(curve)
+            capital = curve.iloc[-1]
+
+            rows.append({
+                'fold': fold,
+                'train_start': self.panel.dates[train_start],
+                'train_end': self.panel.dates[train_stop - 1],
+                'test_start': self.panel.dates[train_stop],
+                'test_end': self.panel.dates[test_stop - 1],
+                'params': best_params,
+                f'train_{self.objective}': best_value,
+                **{f'test_{k}': v for k, v in test_metrics.items()},
+                'optimise_seconds': optimise_seconds,
+                'test_seconds': test_seconds
+            })
+
+        stitched = pd.concat(equity) if equity else pd.Series(dtype=float)
+        return WalkForwardResult(stitched, pd.DataFrame(rows), self.initial_capital)
+
+if __name__ == '__main__':
+    from utils import setup_logging  # run script directly
+    setup_logging()
+
+    # Example: two-year train, six-month test folds over the thresholds
+    symbols = ['AAPL', 'MSFT', 'GOOGL']
+    backtester = Backtester(None, symbols, '2015-01-01',
+                            weights={'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2})
+    panel = backtester.build_panel()
+
+    grid = ParameterGrid({'buy_threshold': [60, 65, 70], 'sell_threshold': [30, 40]})
+    result = WalkForward(panel, grid, start_date='2015-01-01').run()
+    print(result.folds[['fold', 'test_start', 'test_end', 'params', 'test_total_return',
+                        'optimise_seconds', 'test_seconds']])
+    print(f"\nOut-of-sample metrics:\n{result.metrics()}")
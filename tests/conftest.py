@@ -0,0 +1,12 @@
+import pandas as pd
+import pytest
+
+from scripts.scoring import ScorePanel
+from tests.test_backtest import make_ohlcv
+
+@pytest.fixture
+def panel():
+    """Two-symbol ScorePanel with a fundamentals history, shared by the sweep and walk-forward tests"""
+    frames = {'AAA': make_ohlcv(seed=4), 'BBB': make_ohlcv(seed=5)}
+    fundamentals = {s: pd.Series([100.0], index=[df.index[0]]) for s, df in frames.items()}
+    return ScorePanel.from_price_data(frames, fundamental_history=fundamentals)
@@ -0,0 +1,96 @@
+import json
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scripts.api import ScoringService, serve
+from scripts.result_store import ResultStore
+
+@pytest.fixture
+def service(tmp_path):
+    store = ResultStore(tmp_path / 'scores.json')
+    store.publish('AAPL', 'technical', 80)
+    store.publish('AAPL', 'fundamental', 60)
+    store.publish('AAPL', 'sentiment', 70)
+    store.publish('MSFT', 'technical', 50)
+    store.publish('MSFT', 'fundamental', 90)
+    store.flush()
+    return ScoringService(ResultStore(tmp_path / 'scores.json'), reload_interval=0)
+
+def test_service_routes(service):
+    status, _, body = service.handle('/analysis/aapl')
+    assert status == 200
+    assert json.loads(body)['score'] == pytest.approx(70)
+
+    status, _, body = service.handle('/top?score_type=fundamental&n=1')
+    assert [r['symbol'] for r in json.loads(body)] == ['MSFT']
+    # Symbols without the component are left out
+    status, _, body = service.handle('/top?score_type=sentiment')
+    assert [r['symbol'] for r in json.loads(body)] == ['AAPL']
+
+    status, _, body = service.handle('/scores/technical?symbols=MSFT')
+    assert json.loads(body)['MSFT']['score'] == 50
+
+    assert service.handle('/top?score_type=invalid')[0] == 400
+    assert service.handle('/analysis/NONE')[0] == 404
+    assert service.handle('/nothing')[0] == 404
+
+def test_etag_and_cache_invalidation(service):
+    status, headers, body = service.handle('/top')
+    etag = headers['ETag']
+    assert service.handle('/top', if_none_match=etag)[0] == 304
+
+    # Cached responses are reused until the store gets a new revision
+    service.store.symbols.clear()
+    assert service.handle('/top')[2] == body
+
+    writer = ResultStore(service.store.path)
+    writer.publish('NVDA', 'technical', 99)
+    writer.flush()
+    status, headers, _ = service.handle('/top', if_none_match=etag)
+    assert status == 200 and headers['ETag'] != etag
+
+def test_reload_during_routing_is_not_cached(service):
+    """A payload built while the store reloads is served but not cached under the old revision"""
+    route = service._route
+
+    def reloading_route(path, query):
+        payload = route(path, query)
+        writer = ResultStore(service.store.path)
+        writer.publish('NVDA', 'technical', 99)
+        writer.flush()
+        service._checked = 0.0
+        service._refresh_store()
+        return payload
+
+    service._route = reloading_route
+    revision = service._revision
+    status, headers, _ = service.handle('/top')
+    assert status == 200
+    assert headers['ETag'].startswith(f'"{revision}-')
+    assert service._revision > revision
+    assert not service._cache
+
+def test_http_server_concurrent_clients(service):
+    server = serve(service, port=0)
+    base = f'http://127.0.0.1:{server.server_port}'
+    try:
+        def get(path):
+            with urllib.request.urlopen(base + path, timeout=10) as response:
+                return response.status, response.headers['ETag'], json.loads(response.read())
+
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            responses = list(pool.map(get, ['/analysis/AAPL'] * 200))
+        assert {status for status, _, _ in responses} == {200}
+        assert len({etag for _, etag, _ in responses}) == 1
+
+        request = urllib.request.Request(base + '/analysis/AAPL',
+                                         headers={'If-None-Match': responses[0][1]})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=10)
+        assert error.value.code == 304
+    finally:
+        server.shutdown()
+        server.server_close()
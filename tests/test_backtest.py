@@ -0,0 +1,184 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch, MagicMock
+
+from scripts.backtest import Backtester
+from scripts.scoring import ScorePanel
+from scripts.technical import TechnicalAnalyser
+
+def make_ohlcv(n=300, seed=0, start='2021-01-01'):
+    """Deterministic random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n)),
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 5_000_000, n).astype(float)
+    }, index=pd.bdate_range(start, periods=n))
+
+@pytest.fixture
+def mock_strategy():
+    strategy = MagicMock()
+    strategy.weights = {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+    return strategy
+
+def test_score_series_matches_analyse_on_truncated_data():
+    """Each bar's score equals analyse() run on data ending at that bar"""
+    data = make_ohlcv(n=150, seed=1)
+    series = TechnicalAnalyser(data.copy()).score_series()
+    for end in [10, 40, 80, 149]:
+        expected = TechnicalAnalyser(data.iloc[:end + 1].copy()).analyse()
+        assert series.iloc[end] == pytest.approx(expected)
+
+def test_panel_scores_ignore_future_data():
+    """Changing later bars must not change earlier point-in-time scores"""
+    data = make_ohlcv(n=200, seed=2)
+    altered = data.copy()
+    altered.iloc[150:, :4] *= 3
+
+    weights = {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+    original = ScorePanel.from_price_data({'TEST': data}).composite(weights)
+    changed = ScorePanel.from_price_data({'TEST': altered}).composite(weights)
+
+    np.testing.assert_allclose(original[:150], changed[:150])
+
+def test_history_is_used_as_of_each_date():
+    """Dated scores only become visible from their own date onwards"""
+    data = make_ohlcv(n=20, seed=3)
+    history = {'TEST': pd.Series([80.0, 20.0], index=[data.index[5], data.index[10]])}
+    panel = ScorePanel.from_price_data({'TEST': data}, fundamental_history=history)
+
+    assert panel.fundamental[4, 0] == 50
+    assert panel.fundamental[5, 0] == 80
+    assert panel.fundamental[9, 0] == 80
+    assert panel.fundamental[10, 0] == 20
+
+def test_composite_reweights_over_components_with_history():
+    """Components without history are left out instead of capping the score at 70"""
+    data = make_ohlcv(n=200, seed=2)
+    weights = {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+    panel = ScorePanel.from_price_data({'TEST': data})
+    assert panel.components == ('technical',)
+    np.testing.assert_allclose(panel.composite(weights), panel.technical())
+
+    history = {'TEST': pd.Series([90.0], index=[data.index[0]])}
+    panel = ScorePanel.from_price_data({'TEST': data}, fundamental_history=history)
+    sliced = panel.slice(10, 20)
+    assert sliced.components == ('technical', 'fundamental')
+    np.testing.assert_allclose(sliced.composite(weights), (sliced.technical() + 90) / 2)
+
+@patch('scripts.backtest.fetch_data')
+def test_run_point_in_time(mock_fetch, mock_strategy):
+    """Run fetches history once per symbol and simulates from start_date"""
+    frames = {'AAA': make_ohlcv(seed=4), 'BBB': make_ohlcv(seed=5)}
+    mock_fetch.side_effect = lambda symbol, **kwargs: frames[symbol]
+
+    backtester = Backtester(mock_strategy, ['AAA', 'BBB'], '2021-06-01')
+    results = backtester.run()
+
+    assert mock_fetch.call_count == 2
+    mock_strategy.get_analysis.assert_not_called()
+    assert backtester.portfolio_values.to_series().index[0] >= pd.Timestamp('2021-06-01')
+    assert results['trades'] == len(backtester.trades) > 0
+    trades = backtester.trades.to_frame()
+    assert (trades['date'] >= pd.Timestamp('2021-06-01')).all()
+    assert set(trades['action']) <= {'BUY', 'SELL'}
+    assert set(trades['symbol']) <= {'AAA', 'BBB'}
+
+def test_ledger_grows_and_exports_without_copying():
+    from scripts.ledger import EquityCurve, PositionBook, TradeLog
+
+    trades = TradeLog(['AAA', 'BBB'], capacity=2)
+    for k in range(5):
+        trades.record(pd.Timestamp('2024-01-01') + pd.Timedelta(days=k), k % 2, TradeLog.BUY, 10.0 + k, 1)
+    assert len(trades) == 5
+    assert trades.capacity == 8
+    assert list(trades.to_frame()['symbol']) == ['AAA', 'BBB', 'AAA', 'BBB', 'AAA']
+
+    curve = EquityCurve(capacity=3)
+    for k in range(3):
+        curve.record(pd.Timestamp('2024-01-01') + pd.Timedelta(days=k), 100.0 + k)
+    assert np.shares_memory(curve.to_series().to_numpy(), curve.columns['value'])
+
+    book = PositionBook(['AAA', 'BBB'])
+    book.open(1, 10, 100.0)
+    assert 1 in book and 0 not in book
+    assert book.market_value(np.array([5.0, 12.0])) == 120.0
+    assert book.close(1) == 10 and len(book) == 0
+
+def test_streaming_metrics_match_batch_computation():
+    from scripts.metrics import StreamingMetrics
+
+    rng = np.random.default_rng(6)
+    values = 100000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+    metrics = StreamingMetrics(100000)
+    for value in values:
+        metrics.update(value)
+    summary = metrics.summary()
+
+    returns = pd.Series(values).pct_change()
+    drawdown = 1 - values / np.maximum.accumulate(np.maximum(values, 100000))
+    assert summary['total_return'] == pytest.approx((values[-1] / 100000 - 1) * 100)
+    assert summary['sharpe_ratio'] == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+    assert summary['skewness'] == pytest.approx(returns.skew(), rel=0.05)
+    assert summary['kurtosis'] == pytest.approx(returns.kurt(), rel=0.1)
+    assert summary['max_drawdown'] == pytest.approx(drawdown.max() * 100)
+
+def test_max_drawdown_is_peak_to_trough():
+    from scripts.metrics import StreamingMetrics
+
+    # Falls 100 -> 50, then recovers to a new high: drawdown is 50%, not (max - min) / max
+    metrics = StreamingMetrics(100)
+    for value in [100, 50, 120, 110]:
+        metrics.update(value)
+    summary = metrics.summary()
+    assert summary['max_drawdown'] == pytest.approx(50)
+    assert summary['current_drawdown'] == pytest.approx(100 * (1 - 110 / 120))
+
+@patch('scripts.backtest.fetch_data')
+def test_run_stops_early(mock_fetch, mock_strategy):
+    """A stop condition ends the run without simulating the remaining bars"""
+    mock_fetch.return_value = make_ohlcv(seed=4)
+    backtester = Backtester(mock_strategy, ['AAA'], '2021-06-01')
+    results = backtester.run(stop_when=lambda m: m.bars >= 10)
+
+    assert results['stopped_early']
+    assert results['bars'] == 10
+    assert len(backtester.portfolio_values) == 10
+
+def test_block_bootstrap_and_confidence_intervals():
+    from scripts.robustness import block_bootstrap, path_metrics, confidence_intervals
+
+    returns = np.random.default_rng(7).normal(0.0005, 0.01, 756)
+    paths = block_bootstrap(returns, n_paths=2000, block_size=20, seed=1)
+    assert paths.shape == (2000, 756)
+    assert np.isin(paths, returns).all()
+    # Blocks keep consecutive returns together
+    start = np.flatnonzero(returns == paths[0, 0])[0]
+    np.testing.assert_array_equal(paths[0, :20], returns[np.arange(start, start + 20) % 756])
+
+    table = confidence_intervals(path_metrics(paths))
+    assert list(table.index) == ['total_return', 'sharpe_ratio', 'max_drawdown']
+    assert (table['p5'] <= table['p50']).all() and (table['p50'] <= table['p95']).all()
+
+def test_trade_shuffle_preserves_total_return():
+    from scripts.robustness import RobustnessAnalysis
+
+    dates = pd.bdate_range('2024-01-01', periods=6)
+    equity = pd.Series([1000, 1000, 1100, 1100, 1045, 1045.0], index=dates)
+    trades = pd.DataFrame({
+        'date': dates[[0, 2, 3, 4]],
+        'symbol': ['AAA', 'AAA', 'BBB', 'BBB'],
+        'action': ['BUY', 'SELL', 'BUY', 'SELL'],
+        'price': [10.0, 20.0, 10.0, 5.5],
+        'shares': [10.0, 10.0, 10.0, 10.0]
+    })
+    table = RobustnessAnalysis(equity, trades).trade_shuffle(n_paths=100)
+    # Reordering trades never changes the compounded result
+    assert table.loc['total_return', 'p5'] == pytest.approx(table.loc['total_return', 'p95'])
+    assert table.loc['total_return', 'mean'] == pytest.approx((1.1 * (1 - 45 / 1100) - 1) * 100)
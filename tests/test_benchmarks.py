@@ -0,0 +1,22 @@
+import pandas as pd
+
+from benchmarks import synthetic
+from benchmarks.harness import compare, measure
+
+def test_synthetic_data_is_deterministic():
+    pd.testing.assert_frame_equal(synthetic.make_ohlcv('S0001', 2), synthetic.make_ohlcv('S0001', 2))
+    assert not synthetic.make_ohlcv('S0001').equals(synthetic.make_ohlcv('S0002'))
+    assert synthetic.make_info('S0001') == synthetic.make_info('S0001')
+    assert len(synthetic.make_universe(10, 1)) == 10
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {'case': {'p50_ms': 100.0, 'peak_mb': 10.0}}
+    assert compare({'case': {'p50_ms': 115.0, 'peak_mb': 10.0}}, baseline, 0.2) == []
+
+    regressions = compare({'case': {'p50_ms': 130.0, 'peak_mb': 10.0}}, baseline, 0.2)
+    assert [(r['case'], r['field']) for r in regressions] == [('case', 'p50_ms')]
+
+def test_measure_reports_latency_and_memory():
+    result = measure(lambda: [0] * 100000, items=10, repeat=3)
+    assert result['p50_ms'] <= result['p99_ms']
+    assert result['peak_mb'] > 0
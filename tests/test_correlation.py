@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.correlation import CorrelationClusters, shrunk_correlation
+from scripts.strategy import Strategy
+
+def factor_universe(groups=3, per_group=4, days=300, seed=0):
+    """Prices driven by one factor per group, so each group is a correlated cluster"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    factors = rng.normal(0, 0.015, (days, groups))
+    frames = {}
+    for g in range(groups):
+        for k in range(per_group):
+            returns = factors[:, g] + rng.normal(0, 0.005, days)
+            frames[f'G{g}S{k}'] = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(returns))}, index=dates)
+    return frames
+
+def test_shrunk_correlation_matches_numpy_and_is_blocked():
+    rng = np.random.default_rng(1)
+    z = rng.normal(size=(120, 37))
+    z = (z - z.mean(axis=0)) / z.std(axis=0, ddof=1)
+    corr, shrinkage = shrunk_correlation(z, block=8)
+    expected = np.corrcoef(z, rowvar=False)
+    np.fill_diagonal(expected, 0)
+    # Independent series: mostly noise, so shrinkage is strong
+    assert 0.5 < shrinkage <= 1
+    off = ~np.eye(37, dtype=bool)
+    np.testing.assert_allclose(corr[off], (1 - shrinkage) * expected[off], atol=1e-12)
+    assert np.allclose(np.diag(corr), 1) and np.allclose(corr, corr.T)
+
+def test_leader_clusters_recover_groups():
+    clusters = CorrelationClusters(factor_universe())
+    assert clusters.shrinkage < 0.2
+    labels = clusters.clusters()
+    assert len(set(labels.values())) == 3
+    assert all(labels[f'G{g}S0'] == labels[f'G{g}S{k}'] for g in range(3) for k in range(4))
+
+    ranked = ['G0S0', 'G0S1', 'G1S0', 'NEW', 'G0S2', 'G1S1', 'G2S0']
+    assert clusters.diversify(ranked, 4) == ['G0S0', 'G1S0', 'NEW', 'G2S0']
+    assert clusters.diversify(ranked, 4, max_per_cluster=2) == ['G0S0', 'G0S1', 'G1S0', 'NEW']
+
+def test_strategy_diversified_selection():
+    frames = factor_universe(groups=2, per_group=3)
+    strategy = Strategy(list(frames), data_store=frames)
+    strategy.analysis_results = {s: {'symbol': s, 'score': score, 'technical': None,
+                                     'fundamental': None, 'sentiment': None}
+                                 for s, score in zip(frames, [90, 80, 70, 60, 50, 40])}
+    strategy.last_update = datetime.now()
+
+    assert [r['symbol'] for r in strategy.select_top_stocks(n=2)] == ['G0S0', 'G0S1']
+    assert [r['symbol'] for r in strategy.select_top_stocks(n=2, diversify=True)] == ['G0S0', 'G1S0']
+    clusters = strategy.correlation_clusters()
+    assert strategy.correlation_clusters() is clusters
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.data_store import SymbolDataStore, compact_ohlcv, frame_bytes
+from scripts.technical import TechnicalAnalyser
+
+def make_ohlcv(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n).astype(float)
+    }, index=pd.bdate_range('2024-01-01', periods=n))
+
+def test_compact_ohlcv_dtypes():
+    df = make_ohlcv()
+    compact = compact_ohlcv(df)
+    assert (compact[['Open', 'High', 'Low', 'Close']].dtypes == np.float32).all()
+    assert compact['Volume'].dtype == np.int32
+    assert frame_bytes(compact) < frame_bytes(df)
+    np.testing.assert_allclose(compact['Close'], df['Close'], rtol=1e-6)
+
+def test_store_evicts_least_recently_used_to_disk(tmp_path):
+    frame_size = frame_bytes(compact_ohlcv(make_ohlcv()))
+    store = SymbolDataStore(budget_mb=2.5 * frame_size / 2**20, cache_dir=tmp_path)
+    for k, symbol in enumerate(['A', 'B', 'C']):
+        store[symbol] = make_ohlcv(seed=k)
+    store['FAILED'] = None
+
+    # A was least recently used, so it went to disk
+    assert store.stats()['on_disk'] == 1 and (tmp_path / 'A.parquet').exists()
+    assert len(store) == 4 and set(store) == {'A', 'B', 'C', 'FAILED'}
+    assert store.get('FAILED') is None and store.get('MISSING') is None
+
+    # Reading it back evicts B, the least recently used frame now
+    np.testing.assert_allclose(store['A']['Close'], make_ohlcv(seed=0)['Close'], rtol=1e-6)
+    assert store.memory_bytes <= store.budget
+    assert (tmp_path / 'B.parquet').exists()
+
+    del store['A']
+    assert 'A' not in store
+    store.clear()
+    assert len(store) == 0 and not list(tmp_path.glob('*.parquet'))
+
+def test_spill_files_removed_on_close(tmp_path):
+    frame_size = frame_bytes(compact_ohlcv(make_ohlcv()))
+    store = SymbolDataStore(budget_mb=1.5 * frame_size / 2**20, cache_dir=tmp_path)
+    store['A'], store['B'] = make_ohlcv(seed=0), make_ohlcv(seed=1)
+    assert (tmp_path / 'A.parquet').exists()
+    store.close()
+    assert tmp_path.exists() and not list(tmp_path.glob('*.parquet'))
+
+    # Without a cache_dir the store spills to a temporary directory of its own
+    store = SymbolDataStore(budget_mb=1.5 * frame_size / 2**20)
+    store['A'], store['B'] = make_ohlcv(seed=0), make_ohlcv(seed=1)
+    cache_dir = store.cache_dir
+    assert (cache_dir / 'A.parquet').exists()
+    del store
+    assert not cache_dir.exists()
+
+def test_technical_analyser_leaves_data_unchanged():
+    df = compact_ohlcv(make_ohlcv())
+    columns = list(df.columns)
+    score = TechnicalAnalyser(df).analyse()
+    assert list(df.columns) == columns
+    assert score == pytest.approx(TechnicalAnalyser(make_ohlcv()).analyse(), abs=1e-4)
@@ -0,0 +1,53 @@
+import json
+import urllib.request
+import pytest
+
+from scripts.instrumentation import Instrumentation
+
+@pytest.fixture
+def registry():
+    return Instrumentation(enabled=True)
+
+def test_disabled_registry_records_nothing():
+    registry = Instrumentation(enabled=False)
+    registry.increment('network_calls')
+    with registry.timer('fetch_data'):
+        pass
+    registry.timed('analyse')(lambda: None)()
+    assert registry.counters == {} and registry.timers == {}
+
+def test_counters_and_timers(registry):
+    registry.increment('network_calls', client='yfinance.info')
+    registry.increment('network_calls', 2, client='yfinance.info')
+    with registry.timer('strategy_stage', stage='technical'):
+        pass
+    registry.timed('sentiment_score')(lambda text: 50)('headline')
+
+    profile = registry.profile()
+    assert profile['counters'] == {'network_calls[client=yfinance.info]': 3}
+    assert profile['timers']['strategy_stage[stage=technical]']['count'] == 1
+    assert profile['timers']['sentiment_score']['count'] == 1
+    json.dumps(profile)
+
+def test_prometheus_text(registry):
+    registry.increment('talib_calls', 7)
+    registry.observe('fetch_data', 0.02)
+    registry.observe('fetch_data', 3.0)
+    text = registry.render_prometheus()
+
+    assert '# TYPE trading_talib_calls_total counter\ntrading_talib_calls_total 7' in text
+    assert 'trading_fetch_data_seconds_bucket{le="0.01"} 0' in text
+    assert 'trading_fetch_data_seconds_bucket{le="0.05"} 1' in text
+    assert 'trading_fetch_data_seconds_bucket{le="+Inf"} 2' in text
+    assert 'trading_fetch_data_seconds_count 2' in text
+
+def test_metrics_endpoint(registry):
+    registry.increment('network_calls', client='gnews')
+    server = registry.serve(port=0)
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/metrics'
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+        assert 'trading_network_calls_total{client="gnews"} 1' in body
+    finally:
+        server.shutdown()
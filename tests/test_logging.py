@@ -0,0 +1,104 @@
+import logging
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+
+from scripts.strategy import Strategy
+from scripts.utils import ContextFilter, RateLimitFilter, log_context
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def make_logger(*filters):
+    logger = logging.getLogger(f'test_logging.{len(filters)}.{id(filters)}')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = Collect()
+    for f in filters:
+        handler.addFilter(f)
+    logger.addHandler(handler)
+    return logger, handler.records
+
+def test_context_fields_follow_the_logging_thread():
+    logger, records = make_logger(ContextFilter())
+
+    def other():
+        with log_context(symbol='MSFT'):
+            logger.error('other')
+
+    with log_context(symbol='AAPL'):
+        with log_context(component='technical'):
+            logger.error('inner')
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+    logger.error('outside')
+
+    assert [(r.getMessage(), r.context) for r in records] == [
+        ('inner', ' [symbol=AAPL component=technical]'),
+        ('other', ' [symbol=MSFT]'),
+        ('outside', '')]
+    assert records[0].symbol == 'AAPL'
+
+def test_rate_limit_is_per_message_and_reports_suppressed():
+    limiter = RateLimitFilter(burst=3, window=60)
+    logger, records = make_logger(limiter)
+
+    def fetch_failed(symbol):
+        logger.error('Error fetching data for %s', symbol)
+
+    for _ in range(10):
+        fetch_failed('AAPL')
+    for i in range(2):
+        logger.error('another site %d', i)
+    for i in range(5):
+        logger.info('progress %d', i)
+    assert len(records) == 3 + 2 + 5
+
+    # Once the window has passed, the next copy carries the suppressed count
+    for site in limiter._sites.values():
+        site[0] -= 61
+    fetch_failed('AAPL')
+    fetch_failed('AAPL')
+    assert records[-2].getMessage() == 'Error fetching data for AAPL (7 identical messages suppressed)'
+    assert records[-1].getMessage() == 'Error fetching data for AAPL'
+
+def test_rate_limit_lets_distinct_symbols_from_one_site_through():
+    logger, records = make_logger(RateLimitFilter(burst=3, window=60))
+
+    def fetch_failed(symbol):
+        logger.error('Error fetching data for %s', symbol)
+
+    symbols = [f'S{i:03d}' for i in range(50)]
+    for symbol in symbols:
+        fetch_failed(symbol)
+        fetch_failed(symbol)
+    assert len(records) == 100
+    assert [r.getMessage() for r in records[::2]] == [f'Error fetching data for {s}' for s in symbols]
+
+def test_strategy_errors_are_logged_with_the_symbol():
+    import utils   # scripts.strategy logs through the top-level module, not scripts.utils
+
+    handler = Collect()
+    handler.addFilter(utils.ContextFilter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        strategy = Strategy(['AAPL'])
+        with patch('scripts.strategy.fetch_data', side_effect=ValueError('no data')):
+            strategy.fetch_all_data()
+        strategy.stock_data['AAPL'] = pd.DataFrame({'Close': [1.0]})
+        with patch.object(Strategy, 'analyse_symbol', side_effect=ValueError('bad data')):
+            strategy.analyse_all_stocks()
+    finally:
+        root.removeHandler(handler)
+
+    errors = [(r.getMessage(), r.context) for r in handler.records if r.levelno == logging.ERROR]
+    assert errors == [('Error fetching data for AAPL: no data', ' [symbol=AAPL]'),
+                      ('Error analyzing AAPL: bad data', ' [symbol=AAPL]')]
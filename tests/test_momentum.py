@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.momentum import MomentumScreen
+from scripts.technical import TechnicalAnalyser
+
+def make_frames(n_symbols=6, n=300):
+    index = pd.bdate_range('2023-01-02', periods=n)
+    frames = {}
+    for k in range(n_symbols):
+        rng = np.random.default_rng(k)
+        close = 50 * np.exp(np.cumsum(rng.normal(0.001 * (k - 2), 0.02, n)))
+        frames[f'S{k}'] = pd.DataFrame({
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+            'Volume': rng.integers(1_000, 2_000, n).astype(float)
+        }, index=index)
+    # A recent listing without a full year of history
+    frames['NEW'] = frames['S0'].iloc[-30:].copy()
+    return frames
+
+def test_momentum_metrics_match_pandas():
+    frames = make_frames()
+    screen = MomentumScreen.from_frames(frames)
+    metrics = screen.metrics('1 Month').set_index('Symbol')
+
+    for symbol in ['S0', 'S3', 'NEW']:
+        df = frames[symbol]
+        assert metrics.loc[symbol, 'Price Change %'] == pytest.approx(
+            (df['Close'].iloc[-1] / df['Close'].iloc[-22] - 1) * 100)
+        assert metrics.loc[symbol, 'Volume Ratio'] == pytest.approx(
+            df['Volume'].iloc[-1] / df['Volume'].iloc[-22:-1].mean())
+        # Same RSI as the technical analyser
+        rsi = TechnicalAnalyser(df).calculate_indicators()['RSI'].iloc[-1]
+        assert metrics.loc[symbol, 'RSI'] == pytest.approx(rsi)
+
+    # Not enough history for a year
+    assert np.isnan(screen.metrics('1 Year').set_index('Symbol').loc['NEW', 'Price Change %'])
+
+def test_momentum_screen_filters():
+    screen = MomentumScreen.from_frames(make_frames())
+    metrics = screen.metrics('3 Months')
+
+    results = screen.screen(rsi_range=(40, 80), change_range=(-5, 30), period='3 Months',
+                            above_average_volume=True)
+    expected = metrics[metrics['RSI'].between(40, 80) &
+                       metrics['Price Change %'].between(-5, 30) &
+                       (metrics['Volume Ratio'] > 1)]
+    assert sorted(results['Symbol']) == sorted(expected['Symbol'])
+    assert results['Price Change %'].is_monotonic_decreasing
+
+    assert len(screen.screen(period='1 Year')) == len(screen.symbols) - 1
+    with pytest.raises(ValueError, match="Invalid period"):
+        screen.screen(period='2 Days')
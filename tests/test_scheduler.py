@@ -0,0 +1,173 @@
+import multiprocessing as mp
+from datetime import date, datetime, timedelta
+
+from scripts.market_calendar import EXCHANGE_TZ, MarketCalendar, nyse_holidays
+from scripts.result_store import ResultStore
+from scripts.scheduler import RefreshScheduler
+
+def et(*args):
+    return datetime(*args, tzinfo=EXCHANGE_TZ)
+
+def test_nyse_holidays_2024():
+    assert sorted(nyse_holidays(2024)) == [
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29),
+        date(2024, 5, 27), date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2),
+        date(2024, 11, 28), date(2024, 12, 25)
+    ]
+    # Saturday New Year's Day is not observed on the Friday before
+    assert date(2021, 12, 31) not in nyse_holidays(2021) | nyse_holidays(2022)
+
+def test_market_calendar_sessions():
+    calendar = MarketCalendar()
+    assert calendar.is_open(et(2024, 7, 2, 10, 0))
+    assert not calendar.is_open(et(2024, 7, 2, 9, 29))
+    assert not calendar.is_open(et(2024, 7, 3, 13, 30))    # half day
+    assert not calendar.is_open(et(2024, 7, 4, 11, 0))     # holiday
+    assert not calendar.is_open(et(2024, 7, 6, 11, 0))     # Saturday
+    # Good Friday and the weekend are skipped
+    assert calendar.next_open(et(2024, 3, 28, 17, 0)) == et(2024, 4, 1, 9, 30)
+    assert calendar.last_close(et(2024, 4, 1, 9, 0)) == et(2024, 3, 28, 16, 0)
+
+def test_result_store_round_trip(tmp_path):
+    store = ResultStore(tmp_path / 'scores.json')
+    store.publish('AAPL', 'technical', 80, updated=100.0)
+    store.publish('AAPL', 'fundamental', 60, updated=200.0)
+    assert store.flush() and not store.flush()
+
+    reader = ResultStore(tmp_path / 'scores.json')
+    result = reader.get_analysis('AAPL')
+    assert result['score'] == 70 and result['sentiment'] is None
+    assert result['updated'] == 200.0
+    assert not reader.reload()
+
+    store.publish('MSFT', 'sentiment', 55)
+    store.flush()
+    assert reader.reload() and reader.revision == 2
+    assert [r['symbol'] for r in reader.results()] == ['AAPL', 'MSFT']
+
+def test_scheduler_spreads_refreshes_and_respects_hours(tmp_path):
+    calls = []
+
+    def refresher(component):
+        return lambda symbol: calls.append((component, symbol)) or 50.0
+
+    store = ResultStore(tmp_path / 'scores.json')
+    scheduler = RefreshScheduler(
+        ['A', 'B', 'C'], store,
+        refreshers={'technical': refresher('technical'), 'fundamental': refresher('fundamental')},
+        cadences={'technical': {'interval': 900}},
+        flush_interval=0
+    )
+
+    # Saturday: nothing runs, work moves to Monday
+    saturday = et(2024, 7, 6, 12, 0)
+    next_due = scheduler.step(saturday)
+    assert calls == []
+    assert next_due >= et(2024, 7, 8).timestamp()
+
+    # Monday morning before the open: fundamentals only
+    scheduler.step(et(2024, 7, 8, 9, 0))
+    assert {c for c, _ in calls} == {'fundamental'}
+
+    # Technical refreshes are spread across the 15-minute interval after the open
+    calls.clear()
+    scheduler.step(et(2024, 7, 8, 9, 30))
+    assert calls == [('technical', 'A')]
+    scheduler.step(et(2024, 7, 8, 9, 40))
+    assert calls == [('technical', 'A'), ('technical', 'B'), ('technical', 'C')]
+
+    # The final bar is scored just after the close, then technical stops
+    calls.clear()
+    scheduler.step(et(2024, 7, 8, 16, 10))
+    scheduler.step(et(2024, 7, 8, 17, 0))
+    scheduler.step(et(2024, 7, 8, 23, 0))
+    assert [c for c, _ in calls if c == 'technical'] == ['technical'] * 3
+    assert scheduler.queue[0][0] >= et(2024, 7, 9, 0, 0).timestamp()
+
+    reader = ResultStore(tmp_path / 'scores.json')
+    assert reader.get_analysis('B')['technical'] == 50.0
+
+def test_scheduler_does_not_refresh_fresh_scores_on_restart(tmp_path):
+    store = ResultStore(tmp_path / 'scores.json')
+    now = et(2024, 7, 8, 12, 0)
+    store.publish('A', 'technical', 40, updated=(now - timedelta(minutes=5)).timestamp())
+
+    calls = []
+    scheduler = RefreshScheduler(['A'], store, refreshers={'technical': calls.append})
+    scheduler.step(now)
+    assert calls == []
+    scheduler.step(now + timedelta(minutes=10))
+    assert calls == ['A']
+
+def test_result_store_merges_concurrent_writers(tmp_path):
+    first = ResultStore(tmp_path / 'scores.json')
+    second = ResultStore(tmp_path / 'scores.json')
+    first.publish('AAPL', 'technical', 80, updated=100.0)
+    first.flush()
+    second.publish('MSFT', 'technical', 60, updated=100.0)
+    second.publish('AAPL', 'technical', 70, updated=50.0)   # older than first's
+    second.flush()
+
+    reader = ResultStore(tmp_path / 'scores.json')
+    assert reader.get_analysis('AAPL')['technical'] == 80
+    assert reader.get_analysis('MSFT')['technical'] == 60
+    assert reader.revision == 2
+
+def test_reload_keeps_published_scores_until_flushed(tmp_path):
+    store = ResultStore(tmp_path / 'scores.json')
+    store.publish('NVDA', 'technical', 70, updated=200.0)
+
+    # Another process flushes in between publish() and flush()
+    writer = ResultStore(tmp_path / 'scores.json')
+    writer.publish('AAPL', 'technical', 80, updated=100.0)
+    writer.flush()
+
+    assert store.reload()
+    assert store.get_analysis('NVDA')['technical'] == 70
+    assert store.get_analysis('AAPL')['technical'] == 80
+    assert store.flush()
+
+    reader = ResultStore(tmp_path / 'scores.json')
+    assert reader.get_analysis('NVDA')['technical'] == 70
+    assert reader.get_analysis('AAPL')['technical'] == 80
+    assert reader.revision == 2
+
+def _publish_many(path, worker):
+    store = ResultStore(path)
+    for k in range(20):
+        store.publish(f'S{worker}_{k}', 'technical', k)
+        store.flush()
+
+def test_result_store_locks_out_writers_in_other_processes(tmp_path):
+    path = tmp_path / 'scores.json'
+    ctx = mp.get_context('fork')
+    processes = [ctx.Process(target=_publish_many, args=(path, w)) for w in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    # No flush overwrote another process's merge
+    reader = ResultStore(path)
+    assert len(reader.symbols) == 80
+    assert reader.revision == 80
+
+def test_combine_scores_matches_per_symbol_weighting(tmp_path):
+    import numpy as np
+    from scripts.result_store import combine_scores, results_frame
+
+    store = ResultStore(tmp_path / 'scores.json')
+    store.publish_analysis({'symbol': 'AAPL', 'technical': 80, 'fundamental': 60, 'sentiment': 70})
+    store.publish_analysis({'symbol': 'MSFT', 'technical': 50, 'fundamental': None, 'sentiment': 90})
+    frame = store.to_frame()
+
+    combined = combine_scores(frame, store.weights)
+    expected = [store.get_analysis(s)['score'] for s in frame['symbol']]
+    np.testing.assert_allclose(combined, expected)
+
+    # Only sentiment weighted: MSFT ranks first; a symbol without it has no score
+    frame = results_frame([*store.results(), None,
+                           {'symbol': 'NVDA', 'technical': 99, 'fundamental': None, 'sentiment': None}])
+    combined = combine_scores(frame, {'sentiment': 1})
+    assert list(frame['symbol'][np.argsort(-np.nan_to_num(combined, nan=-1))]) == ['MSFT', 'AAPL', 'NVDA']
+    assert np.isnan(combined[2])
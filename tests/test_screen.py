@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from scripts.screen import Screener, read_universe
+
+def fake_analyse(symbol):
+    if symbol.startswith('BAD'):
+        raise ValueError("no data")
+    return {'symbol': symbol, 'score': float(len(symbol)), 'technical': 50.0,
+            'fundamental': None, 'sentiment': None}
+
+def test_read_universe(tmp_path):
+    path = tmp_path / 'tickers.txt'
+    path.write_text("aapl, msft\n# comment\nGOOG  AAPL\n\n")
+    assert read_universe(path) == ['AAPL', 'MSFT', 'GOOG']
+
+def test_screener_writes_parts_and_resumes(tmp_path):
+    symbols = [f'S{i}' for i in range(10)] + ['BAD1']
+    calls = []
+
+    def crashing(symbol):
+        calls.append(symbol)
+        if len(calls) == 6:
+            raise KeyboardInterrupt
+        return fake_analyse(symbol)
+
+    with pytest.raises(KeyboardInterrupt):
+        Screener(tmp_path, crashing, workers=1, batch_size=2).run(symbols)
+
+    first = Screener(tmp_path, fake_analyse, workers=1, batch_size=2)
+    done = first.checkpoint.done
+    # Whole batches before the crash are kept, the unflushed one is not
+    assert 4 <= len(done) < 6 and done <= set(symbols[:5])
+
+    calls.clear()
+    summary = Screener(tmp_path, lambda s: calls.append(s) or fake_analyse(s),
+                       workers=4, batch_size=2).run(symbols)
+    assert summary == {'screened': 10 - len(done), 'failed': 1, 'skipped': len(done)}
+    assert sorted(calls) == sorted(set(symbols) - done)
+
+    results = first.results()
+    assert sorted(results['symbol']) == sorted(symbols[:10])
+    assert results['fundamental'].isna().all()
+
+    # Failures are not retried unless asked
+    summary = Screener(tmp_path, fake_analyse, retry_failed=False).run(symbols)
+    assert summary == {'screened': 0, 'failed': 0, 'skipped': 11}
+    summary = Screener(tmp_path, fake_analyse, retry_failed=True).run(symbols)
+    assert summary['skipped'] == 10 and summary['failed'] == 1
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.scoring import ScorePanel
+from scripts.sentiment_history import SentimentHistory
+from scripts.sentiment_store import SentimentStore
+
+def item(title, source, score, when):
+    return {'title': title, 'source': source, 'score': score, 'timestamp': pd.Timestamp(when)}
+
+@pytest.fixture
+def history(tmp_path):
+    history = SentimentHistory(tmp_path / 'history')
+    # Timestamps are UTC: 14:00 is 09:00 ET, 21:30 is 16:30 ET on Friday the 1st
+    history.append('AAPL', [item('beat', 'yfinance', 90, '2024-03-01 14:00'),
+                            item('record', 'gnews', 70, '2024-03-01 21:30'),
+                            item('probe', 'yfinance', 20, '2024-03-04 09:00')])
+    history.append('MSFT', [item('cut', 'yfinance', 30, '2024-03-02 10:00')])
+    return history
+
+def test_daily_scores_and_windows(history):
+    daily = history.daily(['AAPL']).set_index('date')
+    # News after Friday's close counts toward Monday the 4th: 0.6 * 20 + 0.4 * 70
+    assert daily.loc['2024-03-01', 'score'] == pytest.approx(90)
+    assert daily.loc['2024-03-04', 'score'] == pytest.approx(40)
+    assert list(daily['headlines']) == [1, 2]
+
+    # A 7-day look-back on the 4th still sees the 1st: yfinance mean 55, gnews 70
+    assert history.as_of('AAPL', '2024-03-04', window_days=7) == pytest.approx(0.6 * 55 + 0.4 * 70)
+    assert history.as_of('AAPL', '2024-02-28') == 50
+    # Neutral again once the window has passed the last headline
+    assert history.as_of('AAPL', '2024-03-20') == 50
+    # Weekend news is filed under the next session
+    assert history.daily(start='2024-03-02', end='2024-03-03').empty
+    assert history.daily(['MSFT'])['date'].tolist() == [pd.Timestamp('2024-03-04')]
+
+def test_session_date_follows_the_exchange_close():
+    from scripts.sentiment_history import session_date
+
+    assert session_date(pd.Timestamp('2024-03-01 20:59')) == pd.Timestamp('2024-03-01')
+    assert session_date(pd.Timestamp('2024-03-01 21:00')) == pd.Timestamp('2024-03-04')
+    # Summer time: the close is 20:00 UTC, 17:00 on the early close of July 3rd
+    assert session_date(pd.Timestamp('2024-07-02 19:59')) == pd.Timestamp('2024-07-02')
+    assert session_date(pd.Timestamp('2024-07-03 16:59')) == pd.Timestamp('2024-07-03')
+    assert session_date(pd.Timestamp('2024-07-03 17:00')) == pd.Timestamp('2024-07-05')
+    # Late evening ET falls on the next UTC day; before the open counts toward that day
+    assert session_date(pd.Timestamp('2024-03-05 03:00')) == pd.Timestamp('2024-03-05')
+    assert session_date(pd.Timestamp('2024-03-05 13:00')) == pd.Timestamp('2024-03-05')
+
+def test_append_only_dedupes_and_compacts(history, tmp_path):
+    assert history.append('AAPL', [item('beat', 'yfinance', 10, '2024-03-05')]) == 0
+    reopened = SentimentHistory(tmp_path / 'history')
+    assert reopened.append('AAPL', [item('beat', 'yfinance', 10, '2024-03-05'),
+                                    item('upgrade', 'gnews', 80, '2024-03-05')]) == 1
+    before = reopened.daily()
+    reopened.compact()
+    assert len(list((tmp_path / 'history' / 'daily').glob('*.parquet'))) == 1
+    pd.testing.assert_frame_equal(reopened.daily(), before)
+    headlines = reopened.headlines('AAPL', start='2024-03-02')
+    assert headlines['title'].tolist() == ['upgrade', 'probe']
+
+def test_mapping_feeds_score_panel_and_imports_store(history, tmp_path):
+    store = SentimentStore(tmp_path / 'sentiment.db')
+    store.add_headlines('NVDA', [item('chips', 'yfinance', 95, '2024-03-02 12:00')])
+    assert history.import_store(store) == 1
+    assert history.import_store(store) == 0
+
+    view = history.as_mapping(['AAPL', 'NVDA', 'TSLA'])
+    assert sorted(view) == ['AAPL', 'NVDA'] and view.get('TSLA') is None
+
+    dates = pd.bdate_range('2024-02-26', '2024-03-29')
+    close = pd.DataFrame({'Open': 100.0, 'High': 101.0, 'Low': 99.0, 'Close': 100.0,
+                          'Volume': 1000}, index=dates)
+    panel = ScorePanel.from_price_data({'AAPL': close, 'NVDA': close}, sentiment_history=view)
+    aapl = pd.Series(panel.sentiment[:, panel.symbols.index('AAPL')], index=dates)
+    assert aapl['2024-02-29'] == 50
+    assert aapl['2024-03-01'] == pytest.approx(90)
+    assert aapl['2024-03-04'] == pytest.approx(0.6 * 55 + 0.4 * 70)
+    assert aapl['2024-03-29'] == 50
+    assert np.nanmax(panel.sentiment[:, panel.symbols.index('NVDA')]) == pytest.approx(95)
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from scripts.sentiment_store import SentimentStore, SentimentWorker, sentiment_label
+
+def item(title, source, score, hours_ago):
+    return {'title': title, 'source': source, 'score': score,
+            'timestamp': datetime.now() - timedelta(hours=hours_ago)}
+
+@pytest.fixture
+def store(tmp_path):
+    store = SentimentStore(tmp_path / 'sentiment.db')
+    store.add_headlines('AAPL', [
+        item('beat', 'yfinance', 90, 2),
+        item('record', 'gnews', 70, 3),
+        item('old lawsuit', 'yfinance', 10, 24 * 10),
+    ])
+    store.add_headlines('MSFT', [item('cut', 'yfinance', 30, 5)])
+    store.add_headlines('QUIET', [])
+    return store
+
+def test_summary_weights_sources_and_filters_by_time(store):
+    week = store.summary(since=datetime.now() - timedelta(weeks=1)).set_index('symbol')
+    # 0.6 * 90 + 0.4 * 70
+    assert week.loc['AAPL', 'score'] == pytest.approx(82)
+    assert week.loc['AAPL', 'headlines'] == 2
+    assert week.loc['AAPL', 'label'] == 'Very Positive'
+    assert week.loc['QUIET', 'score'] == 50 and week.loc['QUIET', 'headlines'] == 0
+
+    month = store.summary(since=datetime.now() - timedelta(days=30)).set_index('symbol')
+    assert month.loc['AAPL', 'score'] == pytest.approx(0.6 * 50 + 0.4 * 70)
+
+    only_gnews = store.summary(symbols=['AAPL', 'MSFT'], sources=['gnews']).set_index('symbol')
+    assert only_gnews.loc['AAPL', 'score'] == pytest.approx(70)
+    assert only_gnews.loc['MSFT', 'headlines'] == 0
+    assert store.summary(sources=[]).empty
+
+def test_headlines_are_kept_once_and_missing_symbols_reported(store):
+    store.add_headlines('AAPL', [item('beat', 'yfinance', 95, 0)])
+    headlines = store.headlines('AAPL')
+    assert len(headlines) == 3
+    assert headlines.loc[headlines['title'] == 'beat', 'score'].item() == 90
+
+    assert store.missing(['AAPL', 'NVDA', 'QUIET']) == ['NVDA']
+    assert store.missing(['AAPL'], max_age=-1) == ['AAPL']
+    assert sentiment_label(59.9) == 'Neutral' and sentiment_label(0) == 'Very Negative'
+
+def test_worker_scores_submitted_symbols_in_background(tmp_path):
+    from benchmarks.stubs import offline
+
+    store = SentimentStore(tmp_path / 'sentiment.db')
+    with offline():
+        worker = SentimentWorker(store, symbols_per_job=4)
+        assert worker.submit(['S0001', 'S0002', 'S0003']) == 3
+        assert worker.wait(timeout=60)
+
+    assert store.missing(['S0001', 'S0002', 'S0003']) == []
+    summary = store.summary(symbols=['S0001', 'S0002', 'S0003'])
+    assert (summary['headlines'] > 0).all()
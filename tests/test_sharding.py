@@ -0,0 +1,85 @@
+import os
+import threading
+from functools import partial
+
+from scripts.sharding import (Coordinator, QueueWorkQueue, analyse_sharded, partition, run_worker,
+                              shard_for)
+
+SYMBOLS = [f'S{i:04d}' for i in range(60)]
+
+def fake_analyse(symbols):
+    return {s: {'symbol': s, 'score': float(int(s[1:])), 'technical': None,
+                'fundamental': None, 'sentiment': None} for s in symbols}
+
+def dies_once(marker, symbols):
+    """Kill the worker process the first time it sees S0007"""
+    if 'S0007' in symbols and not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return fake_analyse(symbols)
+
+def test_partition_is_stable_and_complete():
+    shards = partition(SYMBOLS, 4)
+    assert sorted(s for symbols in shards.values() for s in symbols) == SYMBOLS
+    assert all(shard_for(s, 4) == shard for shard, symbols in shards.items() for s in symbols)
+    assert shard_for('AAPL', 16) == shard_for('AAPL', 16) == 12
+
+def test_dead_process_work_is_requeued(tmp_path):
+    coordinator = analyse_sharded(SYMBOLS, processes=3, n_shards=6, chunk_size=4,
+                                  analyse=partial(dies_once, str(tmp_path / 'died')), timeout=60)
+
+    assert (tmp_path / 'died').exists()
+    assert coordinator.requeued >= 1
+    assert sorted(coordinator.analysis_results) == SYMBOLS
+    assert coordinator.analysis_results['S0007']['score'] == 7
+    report = coordinator.throughput()
+    assert sum(stats['symbols'] for stats in report.values()) == len(SYMBOLS)
+    assert all(stats['symbols_per_busy_second'] > 0 for stats in report.values())
+
+def test_silent_worker_loses_its_lease():
+    work_queue = QueueWorkQueue(2)
+    coordinator = Coordinator(SYMBOLS[:8], work_queue, n_shards=2, chunk_size=4, lease_timeout=0.5)
+    coordinator.submit()
+    # A remote worker takes a task and disappears without finishing it
+    lost = work_queue.get_task()
+    work_queue.put_message(('started', 'remote-1', lost.task_id))
+    coordinator.pending = set(coordinator.tasks)
+    coordinator.submit = lambda: None
+
+    worker = threading.Thread(target=run_worker,
+                              args=(work_queue, 'local-1', (), fake_analyse, 0.1), daemon=True)
+    worker.start()
+    results = coordinator.run(timeout=30)
+    worker.join(timeout=5)
+
+    assert coordinator.requeued == 1
+    assert sorted(results) == SYMBOLS[:8]
+    assert coordinator.tasks[lost.task_id].attempt == 1
+
+def test_task_taken_but_never_started_is_requeued():
+    work_queue = QueueWorkQueue(2)
+    coordinator = Coordinator(SYMBOLS[:8], work_queue, n_shards=2, chunk_size=4,
+                              lease_timeout=60, claim_timeout=0.5)
+    coordinator.submit()
+    # A worker takes a task and dies before reporting it started
+    lost = work_queue.get_task()
+    coordinator.submit = lambda: None
+
+    worker = threading.Thread(target=run_worker,
+                              args=(work_queue, 'local-1', (), fake_analyse, 0.1), daemon=True)
+    worker.start()
+    results = coordinator.run(timeout=10)
+    worker.join(timeout=5)
+
+    assert coordinator.requeued == 1
+    assert sorted(results) == SYMBOLS[:8]
+    assert coordinator.tasks[lost.task_id].attempt == 1
+
+def test_start_reported_after_worker_died_is_requeued():
+    coordinator = Coordinator(SYMBOLS[:8], QueueWorkQueue(2), n_shards=2, chunk_size=4)
+    coordinator.worker_died('worker-0.0')
+    coordinator.handle(('started', 'worker-0.0', 0))
+
+    assert coordinator.requeued == 1
+    assert 0 not in coordinator.running
+    assert 'worker-0.0' not in coordinator.last_seen
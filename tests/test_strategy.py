@@ -111,7 +111,10 @@ def test_analyse_all_stocks_basic(mock_sentiment, mock_fundamental, mock_technic
     strategy.analyse_all_stocks()
 
     mock_fetch.assert_called_once_with('TEST')
-    mock_technical.assert_called_once_with(mock_fetch.return_value)
+    # Prices are stored compacted (float32), so compare values rather than identity
+    mock_technical.assert_called_once()
+    pd.testing.assert_frame_equal(mock_technical.call_args[0][0], mock_fetch.return_value,
+                                  check_dtype=False)
     mock_fundamental.assert_called_once_with('TEST')
     mock_sentiment.assert_called_once_with('TEST')
 
@@ -124,3 +127,20 @@ def test_analyse_all_stocks_basic(mock_sentiment, mock_fundamental, mock_technic
     assert result['sentiment'] == 0.55
     # Check calculated total score: (0.75 * 0.4) + (0.65 * 0.4) + (0.55 * 0.2) = 0.3 + 0.26 + 0.11 = 0.67
     assert pytest.approx(result['score']) == 0.67
+
+def test_import_does_not_load_heavy_dependencies():
+    """Importing Strategy must not pull in torch, TA-Lib or the network clients."""
+    import json
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    scripts_dir = Path(__file__).resolve().parent.parent / 'scripts'
+    code = ("import sys, json, strategy; "
+            "print(json.dumps([m for m in ('torch', 'transformers', 'talib', 'yfinance', 'gnews', 'bs4') "
+            "if m in sys.modules]))")
+    env = dict(os.environ, PYTHONPATH=str(scripts_dir))
+    output = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from scripts.streaming import (Bar, BarAggregator, FileReplaySource, IntradayTechnicals, ReplayServer,
+                               SocketSource, StreamingPipeline, Tick)
+from scripts.technical import TechnicalAnalyser
+
+def write_ticks(path, symbols=('AAA', 'BBB'), minutes=50, per_minute=4, quiet=()):
+    rng = np.random.default_rng(0)
+    prices = {s: 100.0 for s in symbols}
+    with open(path, 'w') as f:
+        f.write('timestamp,symbol,price,size\n')
+        for m in range(minutes):
+            for k in range(per_minute):
+                for s in symbols:
+                    if s in quiet and m >= minutes // 2:
+                        continue
+                    prices[s] *= np.exp(rng.normal(0, 0.003))
+                    f.write(f'{m * 60 + k * 10 + 1},{s},{prices[s]:.4f},10\n')
+
+def test_bar_aggregator_builds_ohlcv_and_closes_quiet_symbols():
+    aggregator = BarAggregator(interval=60, grace=1)
+    ticks = [Tick('A', 1, 10, 1), Tick('A', 20, 12, 2), Tick('B', 30, 50, 5),
+             Tick('A', 40, 9, 1), Tick('A', 59, 11, 3)]
+    assert [bar for tick in ticks for bar in aggregator.add(tick)] == []
+
+    # A's next-interval tick closes A's bar; B closes once the clock passes 61
+    closed = aggregator.add(Tick('A', 60.5, 11.5, 1))
+    assert [(b.symbol, b.open, b.high, b.low, b.close, b.volume) for b in closed] == [
+        ('A', 10, 12, 9, 11, 7)]
+    closed = aggregator.add(Tick('A', 61.5, 11.6, 1))
+    assert [(b.symbol, b.start, b.close) for b in closed] == [('B', 0, 50)]
+
+    # A late tick for a closed interval is ignored
+    assert aggregator.add(Tick('B', 45, 99, 1)) == []
+    assert [(b.symbol, b.start) for b in aggregator.flush()] == [('A', 60)]
+
+def minute_bars(n=150, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return [Bar('AAA', 60.0 * k, c * 1.001, c * 1.003, c * 0.997, c, 100.0)
+            for k, c in enumerate(close)]
+
+def test_intraday_scores_use_the_minute_bars_unresampled():
+    bars = minute_bars()
+    frame = pd.DataFrame([bar[2:] for bar in bars], columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                         index=pd.to_datetime([bar.start for bar in bars], unit='s'))
+    technicals = IntradayTechnicals(window=120, min_bars=35)
+    scores = []
+    for k, bar in enumerate(bars):
+        score = technicals.update(bar)
+        if k + 1 < 35:
+            assert score is None
+            continue
+        window = frame.iloc[max(0, k + 1 - 120):k + 1]
+        analyser = TechnicalAnalyser(window)
+        assert analyser.data is window
+        assert score == analyser.analyse()
+        scores.append(score)
+    # All bars fall on one day, so daily resampling would pin every score at 50
+    assert len(set(scores)) > 1
+
+def test_pipeline_scores_only_symbols_with_new_bars(tmp_path):
+    path = tmp_path / 'ticks.csv'
+    write_ticks(path, symbols=('AAA', 'BBB', 'CCC'), minutes=50, quiet=('CCC',))
+    scored = []
+    technicals = IntradayTechnicals(window=60, min_bars=20,
+                                    on_score=lambda symbol, score, bar: scored.append((symbol, bar.start, score)))
+    # Tiny queues force the stages to block on each other
+    pipeline = StreamingPipeline(FileReplaySource(path), technicals, interval=60,
+                                 tick_queue_size=8, bar_queue_size=2, workers=2)
+    stats = pipeline.run()
+
+    assert stats['ticks'] == 50 * 4 * 2 + 25 * 4
+    assert stats['bars'] == 50 * 2 + 25
+    assert stats['tick_queue_peak'] <= 8 and stats['bar_queue_peak'] <= 2
+    assert stats['errors'] == 0
+    # CCC stopped trading after 25 bars, so it was scored on 6 bars only
+    assert sum(1 for s, _, _ in scored if s == 'CCC') == 25 - 20 + 1
+    assert sum(1 for s, _, _ in scored if s == 'AAA') == 50 - 20 + 1
+    # Each symbol's bars are scored in order
+    aaa = [start for s, start, _ in scored if s == 'AAA']
+    assert aaa == sorted(aaa)
+    assert set(technicals.scores) == {'AAA', 'BBB', 'CCC'}
+
+    # Every score matches the analyser run on the bars up to and including its
+    # own; the 60-bar window still holds all 50 bars of each symbol
+    for symbol, start, score in scored:
+        frame = technicals.frame(symbol)
+        expected = TechnicalAnalyser(frame[frame.index <= pd.Timestamp(start, unit='s')]).analyse()
+        assert score == expected, (symbol, start)
+    # Scores move with the bars rather than sitting at a neutral 50
+    aaa_scores = [score for s, _, score in scored if s == 'AAA']
+    assert len(set(aaa_scores)) > 1
+    assert technicals.scores['AAA'] == aaa_scores[-1]
+
+def test_socket_replay_matches_file_replay(tmp_path):
+    path = tmp_path / 'ticks.csv'
+    write_ticks(path, minutes=3)
+    server = ReplayServer(path)
+    try:
+        received = list(SocketSource('127.0.0.1', server.port, timeout=10).ticks())
+    finally:
+        server.close()
+    assert received == list(FileReplaySource(path).ticks())
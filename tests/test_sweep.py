@@ -0,0 +1,50 @@
+import pytest
+
+from scripts.backtest import Backtester
+from scripts.sweep import (ParameterGrid, RandomSearch, SweepRunner,
+                           backtester_kwargs, config_id)
+
+WEIGHTS = {'technical': 0.4, 'fundamental': 0.4, 'sentiment': 0.2}
+
+def test_parameter_grid_and_random_search():
+    grid = ParameterGrid({'buy_threshold': [60, 70], 'position_fraction': [0.1, 0.2, 0.3]})
+    assert len(grid) == 6
+    assert len({config_id(p) for p in grid}) == 6
+
+    search = RandomSearch({'buy_threshold': (60, 80), 'sell_threshold': [20, 30]}, n_iter=5, seed=1)
+    assert list(search) == list(search)  # Reproducible for resume
+    assert all(60 <= p['buy_threshold'] <= 80 for p in search)
+
+def test_backtester_kwargs_merges_dotted_names():
+    kwargs = backtester_kwargs({'weights.technical': 0.6, 'buy_threshold': 65},
+                               {'weights': WEIGHTS})
+    assert kwargs['weights'] == {'technical': 0.6, 'fundamental': 0.4, 'sentiment': 0.2}
+    assert kwargs['buy_threshold'] == 65
+    assert WEIGHTS['technical'] == 0.4  # Base left untouched
+
+    with pytest.raises(ValueError, match="Invalid sweep parameter: cash"):
+        backtester_kwargs({'cash': 1}, {})
+
+def test_sweep_matches_single_run_and_resumes(panel, tmp_path):
+    grid = ParameterGrid({'buy_threshold': [60, 75], 'position_fraction': [0.1, 0.2]})
+    checkpoint = tmp_path / 'sweep.jsonl'
+
+    table = SweepRunner(panel, '2021-06-01', grid, checkpoint=checkpoint, processes=2).run()
+    assert len(table) == 4
+    assert table['sharpe_ratio'].is_monotonic_decreasing
+
+    # Same result as running the configuration by hand in this process
+    params = {'buy_threshold': 60, 'position_fraction': 0.2}
+    backtester = Backtester(None, panel.symbols, '2021-06-01', weights=WEIGHTS, **params)
+    backtester.panel = panel
+    expected = backtester.run()
+    row = table[table['config_id'] == config_id(params)].iloc[0]
+    assert row['total_return'] == pytest.approx(expected['total_return'])
+    assert row['trades'] == expected['trades']
+
+    # Rerunning with a larger grid only evaluates the new configurations
+    lines = checkpoint.read_text().splitlines()
+    bigger = ParameterGrid({'buy_threshold': [60, 75, 80], 'position_fraction': [0.1, 0.2]})
+    table = SweepRunner(panel, '2021-06-01', bigger, checkpoint=checkpoint, processes=2).run()
+    assert len(table) == 6
+    assert len(checkpoint.read_text().splitlines()) == len(lines) + 2
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.strategy import Strategy
+from scripts.technical import TechnicalAnalyser
+from scripts.timeframes import TimeframeCache, history_days, resample_ohlcv
+
+def daily_bars(days=400, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    return pd.DataFrame({'Open': close * 0.99, 'High': close * 1.01, 'Low': close * 0.98,
+                         'Close': close, 'Volume': rng.integers(1000, 2000, days)}, index=dates)
+
+def test_weekly_and_monthly_aggregation():
+    df = daily_bars(30)
+    # Friday 2023-01-06 is dropped, e.g. a holiday
+    df = df.drop(pd.Timestamp('2023-01-06'))
+    weekly = resample_ohlcv(df, 'weekly')
+
+    first = df.loc['2023-01-02':'2023-01-05']
+    assert weekly.index[0] == pd.Timestamp('2023-01-05')
+    assert weekly.iloc[0].to_dict() == pytest.approx({
+        'Open': first['Open'].iloc[0], 'High': first['High'].max(), 'Low': first['Low'].min(),
+        'Close': first['Close'].iloc[-1], 'Volume': first['Volume'].sum()})
+    # The unfinished last week is dated by its last bar, not the coming Friday
+    assert weekly.index[-1] == df.index[-1]
+    assert weekly['Volume'].sum() == df['Volume'].sum()
+
+    monthly = resample_ohlcv(df, 'monthly')
+    assert list(monthly.index) == [pd.Timestamp('2023-01-31'), pd.Timestamp('2023-02-10')]
+    assert resample_ohlcv(df, 'daily') is df
+    with pytest.raises(ValueError):
+        resample_ohlcv(df, '1h')
+
+def test_intraday_bars_resample_to_hours_and_days():
+    index = pd.date_range('2024-03-04 09:30', periods=12, freq='30min')
+    df = pd.DataFrame({'Open': np.arange(12.0), 'High': np.arange(12.0) + 1,
+                       'Low': np.arange(12.0) - 1, 'Close': np.arange(12.0) + 0.5,
+                       'Volume': np.ones(12)}, index=index)
+    hourly = resample_ohlcv(df, '1h')
+    assert hourly['Volume'].tolist() == [1] + [2] * 5 + [1]
+    daily = resample_ohlcv(df, 'daily')
+    assert len(daily) == 1 and daily['High'].iloc[0] == 12 and daily['Close'].iloc[0] == 11.5
+
+def test_cache_memoises_until_the_source_changes():
+    source = {'AAA': daily_bars(), 'BBB': None}
+    cache = TimeframeCache(source)
+    weekly = cache.get('AAA', 'weekly')
+    assert cache.get('AAA', 'weekly') is weekly
+    assert cache.get('BBB', 'weekly') is None and cache.get('CCC', 'weekly') is None
+
+    source['AAA'] = daily_bars(401)
+    assert cache.get('AAA', 'weekly') is not weekly
+    view = cache.view('monthly')
+    assert list(view) == ['AAA', 'BBB'] and len(view['AAA']) == 19
+
+    score = TechnicalAnalyser(source['AAA'], 'weekly').analyse()
+    assert score == TechnicalAnalyser(cache.get('AAA', 'weekly')).analyse()
+    assert 0 <= score <= 100
+
+def test_technical_score_fetches_enough_history_for_the_timeframe(caplog):
+    assert history_days('weekly', 50) >= 50 * 7
+    assert history_days('monthly', 50) >= 50 * 30
+    fetches = []
+
+    def fetch(symbol, period=200):
+        fetches.append(period)
+        return daily_bars(period * 5 // 7)
+
+    strategy = Strategy(['AAA'])
+    with patch('scripts.strategy.fetch_data', side_effect=fetch):
+        strategy.fetch_all_data()
+        strategy.technical_score('AAA', 'daily')
+        assert fetches == [200]
+        strategy.technical_score('AAA', 'weekly')
+        strategy.technical_score('AAA', 'weekly')
+        assert fetches == [200, history_days('weekly', 50)]
+    assert len(strategy.timeframes.get('AAA', 'weekly')) >= TechnicalAnalyser.MIN_BARS
+
+    # Too few bars for the indicators is reported rather than silently neutral
+    TechnicalAnalyser(daily_bars(200), 'monthly').analyse()
+    assert 'Only 10 monthly bars' in caplog.text
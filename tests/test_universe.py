@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+
+from scripts.universe import UniversePrefetcher, UniverseRegistry
+from scripts.utils import FALLBACK_TICKERS
+
+class FakeSource:
+    def __init__(self, *lists):
+        self.lists = list(lists)
+        self.calls = 0
+
+    def __call__(self, timeout):
+        self.calls += 1
+        result = self.lists[min(self.calls, len(self.lists)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+def test_snapshots_are_served_locally_and_diffed(tmp_path):
+    source = FakeSource(['AAA', 'BBB', 'CCC'], ['AAA', 'CCC', 'DDD'])
+    changes = []
+    registry = UniverseRegistry(tmp_path, {'test': source}, on_change=changes.append)
+
+    assert registry.get('test') == ['AAA', 'BBB', 'CCC']
+    assert registry.get('test') == ['AAA', 'BBB', 'CCC']
+    assert source.calls == 1 and changes == []
+
+    # Back-date the snapshot so the next refresh is a different day
+    (tmp_path / 'test' / f"{registry.snapshots('test')[0]}.json").rename(tmp_path / 'test' / '2024-01-02.json')
+    diff = registry.refresh('test')
+    assert (diff.previous, diff.added, diff.removed) == ('2024-01-02', ['DDD'], ['BBB'])
+    assert changes == [diff] and registry.last_diff['test'] == diff
+    assert registry.snapshot('test', '2024-01-05') == ['AAA', 'BBB', 'CCC']
+    assert registry.diff('test', '2024-01-02', diff.current).added == ['DDD']
+
+def test_stale_snapshot_refreshes_in_background_and_failures_fall_back(tmp_path):
+    source = FakeSource(['AAA'], ['AAA', 'BBB'])
+    registry = UniverseRegistry(tmp_path, {'test': source}, max_age=timedelta(seconds=0))
+    registry.get('test')
+    time.sleep(0.01)
+    # Stale: served immediately, new list lands afterwards
+    assert registry.get('test') == ['AAA']
+    deadline = time.monotonic() + 5
+    while registry.snapshot('test') != ['AAA', 'BBB'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.snapshot('test') == ['AAA', 'BBB']
+
+    failing = UniverseRegistry(tmp_path / 'empty', {'test': FakeSource(TimeoutError('slow'))})
+    assert failing.get('test') == FALLBACK_TICKERS
+    assert failing.snapshots('test') == []
+
+def test_prefetcher_scores_added_symbols(tmp_path):
+    from benchmarks.stubs import offline
+    from scripts.result_store import ResultStore
+
+    store = ResultStore(tmp_path / 'scores.json')
+    prices = {}
+    with offline():
+        prefetcher = UniversePrefetcher(store, data_store=prices)
+        assert prefetcher.submit(['S0001', 'S0002']) == 2
+        assert prefetcher.wait(timeout=60)
+
+    assert sorted(prices) == ['S0001', 'S0002']
+    result = ResultStore(tmp_path / 'scores.json').get_analysis('S0001')
+    assert result['technical'] is not None and result['fundamental'] is not None
+    assert result['sentiment'] is None
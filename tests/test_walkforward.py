@@ -0,0 +1,24 @@
+import pytest
+
+from scripts.sweep import ParameterGrid
+from scripts.walkforward import WalkForward
+
+def test_walk_forward_reuses_scores_and_stitches_folds(panel):
+    grid = ParameterGrid({'buy_threshold': [60, 75], 'sell_threshold': [30, 40]})
+    walk = WalkForward(panel, grid, train_bars=100, test_bars=50, start_date='2021-03-01')
+    result = walk.run()
+
+    folds = walk.folds()
+    assert len(result.folds) == len(folds) > 1
+    assert len(walk._scores) == len(grid)  # One score matrix per configuration, not per fold
+    # Test windows tile the out-of-sample period without overlapping
+    assert result.equity.index.is_monotonic_increasing
+    assert result.equity.index.is_unique
+    assert result.equity.index[0] == panel.dates[folds[0][1]]
+    assert (result.folds['optimise_seconds'] >= 0).all()
+    assert result.metrics()['folds'] == len(folds)
+
+def test_walk_forward_rejects_overlapping_test_windows(panel):
+    grid = ParameterGrid({'buy_threshold': [60, 75]})
+    with pytest.raises(ValueError, match="step"):
+        WalkForward(panel, grid, train_bars=100, test_bars=50, step=25)